@@ -0,0 +1,145 @@
+"""Заполнение данных в больших таблицах порциями по первичному ключу.
+
+Backfill обходит выборку диапазонами id, каждую порцию обрабатывает
+и фиксирует отдельной транзакцией вместе с контрольной точкой, так что
+прерванный запуск продолжается с места остановки. Размер порции
+подстраивается под target_seconds, а после каждой порции делается пауза,
+чтобы заполнение занимало не больше duty_cycle времени базы.
+
+В RunPython миграция должна быть с atomic = False, иначе все порции
+окажутся в одной транзакции миграции.
+"""
+import time
+from collections import namedtuple
+
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.db.models import Max, Min
+from django.utils.module_loading import autodiscover_modules
+
+from .models import BackfillCheckpoint
+
+Progress = namedtuple(
+    'Progress', 'name last_pk max_pk rows percent elapsed eta chunk_size'
+)
+
+_backfills = {}
+
+
+def backfill(name):
+    """Регистрирует фабрику Backfill для команды manage.py backfill.
+
+    Фабрики объявляются в модулях backfills.py приложений.
+    """
+    def decorator(factory):
+        _backfills[name] = factory
+        return factory
+    return decorator
+
+
+def get_backfill(name):
+    autodiscover_modules('backfills')
+    return _backfills[name]
+
+
+def registered_backfills():
+    autodiscover_modules('backfills')
+    return sorted(_backfills)
+
+
+class Backfill:
+    """Применяет process к выборке queryset порциями по id.
+
+    process получает выборку одной порции и возвращает число
+    обработанных строк (или None).
+    """
+
+    def __init__(self, name, queryset, process, chunk_size=500,
+                 min_chunk_size=50, max_chunk_size=5000, target_seconds=0.2,
+                 duty_cycle=0.5, max_sleep=5.0, progress=None,
+                 using=DEFAULT_DB_ALIAS):
+        self.name = name
+        self.queryset = queryset.using(using).order_by('pk')
+        self.process = process
+        self.chunk_size = chunk_size
+        self.min_chunk_size = min_chunk_size
+        self.max_chunk_size = max_chunk_size
+        self.target_seconds = target_seconds
+        self.duty_cycle = duty_cycle
+        self.max_sleep = max_sleep
+        self.progress = progress
+        self.using = using
+
+    def checkpoint(self):
+        point, _ = BackfillCheckpoint.objects.using(
+            self.using
+        ).get_or_create(name=self.name)
+        return point
+
+    def reset(self):
+        BackfillCheckpoint.objects.using(self.using).filter(
+            name=self.name
+        ).delete()
+
+    def next_bound(self, last_pk):
+        """Верхний id следующей порции или None, если строк не осталось."""
+        pks = self.queryset.filter(pk__gt=last_pk).values_list('pk', flat=True)
+        bound = pks[self.chunk_size - 1:self.chunk_size].first()
+        if bound is None:
+            bound = pks.aggregate(max_pk=Max('pk'))['max_pk']
+        return bound
+
+    def adapt(self, elapsed):
+        """Подгоняет размер порции под target_seconds и выдерживает паузу."""
+        if elapsed > 0:
+            scale = min(max(self.target_seconds / elapsed, 0.5), 2.0)
+            self.chunk_size = int(min(
+                max(self.chunk_size * scale, self.min_chunk_size),
+                self.max_chunk_size,
+            ))
+        pause = elapsed * (1 - self.duty_cycle) / self.duty_cycle
+        if pause > 0:
+            time.sleep(min(pause, self.max_sleep))
+
+    def run(self, limit=None):
+        """Обрабатывает порции до конца выборки или до limit порций.
+
+        Возвращает число обработанных строк за этот запуск. Повторный
+        запуск завершённого заполнения обходит только строки, добавленные
+        после контрольной точки.
+        """
+        point = self.checkpoint()
+        bounds = self.queryset.aggregate(min_pk=Min('pk'), max_pk=Max('pk'))
+        start_pk = max(point.last_pk, (bounds['min_pk'] or 1) - 1)
+        started = time.monotonic()
+        rows = chunks = 0
+        while limit is None or chunks < limit:
+            bound = self.next_bound(point.last_pk)
+            if bound is None:
+                if not point.done:
+                    point.done = True
+                    point.save(update_fields=['done', 'updated'])
+                break
+            chunk_started = time.monotonic()
+            with transaction.atomic(using=self.using):
+                processed = self.process(
+                    self.queryset.filter(pk__gt=point.last_pk, pk__lte=bound)
+                )
+                point.last_pk = bound
+                point.save(update_fields=['last_pk', 'updated'])
+            rows += processed or 0
+            chunks += 1
+            self.report(point.last_pk, start_pk, bounds['max_pk'], rows,
+                        time.monotonic() - started)
+            self.adapt(time.monotonic() - chunk_started)
+        return rows
+
+    def report(self, last_pk, start_pk, max_pk, rows, elapsed):
+        if self.progress is None:
+            return
+        total = max(max_pk - start_pk, 1)
+        done = min(last_pk - start_pk, total)
+        eta = elapsed * (total - done) / done if done else None
+        self.progress(Progress(
+            self.name, last_pk, max_pk, rows, 100 * done / total,
+            elapsed, eta, self.chunk_size,
+        ))
@@ -0,0 +1,130 @@
+"""Обёртка над бэкендом SQLite для боевой нагрузки.
+
+Применяет настройки кеша при каждом новом соединении и повторяет
+запросы, упавшие с "database is locked", с паузой и случайным
+разбросом. Параметры задаются в OPTIONS:
+
+    'OPTIONS': {
+        'timeout': 1,
+        'wal': True,
+        'pragmas': {'mmap_size': 268435456},
+        'busy_max_wait': 5,
+        'busy_backoff': 0.05,
+    }
+
+Каждая попытка сама ждёт блокировку до timeout секунд в драйвере,
+поэтому повторы ограничены общим временем busy_max_wait, а не числом
+попыток: запрос ждёт не дольше busy_max_wait плюс timeout. Внутри
+транзакции запрос не повторяется: блокировку держит уже начатая
+транзакция, и повтор одного запроса её не снимет.
+
+WAL включается только с 'wal': True: режим журнала записывается
+в заголовок файла базы, и без этого флага обычные команды manage.py
+не меняют файл, который лежит в репозитории.
+"""
+import random
+import time
+
+from django.db.backends.sqlite3 import base
+
+Database = base.Database
+
+DEFAULT_PRAGMAS = {
+    'synchronous': 'NORMAL',
+    'mmap_size': 256 * 1024 * 1024,
+    # Отрицательное значение - размер в КиБ, а не в страницах
+    'cache_size': -64 * 1024,
+    'temp_store': 'MEMORY',
+}
+WAL_PRAGMAS = {'journal_mode': 'WAL'}
+DEFAULT_BUSY_MAX_WAIT = 5
+DEFAULT_BUSY_BACKOFF = 0.05
+
+
+def apply_pragmas(connection, pragmas):
+    for name, value in pragmas.items():
+        connection.execute(f'PRAGMA {name} = {value}')
+
+
+def is_busy_error(error):
+    message = str(error).lower()
+    return 'database is locked' in message or 'database is busy' in message
+
+
+def retry_on_busy(func, db=None, max_wait=DEFAULT_BUSY_MAX_WAIT,
+                  backoff=DEFAULT_BUSY_BACKOFF):
+    """Вызывает func, повторяя его при SQLITE_BUSY, пока с первой
+    попытки не прошло max_wait секунд.
+
+    Пауза растёт вдвое с каждой попыткой и умножается на случайный
+    коэффициент, чтобы ждущие процессы не просыпались разом. Если
+    соединение db внутри atomic(), ошибка пробрасывается сразу.
+    """
+    if db is not None and db.in_atomic_block:
+        return func()
+    deadline = time.monotonic() + max_wait
+    attempt = 0
+    while True:
+        try:
+            return func()
+        except Database.OperationalError as error:
+            if not is_busy_error(error):
+                raise
+            pause = backoff * 2 ** attempt * random.uniform(0.5, 1.5)
+            if time.monotonic() + pause > deadline:
+                raise
+            time.sleep(pause)
+            attempt += 1
+
+
+class RetryingCursorWrapper(base.SQLiteCursorWrapper):
+    db = None
+    busy_max_wait = DEFAULT_BUSY_MAX_WAIT
+    busy_backoff = DEFAULT_BUSY_BACKOFF
+
+    def execute(self, query, params=None):
+        return retry_on_busy(
+            lambda: super(RetryingCursorWrapper, self).execute(query, params),
+            self.db,
+            self.busy_max_wait,
+            self.busy_backoff,
+        )
+
+    def executemany(self, query, param_list):
+        param_list = list(param_list)
+        return retry_on_busy(
+            lambda: super(RetryingCursorWrapper, self).executemany(
+                query, param_list
+            ),
+            self.db,
+            self.busy_max_wait,
+            self.busy_backoff,
+        )
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+
+    def get_connection_params(self):
+        kwargs = super().get_connection_params()
+        self.pragmas = {
+            **DEFAULT_PRAGMAS,
+            **(WAL_PRAGMAS if kwargs.pop('wal', False) else {}),
+            **kwargs.pop('pragmas', {}),
+        }
+        self.busy_max_wait = kwargs.pop(
+            'busy_max_wait', DEFAULT_BUSY_MAX_WAIT
+        )
+        self.busy_backoff = kwargs.pop('busy_backoff', DEFAULT_BUSY_BACKOFF)
+        return kwargs
+
+    def get_new_connection(self, conn_params):
+        conn = super().get_new_connection(conn_params)
+        apply_pragmas(conn, self.pragmas)
+        return conn
+
+    def create_cursor(self, name=None):
+        cursor = self.connection.cursor(factory=RetryingCursorWrapper)
+        cursor.db = self
+        cursor.busy_max_wait = self.busy_max_wait
+        cursor.busy_backoff = self.busy_backoff
+        return cursor
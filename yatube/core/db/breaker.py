@@ -0,0 +1,120 @@
+"""Автомат защиты от медленной или недоступной базы.
+
+CircuitBreaker считает последние запросы к базе: сколько из них упало
+с OperationalError (блокировка SQLite, ошибка диска) и сколько шли
+дольше slow_query секунд. Когда доля ошибок или медленных запросов
+в окне превышает порог, автомат размыкается: middleware отдаёт
+страницы из последней удачной отрисовки, а запись отклоняет с 503.
+Через cooldown секунд один запрос пропускается пробным; если он
+прошёл без ошибок, автомат замыкается.
+
+Состояние своё в каждом процессе.
+"""
+import threading
+import time
+from collections import deque
+
+from django.conf import settings
+from django.db import OperationalError
+
+
+class CircuitBreaker:
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, window=50, min_samples=10, error_rate=0.5,
+                 slow_query=1.0, slow_rate=0.5, cooldown=10,
+                 clock=time.monotonic):
+        self.samples = deque(maxlen=window)
+        self.min_samples = min_samples
+        self.error_rate = error_rate
+        self.slow_query = slow_query
+        self.slow_rate = slow_rate
+        self.cooldown = cooldown
+        self.clock = clock
+        self.state = self.CLOSED
+        self.opened_at = None
+        self.lock = threading.Lock()
+
+    def record(self, duration, error):
+        """Учитывает один запрос к базе."""
+        with self.lock:
+            self.samples.append((duration > self.slow_query, error))
+            if self.state == self.CLOSED and self.overloaded():
+                self.open()
+
+    def overloaded(self):
+        total = len(self.samples)
+        if total < self.min_samples:
+            return False
+        slow = sum(1 for is_slow, _ in self.samples if is_slow)
+        errors = sum(1 for _, is_error in self.samples if is_error)
+        return (
+            errors / total >= self.error_rate
+            or slow / total >= self.slow_rate
+        )
+
+    def open(self):
+        self.state = self.OPEN
+        self.opened_at = self.clock()
+
+    def allow_request(self):
+        """Можно ли обращаться к базе; после cooldown пропускает
+        один пробный запрос."""
+        with self.lock:
+            if self.state == self.CLOSED:
+                return True
+            if (
+                self.state == self.OPEN
+                and self.clock() - self.opened_at >= self.cooldown
+            ):
+                self.state = self.HALF_OPEN
+                return True
+            return False
+
+    def request_finished(self, failed):
+        """Итог запроса: пробный запрос замыкает или снова размыкает."""
+        with self.lock:
+            if self.state != self.HALF_OPEN:
+                return
+            if failed:
+                self.open()
+            else:
+                self.state = self.CLOSED
+                self.samples.clear()
+
+
+class QueryObserver:
+    """Обёртка execute_wrapper: передаёт автомату время и исход
+    каждого запроса."""
+
+    def __init__(self, breaker):
+        self.breaker = breaker
+        self.failed = False
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.monotonic()
+        try:
+            result = execute(sql, params, many, context)
+        except OperationalError:
+            self.failed = True
+            self.breaker.record(time.monotonic() - started, True)
+            raise
+        self.breaker.record(time.monotonic() - started, False)
+        return result
+
+
+_breaker = None
+
+
+def get_breaker():
+    global _breaker
+    if _breaker is None:
+        _breaker = CircuitBreaker(**settings.CIRCUIT_BREAKER)
+    return _breaker
+
+
+def reset_breaker():
+    global _breaker
+    _breaker = None
@@ -0,0 +1,60 @@
+"""Обслуживание базы SQLite: резервная копия, очистка и статистика."""
+import os
+import time
+
+from django.utils import timezone
+
+from .replication import online_backup
+
+
+def backup(connection, directory, pages=256, sleep=0.05):
+    """Онлайн-копия базы в directory; возвращает путь к файлу."""
+    os.makedirs(directory, exist_ok=True)
+    stamp = timezone.now().strftime('%Y%m%d-%H%M%S')
+    target = os.path.join(directory, f'db-{stamp}.sqlite3')
+    connection.ensure_connection()
+    online_backup(connection.connection, target, pages, sleep)
+    return target
+
+
+def pragma(connection, name):
+    with connection.cursor() as cursor:
+        cursor.execute(f'PRAGMA {name}')
+        return cursor.fetchone()[0]
+
+
+def incremental_vacuum(connection, pages=256, sleep=0.05):
+    """Возвращает свободные страницы файлу порциями по pages.
+
+    Работает только при auto_vacuum = INCREMENTAL (значение 2);
+    возвращает число освобождённых страниц.
+    """
+    if pragma(connection, 'auto_vacuum') != 2:
+        return 0
+    freed = 0
+    while True:
+        free = pragma(connection, 'freelist_count')
+        if not free:
+            return freed
+        with connection.cursor() as cursor:
+            cursor.execute(f'PRAGMA incremental_vacuum({pages})')
+            cursor.fetchall()
+        freed += min(free, pages)
+        time.sleep(sleep)
+
+
+def enable_incremental_vacuum(connection):
+    """Включает auto_vacuum = INCREMENTAL; требует полного VACUUM."""
+    with connection.cursor() as cursor:
+        cursor.execute('PRAGMA auto_vacuum = INCREMENTAL')
+        cursor.execute('VACUUM')
+
+
+def analyze(connection):
+    with connection.cursor() as cursor:
+        cursor.execute('ANALYZE')
+
+
+def optimize(connection):
+    with connection.cursor() as cursor:
+        cursor.execute('PRAGMA optimize')
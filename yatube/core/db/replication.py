@@ -0,0 +1,33 @@
+import sqlite3
+import time
+
+
+def online_backup(source_connection, target, pages=-1, sleep=0,
+                  progress=None):
+    """Копирует открытую базу SQLite в файл target через backup API.
+
+    Копирование идёт порциями по pages страниц с паузой sleep секунд
+    между ними, так что запись в базу в это время не блокируется.
+    progress(remaining, total) вызывается после каждой порции.
+    """
+    target_connection = sqlite3.connect(target)
+
+    def step(status, remaining, total):
+        if progress is not None:
+            progress(remaining, total)
+        if sleep and remaining:
+            time.sleep(sleep)
+
+    try:
+        source_connection.backup(target_connection, pages=pages, progress=step)
+    finally:
+        target_connection.close()
+
+
+def copy_database(source, target, pages=-1, sleep=0, progress=None):
+    """То же, что online_backup, но для базы source по пути к файлу."""
+    source_connection = sqlite3.connect(source)
+    try:
+        online_backup(source_connection, target, pages, sleep, progress)
+    finally:
+        source_connection.close()
@@ -0,0 +1,78 @@
+"""Чтение тяжёлых страниц с реплики, запись - только в основную базу.
+
+Представления, помеченные декоратором use_replica, читают из базы
+settings.DATABASE_REPLICA, если она описана в DATABASES. Состояние
+запроса хранит ReplicaPinMiddleware: после записи пользователь
+некоторое время читает из основной базы и видит свои изменения.
+"""
+import threading
+from contextlib import contextmanager
+from functools import wraps
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+_state = threading.local()
+
+
+def replica_alias():
+    alias = getattr(settings, 'DATABASE_REPLICA', None)
+    return alias if alias in settings.DATABASES else None
+
+
+def begin_request(pinned=False):
+    _state.pinned = pinned
+    _state.use_replica = False
+    _state.wrote = False
+
+
+def request_wrote():
+    return getattr(_state, 'wrote', False)
+
+
+@contextmanager
+def read_primary():
+    """Чтения внутри блока идут в основную базу даже в представлении
+    с use_replica: например, когда прочитанное попадёт в общий кеш."""
+    use_replica = getattr(_state, 'use_replica', False)
+    _state.use_replica = False
+    try:
+        yield
+    finally:
+        _state.use_replica = use_replica
+
+
+def use_replica(view):
+    """Декоратор: чтения внутри представления идут на реплику."""
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        if (
+            request.method not in ('GET', 'HEAD')
+            or getattr(_state, 'pinned', False)
+        ):
+            return view(request, *args, **kwargs)
+        _state.use_replica = True
+        try:
+            return view(request, *args, **kwargs)
+        finally:
+            _state.use_replica = False
+    return wrapper
+
+
+class PrimaryReplicaRouter:
+
+    def db_for_read(self, model, **hints):
+        if getattr(_state, 'use_replica', False):
+            return replica_alias()
+        return None
+
+    def db_for_write(self, model, **hints):
+        # Объект мог быть прочитан с реплики, но пишем всегда в основную
+        _state.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db != replica_alias()
@@ -0,0 +1,111 @@
+"""Кеширование страниц на обратном прокси по surrogate-ключам.
+
+Представления помечают ответ ключами объектов, которые на нём видны
+(post-1, author-2, group-3, index). core.middleware.EdgeCacheMiddleware
+разрешает прокси хранить помеченные ответы гостей, а при записи
+ключи изменённых объектов собираются за транзакцию и одним запросом
+после фиксации отправляются очистителю EDGE_PURGER.
+"""
+import threading
+from functools import partial
+
+import requests
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.utils.module_loading import import_string
+
+from tasks.queue import enqueue
+
+HEADER = 'Surrogate-Key'
+
+
+def add_surrogate_keys(response, keys):
+    """Добавляет ключи к заголовку Surrogate-Key ответа."""
+    existing = response.get(HEADER, '').split()
+    merged = dict.fromkeys(existing + [key for key in keys if key])
+    response[HEADER] = ' '.join(merged)
+    return response
+
+
+def post_keys(post):
+    """Ключи страниц, на которых показан пост."""
+    keys = [f'post-{post.pk}', f'author-{post.author_id}']
+    if post.group_id:
+        keys.append(f'group-{post.group_id}')
+    return keys
+
+
+def feed_keys(list_key, posts):
+    """Ключи страницы ленты: сама лента и каждый пост на ней."""
+    keys = [list_key]
+    for post in posts:
+        keys += post_keys(post)
+    return keys
+
+
+class BasePurger:
+    def purge(self, keys):
+        raise NotImplementedError
+
+
+class HTTPPurger(BasePurger):
+    """Шлёт PURGE на адрес прокси со списком ключей в Surrogate-Key.
+
+    Так очистку по ключам принимают Varnish с xkey и Fastly.
+    """
+
+    def __init__(self, url, method='PURGE', timeout=5, headers=None):
+        self.url = url
+        self.method = method
+        self.timeout = timeout
+        self.headers = headers or {}
+
+    def purge(self, keys):
+        response = requests.request(
+            self.method,
+            self.url,
+            headers={**self.headers, HEADER: ' '.join(sorted(keys))},
+            timeout=self.timeout,
+        )
+        response.raise_for_status()
+
+
+def get_purger():
+    return import_string(settings.EDGE_PURGER)(
+        **settings.EDGE_PURGER_OPTIONS
+    )
+
+
+_pending = threading.local()
+
+
+def pending_keys(using):
+    """Ключи, ждущие фиксации транзакции соединения using в этом
+    потоке."""
+    if not hasattr(_pending, 'keys'):
+        _pending.keys = {}
+    return _pending.keys.setdefault(using, set())
+
+
+def flush(using):
+    keys = pending_keys(using)
+    if not keys:
+        return
+    batch = sorted(keys)
+    keys.clear()
+    enqueue('core.edge_purge', batch)
+
+
+def purge_later(keys, using=DEFAULT_DB_ALIAS):
+    """Очищает ключи после фиксации транзакции одним запросом на все
+    изменения в ней; вне транзакции - сразу. Без EDGE_PURGER ничего
+    не делает.
+
+    Первый после фиксации flush() отправляет все накопленные ключи,
+    остальные находят набор пустым. Ключи откатившейся транзакции
+    уходят со следующей: лишняя очистка безопасна.
+    """
+    if not settings.EDGE_PURGER:
+        return
+    pending_keys(using).update(keys)
+    transaction.on_commit(partial(flush, using), using=using)
@@ -0,0 +1,9 @@
+from django.http import Http404
+
+
+class KnownNotFound(Http404):
+    """Объект заведомо отсутствует (например, промах уже в кеше).
+
+    Обработчик 404 отвечает на такое исключение заранее
+    подготовленной короткой страницей без базового шаблона.
+    """
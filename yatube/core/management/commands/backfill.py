@@ -0,0 +1,59 @@
+import datetime as dt
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.backfill import get_backfill, registered_backfills
+
+
+class Command(BaseCommand):
+    help = (
+        'Заполняет данные порциями по id с контрольной точкой: прерванный '
+        'запуск продолжается с места остановки.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('name', nargs='?')
+        parser.add_argument('--list', action='store_true')
+        parser.add_argument(
+            '--reset', action='store_true',
+            help='Начать заново, сбросив контрольную точку.',
+        )
+        parser.add_argument('--chunk-size', type=int, default=500)
+        parser.add_argument(
+            '--duty-cycle', type=float, default=0.5,
+            help='Доля времени, которую заполнение занимает базу.',
+        )
+        parser.add_argument(
+            '--limit', type=int,
+            help='Обработать не больше стольких порций.',
+        )
+
+    def handle(self, *args, **options):
+        if options['list'] or not options['name']:
+            for name in registered_backfills():
+                self.stdout.write(name)
+            return
+        try:
+            factory = get_backfill(options['name'])
+        except KeyError:
+            raise CommandError(f'Нет заполнения {options["name"]}.')
+        job = factory(
+            chunk_size=options['chunk_size'],
+            duty_cycle=options['duty_cycle'],
+            progress=self.report,
+        )
+        if options['reset']:
+            job.reset()
+        rows = job.run(limit=options['limit'])
+        self.stdout.write(f'{job.name}: обработано строк {rows}')
+
+    def report(self, progress):
+        eta = (
+            dt.timedelta(seconds=round(progress.eta))
+            if progress.eta is not None else '?'
+        )
+        self.stdout.write(
+            f'{progress.name}: id {progress.last_pk}/{progress.max_pk} '
+            f'({progress.percent:.1f}%), строк {progress.rows}, '
+            f'порция {progress.chunk_size}, осталось {eta}'
+        )
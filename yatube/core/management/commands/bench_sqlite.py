@@ -0,0 +1,118 @@
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.db.backends.sqlite3.base import (
+    DEFAULT_BUSY_BACKOFF, DEFAULT_BUSY_MAX_WAIT, DEFAULT_PRAGMAS,
+    WAL_PRAGMAS, apply_pragmas, is_busy_error, retry_on_busy,
+)
+
+PROFILES = (
+    ('по умолчанию', {}, 0),
+    ('боевой', {**DEFAULT_PRAGMAS, **WAL_PRAGMAS}, DEFAULT_BUSY_MAX_WAIT),
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Нагрузочный тест SQLite: скорость чтения ленты при параллельных '
+        'записях с настройками по умолчанию и с боевым профилем.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--readers', type=int, default=4)
+        parser.add_argument('--writers', type=int, default=2)
+        parser.add_argument('--duration', type=float, default=5.0)
+        parser.add_argument('--rows', type=int, default=10000)
+        parser.add_argument(
+            '--timeout', type=float, default=0.1,
+            help='Ожидание блокировки в sqlite3.connect, секунды.',
+        )
+
+    def handle(self, *args, **options):
+        for name, pragmas, max_wait in PROFILES:
+            with tempfile.TemporaryDirectory() as directory:
+                path = os.path.join(directory, 'bench.sqlite3')
+                self.seed(path, pragmas, options['rows'])
+                stats = self.run_profile(path, pragmas, max_wait, options)
+            duration = options['duration']
+            self.stdout.write(
+                f'{name}: чтений {stats["reads"]} '
+                f'({stats["reads"] / duration:.0f}/с), '
+                f'записей {stats["writes"]} '
+                f'({stats["writes"] / duration:.0f}/с), '
+                f'ошибок блокировки {stats["busy"]}'
+            )
+
+    def seed(self, path, pragmas, rows):
+        with sqlite3.connect(path) as connection:
+            apply_pragmas(connection, pragmas)
+            connection.execute(
+                'CREATE TABLE post (id INTEGER PRIMARY KEY, '
+                'author_id INTEGER, text TEXT, pub_date REAL)'
+            )
+            connection.execute('CREATE INDEX post_pub_date ON post (pub_date)')
+            connection.executemany(
+                'INSERT INTO post (author_id, text, pub_date) '
+                'VALUES (?, ?, ?)',
+                ((i % 100, 'текст ' * 50, i) for i in range(rows)),
+            )
+        connection.close()
+
+    def run_profile(self, path, pragmas, max_wait, options):
+        stats = {'reads': 0, 'writes': 0, 'busy': 0}
+        lock = threading.Lock()
+        deadline = time.monotonic() + options['duration']
+
+        def worker(operation, counter):
+            connection = sqlite3.connect(path, timeout=options['timeout'])
+            apply_pragmas(connection, pragmas)
+            done = busy = 0
+            while time.monotonic() < deadline:
+                try:
+                    retry_on_busy(
+                        lambda: operation(connection),
+                        max_wait=max_wait, backoff=DEFAULT_BUSY_BACKOFF,
+                    )
+                    done += 1
+                except sqlite3.OperationalError as error:
+                    if not is_busy_error(error):
+                        raise
+                    busy += 1
+            connection.close()
+            with lock:
+                stats[counter] += done
+                stats['busy'] += busy
+
+        threads = [
+            threading.Thread(target=worker, args=(self.read, 'reads'))
+            for _ in range(options['readers'])
+        ] + [
+            threading.Thread(target=worker, args=(self.write, 'writes'))
+            for _ in range(options['writers'])
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return stats
+
+    @staticmethod
+    def read(connection):
+        connection.execute(
+            'SELECT id, author_id, text FROM post '
+            'ORDER BY pub_date DESC LIMIT 10'
+        ).fetchall()
+
+    @staticmethod
+    def write(connection):
+        with connection:
+            connection.execute(
+                'INSERT INTO post (author_id, text, pub_date) '
+                'VALUES (?, ?, ?)',
+                (1, 'новый пост', time.time()),
+            )
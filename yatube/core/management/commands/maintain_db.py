@@ -0,0 +1,84 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from core.db import maintenance
+
+
+class Command(BaseCommand):
+    help = (
+        'Резервная копия SQLite через online backup API, incremental '
+        'vacuum, ANALYZE и PRAGMA optimize. С --loop работает как демон '
+        'и запускает шаги по расписанию.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS)
+        parser.add_argument(
+            '--backup-dir',
+            help='Каталог для резервных копий; без него копия не делается.',
+        )
+        parser.add_argument(
+            '--pages', type=int, default=256,
+            help='Страниц за один шаг копирования и очистки.',
+        )
+        parser.add_argument(
+            '--sleep', type=float, default=0.05,
+            help='Пауза между шагами, секунды.',
+        )
+        parser.add_argument(
+            '--enable-incremental-vacuum', action='store_true',
+            help='Один раз перевести базу в auto_vacuum = INCREMENTAL.',
+        )
+        parser.add_argument('--loop', action='store_true')
+        parser.add_argument('--backup-every', type=float, default=24 * 3600)
+        parser.add_argument('--vacuum-every', type=float, default=3600)
+        parser.add_argument('--analyze-every', type=float, default=6 * 3600)
+
+    def handle(self, *args, **options):
+        connection = connections[options['database']]
+        if connection.vendor != 'sqlite':
+            raise CommandError('Команда работает только с SQLite.')
+        if options['enable_incremental_vacuum']:
+            self.timed(
+                'включение incremental vacuum',
+                maintenance.enable_incremental_vacuum, connection,
+            )
+        steps = [
+            ('vacuum', options['vacuum_every'], lambda: self.timed(
+                'incremental vacuum', maintenance.incremental_vacuum,
+                connection, options['pages'], options['sleep'],
+            )),
+            ('analyze', options['analyze_every'], lambda: (
+                self.timed('ANALYZE', maintenance.analyze, connection),
+                self.timed(
+                    'PRAGMA optimize', maintenance.optimize, connection
+                ),
+            )),
+        ]
+        if options['backup_dir']:
+            steps.insert(0, (
+                'backup', options['backup_every'], lambda: self.timed(
+                    'резервная копия', maintenance.backup, connection,
+                    options['backup_dir'], options['pages'], options['sleep'],
+                ),
+            ))
+        next_run = {name: 0 for name, _, _ in steps}
+        while True:
+            for name, every, step in steps:
+                if time.monotonic() >= next_run[name]:
+                    step()
+                    next_run[name] = time.monotonic() + every
+            if not options['loop']:
+                break
+            connection.close()
+            time.sleep(max(0, min(next_run.values()) - time.monotonic()))
+
+    def timed(self, title, func, *args):
+        started = time.monotonic()
+        result = func(*args)
+        elapsed = time.monotonic() - started
+        suffix = f' ({result})' if result is not None else ''
+        self.stdout.write(f'{title}: {elapsed:.3f} с{suffix}')
+        return result
@@ -0,0 +1,74 @@
+import json
+import os
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from core.startup import parse_importtime
+
+
+class Command(BaseCommand):
+    help = (
+        'Запускает чистый процесс и показывает, сколько стоит его '
+        'подготовка: этапы запуска, приложения и самые долгие импорты.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--top', type=int, default=20,
+            help='Сколько самых долгих импортов показать.',
+        )
+        parser.add_argument(
+            '--sort', choices=('self', 'cumulative'), default='cumulative',
+            help='Сортировать импорты по собственному или общему времени.',
+        )
+        parser.add_argument(
+            '--packages', action='store_true',
+            help='Суммировать время импорта по пакетам верхнего уровня.',
+        )
+
+    def handle(self, *args, **options):
+        env = dict(os.environ)
+        env.setdefault('DJANGO_SETTINGS_MODULE', settings.SETTINGS_MODULE)
+        process = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-m', 'core.startup'],
+            cwd=settings.BASE_DIR, env=env, capture_output=True, text=True,
+        )
+        if process.returncode:
+            raise CommandError(process.stderr.strip().splitlines()[-1])
+        result = json.loads(process.stdout)
+
+        self.stdout.write('Этапы запуска, мс:')
+        for name, seconds in result['phases'].items():
+            self.stdout.write(f'  {name:<12} {seconds * 1000:8.1f}')
+        self.stdout.write('Приложения (импорт / модели / ready), мс:')
+        for label, steps in result['apps'].items():
+            self.stdout.write('  {:<16} {:8.1f} {:8.1f} {:8.1f}'.format(
+                label, *(
+                    steps.get(step, 0) * 1000
+                    for step in ('import', 'import_models', 'ready')
+                )
+            ))
+        self.stdout.write(
+            f'Пиковая память процесса: {result["max_rss_kb"] // 1024} МБ'
+        )
+
+        modules = parse_importtime(process.stderr)
+        if options['packages']:
+            totals = {}
+            for name, own, _ in modules:
+                package = name.split('.')[0]
+                totals[package] = totals.get(package, 0) + own
+            rows = sorted(totals.items(), key=lambda row: -row[1])
+            self.stdout.write('Импорт по пакетам, мс:')
+        else:
+            column = 1 if options['sort'] == 'self' else 2
+            rows = sorted(
+                ((row[0], row[column]) for row in modules),
+                key=lambda row: -row[1],
+            )
+            self.stdout.write('Самые долгие импорты, мс:')
+        for name, seconds in rows[:options['top']]:
+            self.stdout.write(f'  {seconds * 1000:8.1f}  {name}')
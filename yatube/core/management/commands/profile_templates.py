@@ -0,0 +1,73 @@
+import time
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.test import RequestFactory
+from django.urls import Resolver404, resolve
+
+from core.template_profile import TemplateProfile, profiling
+
+
+class Command(BaseCommand):
+    help = (
+        'Отрисовывает страницы несколько раз и показывает время '
+        'каждого шаблона и тега в среднем на одну отрисовку.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('paths', nargs='+', metavar='path')
+        parser.add_argument('--repeat', type=int, default=20)
+        parser.add_argument(
+            '--user', help='Отрисовывать для этого пользователя, а не гостя.',
+        )
+        parser.add_argument(
+            '--cold', action='store_true',
+            help='Очищать кеш перед каждой отрисовкой.',
+        )
+        parser.add_argument('--limit', type=int, default=15)
+
+    def handle(self, *args, **options):
+        user = self.get_user(options['user'])
+        repeat = options['repeat']
+        for path in options['paths']:
+            try:
+                match = resolve(path.split('?')[0])
+            except Resolver404:
+                raise CommandError(f'Адрес {path} не найден.')
+            profile = TemplateProfile()
+            started = time.perf_counter()
+            response = self.render(
+                path, match, user, profile, repeat, options['cold']
+            )
+            elapsed = (time.perf_counter() - started) * 1000 / repeat
+            self.stdout.write(
+                f'{path} ({match.view_name}), ответ '
+                f'{response.status_code}: {elapsed:.2f} мс на запрос, '
+                f'шаблоны {profile.render_time() * 1000 / repeat:.2f} мс'
+            )
+            for line in profile.report(options['limit'], repeat):
+                self.stdout.write(line)
+
+    def get_user(self, username):
+        if not username:
+            return AnonymousUser()
+        try:
+            return get_user_model().objects.get(username=username)
+        except get_user_model().DoesNotExist:
+            raise CommandError(f'Нет пользователя {username}.')
+
+    def render(self, path, match, user, profile, repeat, cold):
+        """Отрисовывает path repeat раз; возвращает последний ответ."""
+        for _ in range(repeat):
+            if cold:
+                cache.clear()
+            request = RequestFactory().get(path)
+            request.user = user
+            request.resolver_match = match
+            with profiling(profile):
+                response = match.func(request, *match.args, **match.kwargs)
+                if hasattr(response, 'render'):
+                    response.render()
+        return response
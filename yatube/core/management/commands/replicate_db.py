@@ -0,0 +1,40 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS
+
+from core.db.replication import copy_database
+from core.db.routers import replica_alias
+
+
+class Command(BaseCommand):
+    help = (
+        'Заменитель репликации для SQLite: копирует основную базу '
+        'в файл реплики, один раз или с заданным интервалом.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--interval', type=float, default=0,
+            help='Повторять копирование каждые N секунд.',
+        )
+
+    def handle(self, *args, **options):
+        alias = replica_alias()
+        if alias is None:
+            raise CommandError(
+                'Реплика не настроена: задайте YATUBE_REPLICA_DB.'
+            )
+        source = settings.DATABASES[DEFAULT_DB_ALIAS]['NAME']
+        target = settings.DATABASES[alias]['NAME']
+        while True:
+            started = time.monotonic()
+            copy_database(source, target)
+            self.stdout.write(
+                f'{source} -> {target}: '
+                f'{time.monotonic() - started:.3f} с'
+            )
+            if not options['interval']:
+                break
+            time.sleep(options['interval'])
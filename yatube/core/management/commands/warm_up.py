@@ -0,0 +1,30 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core.warmup import registered_stages, warm_up
+
+
+class Command(BaseCommand):
+    help = (
+        'Прогревает кеши: шаблоны, URL, начала лент, первые страницы '
+        'и миниатюры, укладываясь в бюджет времени.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--budget', type=float, default=settings.WARMUP_BUDGET,
+            help='Бюджет времени на прогрев, секунды.',
+        )
+        parser.add_argument(
+            '--stage', action='append', dest='stages',
+            choices=[name for name, _ in registered_stages()],
+            help='Выполнить только этот этап; можно повторять.',
+        )
+
+    def handle(self, *args, **options):
+        report = warm_up(options['budget'], options['stages'])
+        for result in report:
+            state = 'готово' if result.done else 'не завершён'
+            self.stdout.write(
+                f'{result.name}: {result.seconds:.3f} с, {state}'
+            )
@@ -0,0 +1,202 @@
+import hashlib
+import logging
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.http import HttpResponse
+from django.template.loader import render_to_string
+from django.utils.cache import patch_cache_control, patch_vary_headers
+
+from core import edge, page_cache
+from core.db import routers
+from core.db.breaker import QueryObserver, get_breaker
+from core.template_profile import profiling
+
+logger = logging.getLogger(__name__)
+
+
+class ReplicaPinMiddleware:
+    """Закрепляет за пользователем основную базу после записи.
+
+    Срок закрепления хранится в cookie, поэтому работает и без
+    сессии: редирект после создания поста читает уже из основной
+    базы, а не с отстающей реплики.
+    """
+    cookie_name = 'primary_pin'
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        try:
+            pinned_until = float(request.COOKIES.get(self.cookie_name, 0))
+        except ValueError:
+            pinned_until = 0
+        routers.begin_request(pinned=pinned_until > time.time())
+        response = self.get_response(request)
+        if routers.replica_alias() and routers.request_wrote():
+            seconds = settings.REPLICA_PIN_SECONDS
+            response.set_cookie(
+                self.cookie_name,
+                str(int(time.time() + seconds)),
+                max_age=seconds,
+                httponly=True,
+            )
+        return response
+
+
+class AnonymousPageCacheMiddleware:
+    """Отдаёт анонимным читателям страницы лент и постов из кеша.
+
+    Стоит в начале цепочки: попадание не доходит до сессий,
+    аутентификации и базы. Запросы с cookie сессии идут мимо кеша.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not self.is_cached_view(request):
+            return self.get_response(request)
+        key = page_cache.page_key(request)
+        response = cache.get(key)
+        if response is not None:
+            response['X-Page-Cache'] = 'hit'
+            return response
+        response = self.get_response(request)
+        if page_cache.is_cacheable_response(response):
+            cache.set(key, response, settings.PAGE_CACHE_TIMEOUT)
+            response['X-Page-Cache'] = 'miss'
+        return response
+
+    def is_cached_view(self, request):
+        return (
+            page_cache.is_cacheable_request(request)
+            and page_cache.is_cached_view(request)
+        )
+
+
+class EdgeCacheMiddleware:
+    """Заголовки кеширования для ответов с Surrogate-Key.
+
+    Гостевые ответы прокси хранит EDGE_CACHE_SECONDS и сбрасывает по
+    ключам; ответы вошедшим пользователям и с cookie не кешируются.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if edge.HEADER not in response:
+            return response
+        patch_vary_headers(response, ('Cookie',))
+        user = getattr(request, 'user', None)
+        if (user is not None and user.is_authenticated) or response.cookies:
+            patch_cache_control(response, private=True, no_cache=True)
+        else:
+            patch_cache_control(
+                response, public=True, max_age=0,
+                s_maxage=settings.EDGE_CACHE_SECONDS,
+            )
+        return response
+
+
+class DatabaseCircuitBreakerMiddleware:
+    """Деградация вместо отказа, когда база тормозит или недоступна.
+
+    Каждая удачная гостевая отрисовка лент и страниц постов
+    запоминается надолго. Пока автомат разомкнут или запрос упал на
+    базе, такие страницы отдаются из этой копии с пометкой устаревшей,
+    а остальные запросы и запись получают 503.
+
+    И автомат, и копии страниц (в LocMemCache) свои в каждом процессе:
+    каждый обработчик размыкается по своим запросам и отдаёт только
+    страницы, которые отрисовал сам.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        breaker = get_breaker()
+        if not breaker.allow_request():
+            return self.degraded(request)
+        observer = QueryObserver(breaker)
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(observer))
+            try:
+                response = self.get_response(request)
+            finally:
+                breaker.request_finished(observer.failed)
+        if observer.failed and response.status_code >= 500:
+            return self.degraded(request)
+        if (
+            page_cache.is_cacheable_request(request)
+            and page_cache.is_cacheable_response(response)
+            and page_cache.is_cached_view(request)
+        ):
+            cache.set(
+                self.stale_key(request), response,
+                settings.STALE_CACHE_TIMEOUT,
+            )
+        return response
+
+    def stale_key(self, request):
+        digest = hashlib.md5(request.get_full_path().encode()).hexdigest()
+        return f'stale:{digest}'
+
+    def degraded(self, request):
+        if request.method in ('GET', 'HEAD'):
+            response = cache.get(self.stale_key(request))
+            if response is not None:
+                # Устаревшую копию не должны сохранять ни кеш страниц,
+                # ни прокси
+                if edge.HEADER in response:
+                    del response[edge.HEADER]
+                response['Cache-Control'] = 'no-store'
+                response['Warning'] = '110 - "Response is Stale"'
+                response['X-Stale'] = '1'
+                return response
+        response = HttpResponse(
+            render_to_string('core/503.html', {
+                'read_only': request.method not in ('GET', 'HEAD'),
+            }),
+            status=503,
+        )
+        response['Retry-After'] = str(settings.CIRCUIT_BREAKER['cooldown'])
+        response['Cache-Control'] = 'no-store'
+        return response
+
+
+class TemplateProfilingMiddleware:
+    """Пишет в журнал время отрисовки шаблонов и тегов каждого
+    запроса и добавляет его в заголовок Server-Timing.
+
+    Работает только с TEMPLATE_PROFILING, иначе исключается из цепочки.
+    """
+
+    def __init__(self, get_response):
+        if not settings.TEMPLATE_PROFILING:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with profiling() as profile:
+            response = self.get_response(request)
+        if not profile.templates:
+            return response
+        view_name = getattr(request.resolver_match, 'view_name', '-')
+        logger.info(
+            '%s %s\n%s', view_name, request.get_full_path(),
+            '\n'.join(profile.report(settings.TEMPLATE_PROFILING_LIMIT)),
+        )
+        response['Server-Timing'] = 'templates;dur={:.1f}'.format(
+            profile.render_time() * 1000
+        )
+        return response
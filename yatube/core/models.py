@@ -12,3 +12,18 @@ class CreatedModel(models.Model):
     class Meta:
         # Это абстрактная модель:
         abstract = True
+
+
+class BackfillCheckpoint(models.Model):
+    """Докуда дошло заполнение данных core.backfill.Backfill."""
+    name = models.CharField('Заполнение', max_length=100, unique=True)
+    last_pk = models.BigIntegerField('Последний обработанный id', default=0)
+    done = models.BooleanField('Завершено', default=False)
+    updated = models.DateTimeField('Обновлено', auto_now=True)
+
+    class Meta:
+        verbose_name = 'Контрольная точка заполнения'
+        verbose_name_plural = 'Контрольные точки заполнения'
+
+    def __str__(self):
+        return f'{self.name}: {self.last_pk}'
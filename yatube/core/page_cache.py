@@ -0,0 +1,66 @@
+"""Кеш целых страниц для анонимных читателей.
+
+Ключ страницы включает номер поколения: запись поста, комментария или
+подписки увеличивает его, и все сохранённые страницы разом становятся
+недоступны, а старые записи вытесняются по PAGE_CACHE_TIMEOUT.
+
+С LocMemCache и поколение, и страницы свои в каждом процессе: запись
+в одном обработчике не сбрасывает страницы других, и там они устаревают
+не дольше чем на PAGE_CACHE_TIMEOUT. Поэтому срок короткий; общий
+для всех процессов сброс даёт только общий кеш (Redis, Memcached).
+"""
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.urls import Resolver404, resolve
+
+GENERATION_KEY = 'pagecache:generation'
+
+
+def generation():
+    value = cache.get(GENERATION_KEY)
+    if value is None:
+        cache.add(GENERATION_KEY, 1, None)
+        value = cache.get(GENERATION_KEY, 1)
+    return value
+
+
+def invalidate_pages():
+    """Сбрасывает все сохранённые страницы."""
+    try:
+        cache.incr(GENERATION_KEY)
+    except ValueError:
+        cache.add(GENERATION_KEY, 1, None)
+
+
+def page_key(request):
+    digest = hashlib.md5(request.get_full_path().encode()).hexdigest()
+    return f'pagecache:{generation()}:{digest}'
+
+
+def is_cached_view(request):
+    """Относится ли путь к представлениям из PAGE_CACHE_VIEWS."""
+    try:
+        match = resolve(request.path_info)
+    except Resolver404:
+        return False
+    return match.view_name in settings.PAGE_CACHE_VIEWS
+
+
+def is_cacheable_request(request):
+    """GET без cookie сессии, сообщений и закрепления за основной базой."""
+    if request.method not in ('GET', 'HEAD'):
+        return False
+    return not any(
+        name in request.COOKIES for name in settings.PAGE_CACHE_BYPASS_COOKIES
+    )
+
+
+def is_cacheable_response(response):
+    return (
+        response.status_code == 200
+        and not response.streaming
+        and not response.cookies
+        and 'no-store' not in response.get('Cache-Control', '')
+    )
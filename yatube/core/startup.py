@@ -0,0 +1,156 @@
+"""Подготовка процесса к обслуживанию запросов и замер её стоимости.
+
+start() вызывают yatube/wsgi.py и yatube/asgi.py. С PRELOAD процесс
+заранее импортирует тяжёлые модули (PIL и его форматы, движок и
+хранилище sorl), компилирует шаблоны и строит таблицы URL. Под
+сервером, который загружает приложение в главном процессе до fork
+(gunicorn --preload, uwsgi без lazy-apps), это делается один раз:
+обработчики стартуют готовыми, а общие страницы памяти не копируются,
+потому что перед fork соединения с базой закрываются, а объекты
+исключаются из сборки мусора (gc.freeze), которая иначе трогала бы
+их заголовки.
+
+measure() выполняется в отдельном процессе командой profile_startup
+и замеряет этапы запуска по отдельности. Модуль импортирует Django
+только внутри функций, чтобы не искажать замер.
+"""
+import gc
+import json
+import math
+import sys
+import time
+
+# Этапы прогрева, которые не обращаются к базе и кешу
+PRELOAD_STAGES = ('templates', 'urls')
+
+
+def preload():
+    """Импорт тяжёлых модулей и компиляция того, что иначе
+    достанется первому запросу каждого обработчика."""
+    from importlib import import_module
+
+    from django.conf import settings
+    from django.core.cache import DEFAULT_CACHE_ALIAS, caches
+    from django.utils import formats, translation
+    from PIL import Image
+    from sorl.thumbnail import default
+
+    modules = list(settings.PRELOAD_MODULES) + [
+        settings.SESSION_ENGINE,
+        settings.MESSAGE_STORAGE.rsplit('.', 1)[0],
+    ]
+    for name in modules:
+        import_module(name)
+    caches[DEFAULT_CACHE_ALIAS]
+    # Форматы дат языка сайта загружаются при первом выводе даты
+    with translation.override(settings.LANGUAGE_CODE):
+        formats.get_format('DATE_FORMAT')
+    # Форматы картинок PIL подгружает только при первом открытии файла
+    Image.init()
+    # Ленивые объекты sorl создаются при первом обращении
+    for lazy in (default.engine, default.kvstore, default.storage):
+        lazy.__class__
+    if not settings.WARMUP_ON_BOOT:
+        from .warmup import registered_stages
+        for name, func in registered_stages():
+            if name in PRELOAD_STAGES:
+                func(math.inf)
+
+
+def detach():
+    """Готовит главный процесс к fork обработчиков."""
+    from django.db import connections
+    connections.close_all()
+    gc.collect()
+    gc.freeze()
+
+
+def start():
+    from django.conf import settings
+
+    from .warmup import boot
+
+    if settings.PRELOAD:
+        preload()
+    boot()
+    if settings.PRELOAD:
+        detach()
+
+
+def timed(timings, name, func, *args):
+    started = time.perf_counter()
+    result = func(*args)
+    timings[name] = time.perf_counter() - started
+    return result
+
+
+def measure():
+    """Время этапов запуска и каждого приложения: импорт модуля,
+    импорт моделей, ready()."""
+    import resource
+
+    import django
+    from django.apps.config import AppConfig
+
+    phases = {}
+    apps = {}
+    create = AppConfig.create.__func__
+
+    def timed_create(cls, entry):
+        started = time.perf_counter()
+        config = create(cls, entry)
+        apps[config.label] = {'import': time.perf_counter() - started}
+        for step in ('import_models', 'ready'):
+            setattr(config, step, timed_step(config, step))
+        return config
+
+    def timed_step(config, step):
+        original = getattr(config, step)
+
+        def wrapper():
+            started = time.perf_counter()
+            original()
+            apps[config.label][step] = time.perf_counter() - started
+        return wrapper
+
+    AppConfig.create = classmethod(timed_create)
+    try:
+        timed(phases, 'setup', django.setup)
+    finally:
+        AppConfig.create = classmethod(create)
+
+    from django.core.wsgi import get_wsgi_application
+
+    from .warmup import compile_templates, populate_urls
+
+    timed(phases, 'middleware', get_wsgi_application)
+    timed(phases, 'urls', populate_urls, math.inf)
+    timed(phases, 'templates', compile_templates, math.inf)
+    timed(phases, 'preload', preload)
+    return {
+        'phases': phases,
+        'apps': apps,
+        'max_rss_kb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    }
+
+
+def parse_importtime(output):
+    """Строки -X importtime: список (модуль, собственное время,
+    общее время) в секундах."""
+    modules = []
+    for line in output.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        parts = line[len('import time:'):].split('|')
+        if len(parts) != 3 or not parts[0].strip().isdigit():
+            continue
+        modules.append((
+            parts[2].strip(),
+            int(parts[0]) / 1e6,
+            int(parts[1]) / 1e6,
+        ))
+    return modules
+
+
+if __name__ == '__main__':
+    json.dump(measure(), sys.stdout)
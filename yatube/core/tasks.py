@@ -0,0 +1,9 @@
+from tasks.registry import task
+
+from .edge import get_purger
+
+
+@task('core.edge_purge')
+def edge_purge(keys):
+    """Сбрасывает на прокси страницы с этими surrogate-ключами."""
+    get_purger().purge(keys)
@@ -0,0 +1,128 @@
+"""Замер времени отрисовки шаблонов Django по шаблонам и тегам.
+
+Внутри profiling() каждый вызов Template._render и каждого блочного
+тега ({% include %}, {% url %}, {% if %}, {% thumbnail %}...) засекается.
+Для шаблона и для тега считаются число вызовов, полное время и
+собственное время - без вложенных шаблонов или тегов соответственно.
+Тег определяется текстом внутри {% %}, поэтому отдельные include
+и условия видны по отдельности.
+
+Перехват ставится один раз при первом профилировании и вне
+profiling() только проверяет локальную для потока переменную.
+Отчёты даёт команда profile_templates, а при TEMPLATE_PROFILING -
+TemplateProfilingMiddleware для каждого запроса.
+"""
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+from django.template.base import Node, Template, TokenType
+
+_local = threading.local()
+_installed = False
+
+
+class Stat:
+    __slots__ = ('calls', 'total', 'own')
+
+    def __init__(self):
+        self.calls = 0
+        self.total = 0.0
+        self.own = 0.0
+
+
+class TemplateProfile:
+    """Время отрисовки, накопленное за один или несколько запросов."""
+
+    def __init__(self):
+        self.templates = defaultdict(Stat)
+        self.tags = defaultdict(Stat)
+        self.stacks = {'templates': [], 'tags': []}
+
+    def timed(self, kind, key, func, *args):
+        stack = self.stacks[kind]
+        stack.append(0.0)
+        started = time.perf_counter()
+        try:
+            return func(*args)
+        finally:
+            elapsed = time.perf_counter() - started
+            nested = stack.pop()
+            stat = getattr(self, kind)[key]
+            stat.calls += 1
+            stat.total += elapsed
+            stat.own += elapsed - nested
+            if stack:
+                stack[-1] += elapsed
+
+    def render_time(self):
+        """Время во всех шаблонах: сумма их собственного времени."""
+        return sum(stat.own for stat in self.templates.values())
+
+    def report(self, limit=15, runs=1):
+        """Строки отчёта: самые дорогие шаблоны и теги по собственному
+        времени в миллисекундах на один прогон."""
+        lines = []
+        for title, table in (
+            ('Шаблоны', self.templates), ('Теги', self.tags)
+        ):
+            lines.append(
+                f'{title}: вызовов, всего мс, собственное мс'
+            )
+            rows = sorted(table.items(), key=lambda row: -row[1].own)
+            for key, stat in rows[:limit]:
+                lines.append('  {:6g} {:9.2f} {:9.2f}  {}'.format(
+                    stat.calls / runs, stat.total * 1000 / runs,
+                    stat.own * 1000 / runs, key,
+                ))
+        return lines
+
+
+def tag_label(node):
+    token = getattr(node, 'token', None)
+    if token is None or token.token_type != TokenType.BLOCK:
+        return None
+    label = ' '.join(token.contents.split())
+    return label if len(label) <= 80 else label[:77] + '...'
+
+
+def install():
+    """Ставит перехват отрисовки шаблонов и узлов, один раз."""
+    global _installed
+    if _installed:
+        return
+    render = Template._render
+    render_annotated = Node.render_annotated
+
+    def profiled_render(self, context):
+        profile = getattr(_local, 'profile', None)
+        if profile is None:
+            return render(self, context)
+        name = self.origin.template_name or self.origin.name
+        return profile.timed('templates', name, render, self, context)
+
+    def profiled_render_annotated(self, context):
+        profile = getattr(_local, 'profile', None)
+        label = profile and tag_label(self)
+        if label is None:
+            return render_annotated(self, context)
+        return profile.timed(
+            'tags', label, render_annotated, self, context
+        )
+
+    Template._render = profiled_render
+    Node.render_annotated = profiled_render_annotated
+    _installed = True
+
+
+@contextmanager
+def profiling(profile=None):
+    """Профилирует отрисовку шаблонов в текущем потоке."""
+    install()
+    profile = profile or TemplateProfile()
+    _local.profile = profile
+    try:
+        yield profile
+    finally:
+        _local.profile = None
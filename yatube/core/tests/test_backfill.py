@@ -0,0 +1,82 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+
+from core.backfill import Backfill, backfill
+from core.models import BackfillCheckpoint
+from posts.models import Post
+
+User = get_user_model()
+
+SEEN = []
+
+
+def remember(queryset):
+    ids = list(queryset.values_list('pk', flat=True))
+    SEEN.extend(ids)
+    return len(ids)
+
+
+@backfill('tests.remember')
+def remember_posts(**options):
+    options.setdefault('duty_cycle', 1)
+    return Backfill('tests.remember', Post.objects.all(), remember, **options)
+
+
+class BackfillTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        author = User.objects.create_user(username='author')
+        Post.objects.bulk_create(
+            Post(author=author, text=f'Пост {i}') for i in range(10)
+        )
+
+    def setUp(self):
+        SEEN.clear()
+
+    def job(self, **options):
+        options.setdefault('chunk_size', 3)
+        options.setdefault('duty_cycle', 1)
+        return Backfill('tests.posts', Post.objects.all(), remember, **options)
+
+    def test_resumes_from_checkpoint(self):
+        """Прерванное заполнение продолжается и обходит каждую строку
+        ровно один раз."""
+        self.assertEqual(self.job(min_chunk_size=3, max_chunk_size=3)
+                         .run(limit=2), 6)
+        checkpoint = BackfillCheckpoint.objects.get(name='tests.posts')
+        self.assertEqual(checkpoint.last_pk, SEEN[-1])
+        self.assertEqual(self.job().run(), 4)
+        self.assertEqual(
+            sorted(SEEN), sorted(Post.objects.values_list('pk', flat=True))
+        )
+        self.assertEqual(len(SEEN), len(set(SEEN)))
+        self.assertTrue(
+            BackfillCheckpoint.objects.get(name='tests.posts').done
+        )
+        self.assertEqual(self.job().run(), 0)
+
+    def test_progress_reports_eta(self):
+        """После каждой порции сообщается прогресс до 100%."""
+        reports = []
+        self.job(progress=reports.append).run()
+        self.assertAlmostEqual(reports[-1].percent, 100)
+        self.assertEqual(reports[-1].eta, 0)
+
+    def test_chunk_size_adapts_to_latency(self):
+        """Быстрые порции увеличиваются, медленные - уменьшаются."""
+        job = self.job(chunk_size=100, duty_cycle=1)
+        job.adapt(0.01)
+        self.assertEqual(job.chunk_size, 200)
+        job.adapt(10)
+        self.assertEqual(job.chunk_size, 100)
+
+    def test_command(self):
+        """Команда запускает зарегистрированное заполнение."""
+        out = StringIO()
+        call_command('backfill', 'tests.remember', stdout=out)
+        self.assertIn('обработано строк 10', out.getvalue())
+        self.assertEqual(len(SEEN), 10)
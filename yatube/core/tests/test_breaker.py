@@ -0,0 +1,139 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from core.db.breaker import CircuitBreaker, get_breaker, reset_breaker
+from core.page_cache import invalidate_pages
+from posts.models import Post
+
+User = get_user_model()
+
+
+class FakeClock:
+    now = 0
+
+    def __call__(self):
+        return self.now
+
+
+class CircuitBreakerTests(TestCase):
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.breaker = CircuitBreaker(
+            window=10, min_samples=4, cooldown=5, clock=self.clock,
+        )
+
+    def trip(self):
+        for _ in range(4):
+            self.breaker.record(0.01, True)
+
+    def test_opens_on_errors(self):
+        """Автомат размыкается, когда ошибок в окне много."""
+        for _ in range(3):
+            self.breaker.record(0.01, True)
+        self.assertTrue(self.breaker.allow_request())
+        self.breaker.record(0.01, False)
+        self.assertFalse(self.breaker.allow_request())
+
+    def test_opens_on_slow_queries(self):
+        """Автомат размыкается и от медленных запросов."""
+        for _ in range(4):
+            self.breaker.record(5, False)
+        self.assertEqual(self.breaker.state, CircuitBreaker.OPEN)
+
+    def test_probe_after_cooldown(self):
+        """После cooldown проходит один пробный запрос."""
+        self.trip()
+        self.clock.now = 5
+        self.assertTrue(self.breaker.allow_request())
+        self.assertFalse(self.breaker.allow_request())
+        self.breaker.request_finished(failed=False)
+        self.assertEqual(self.breaker.state, CircuitBreaker.CLOSED)
+        self.assertTrue(self.breaker.allow_request())
+
+    def test_failed_probe_reopens(self):
+        """Неудачный пробный запрос снова размыкает автомат."""
+        self.trip()
+        self.clock.now = 5
+        self.breaker.allow_request()
+        self.breaker.request_finished(failed=True)
+        self.assertFalse(self.breaker.allow_request())
+        self.clock.now = 10
+        self.assertTrue(self.breaker.allow_request())
+
+
+class CircuitBreakerMiddlewareTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='steady')
+        cls.post = Post.objects.create(author=cls.user, text='Надёжный пост')
+
+    def setUp(self):
+        cache.clear()
+        reset_breaker()
+        self.addCleanup(reset_breaker)
+        self.url = reverse('posts:profile', args=(self.user.username,))
+
+    def trip(self):
+        breaker = get_breaker()
+        for _ in range(settings.CIRCUIT_BREAKER['min_samples']):
+            breaker.record(0, True)
+        invalidate_pages()
+
+    def test_open_breaker_serves_stale_page(self):
+        """При разомкнутом автомате страница отдаётся из последней
+        удачной отрисовки без обращения к базе."""
+        self.client.get(self.url)
+        self.trip()
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url)
+        self.assertContains(response, 'Надёжный пост')
+        self.assertEqual(response['X-Stale'], '1')
+        self.assertNotIn('Surrogate-Key', response)
+        self.assertEqual(response['Cache-Control'], 'no-store')
+
+    def test_open_breaker_rejects_writes(self):
+        """Запись при разомкнутом автомате получает понятный 503."""
+        client = Client()
+        client.force_login(self.user)
+        self.trip()
+        response = client.post(
+            reverse('posts:add_comment', args=(self.post.pk,)),
+            {'text': 'Не дойдёт'},
+        )
+        self.assertEqual(response.status_code, 503)
+        self.assertIn('Retry-After', response)
+        self.assertContains(
+            response, 'сохранить изменения сейчас нельзя', status_code=503,
+        )
+
+    def test_open_breaker_without_copy_returns_503(self):
+        """Страницу без сохранённой копии отдать нечем."""
+        self.trip()
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 503)
+
+    @override_settings(CIRCUIT_BREAKER={
+        **settings.CIRCUIT_BREAKER, 'slow_query': -1, 'min_samples': 1,
+    })
+    def test_slow_database_trips_breaker(self):
+        """Медленные запросы в ответе размыкают автомат."""
+        reset_breaker()
+        self.client.get(self.url)
+        self.assertEqual(get_breaker().state, CircuitBreaker.OPEN)
+
+    @override_settings(CIRCUIT_BREAKER={
+        **settings.CIRCUIT_BREAKER, 'cooldown': 0,
+    })
+    def test_recovers_after_successful_probe(self):
+        """Удачный пробный запрос замыкает автомат."""
+        reset_breaker()
+        self.trip()
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('X-Stale', response)
+        self.assertEqual(get_breaker().state, CircuitBreaker.CLOSED)
@@ -0,0 +1,129 @@
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import transaction
+from django.test import (
+    Client, TestCase, TransactionTestCase, override_settings,
+)
+from django.urls import reverse
+
+from posts.models import Comment, Group, Post
+
+User = get_user_model()
+
+
+class PurgeRecorder(BaseHTTPRequestHandler):
+    """Заглушка прокси: запоминает ключи из запросов PURGE."""
+    requests = []
+
+    def do_PURGE(self):
+        self.requests.append(self.headers['Surrogate-Key'].split())
+        self.send_response(200)
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+class EdgeHeadersTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='edge')
+        cls.group = Group.objects.create(
+            title='Край', slug='edge', description='-',
+        )
+        cls.post = Post.objects.create(
+            author=cls.user, group=cls.group, text='Пост',
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def test_guest_pages_are_public_with_keys(self):
+        """Гостевые страницы помечены ключами и открыты для прокси."""
+        pages = {
+            reverse('posts:index'): 'index',
+            reverse('posts:group_list', args=(self.group.slug,)):
+                f'group-{self.group.pk}',
+            reverse('posts:profile', args=(self.user.username,)):
+                f'author-{self.user.pk}',
+            reverse('posts:post_detail', args=(self.post.pk,)):
+                f'post-{self.post.pk}',
+        }
+        for url, key in pages.items():
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                keys = response['Surrogate-Key'].split()
+                self.assertIn(key, keys)
+                self.assertIn(f'post-{self.post.pk}', keys)
+                self.assertIn('public', response['Cache-Control'])
+                self.assertIn('s-maxage', response['Cache-Control'])
+                self.assertIn('Cookie', response['Vary'])
+
+    def test_logged_in_pages_are_private(self):
+        """Страницы вошедшего пользователя прокси не кеширует."""
+        client = Client()
+        client.force_login(self.user)
+        response = client.get(reverse('posts:index'))
+        self.assertIn('private', response['Cache-Control'])
+
+    def test_other_pages_have_no_edge_headers(self):
+        """Страницы без ключей заголовков кеширования не получают."""
+        response = self.client.get(reverse('about:author'))
+        self.assertNotIn('Surrogate-Key', response)
+
+
+class EdgePurgeTests(TransactionTestCase):
+
+    def setUp(self):
+        cache.clear()
+        PurgeRecorder.requests = []
+        self.server = HTTPServer(('127.0.0.1', 0), PurgeRecorder)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+        url = f'http://127.0.0.1:{self.server.server_port}/'
+        settings = override_settings(
+            EDGE_PURGER='core.edge.HTTPPurger',
+            EDGE_PURGER_OPTIONS={'url': url},
+            TASKS_ALWAYS_EAGER=True,
+        )
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+    def test_transaction_purged_in_one_request(self):
+        """Все ключи транзакции уходят на прокси одним запросом."""
+        user = User.objects.create_user(username='writer')
+        PurgeRecorder.requests = []
+        with transaction.atomic():
+            post = Post.objects.create(author=user, text='Новый пост')
+            Comment.objects.create(post=post, author=user, text='Ответ')
+        self.assertEqual(
+            PurgeRecorder.requests,
+            [sorted(['index', f'author-{user.pk}', f'post-{post.pk}'])],
+        )
+
+    def test_purge_after_rolled_back_transaction(self):
+        """После отката следующая транзакция всё равно очищает ключи."""
+        user = User.objects.create_user(username='retry')
+        PurgeRecorder.requests = []
+        with self.assertRaises(RuntimeError):
+            with transaction.atomic():
+                Post.objects.create(author=user, text='Откат')
+                raise RuntimeError
+        self.assertEqual(PurgeRecorder.requests, [])
+        with transaction.atomic():
+            post = Post.objects.create(author=user, text='Фиксация')
+        self.assertEqual(len(PurgeRecorder.requests), 1)
+        self.assertIn(f'post-{post.pk}', PurgeRecorder.requests[0])
+
+    def test_comment_purges_only_its_post(self):
+        """Комментарий сбрасывает только страницы своего поста."""
+        user = User.objects.create_user(username='reader')
+        post = Post.objects.create(author=user, text='Пост')
+        PurgeRecorder.requests = []
+        Comment.objects.create(post=post, author=user, text='Ответ')
+        self.assertEqual(PurgeRecorder.requests, [[f'post-{post.pk}']])
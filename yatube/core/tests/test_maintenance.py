@@ -0,0 +1,35 @@
+import os
+import sqlite3
+import tempfile
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TransactionTestCase
+
+from posts.models import Group
+
+
+class MaintainDbCommandTests(TransactionTestCase):
+
+    def test_backup_and_maintenance_steps_reported(self):
+        """Команда делает копию базы и сообщает время каждого шага."""
+        Group.objects.create(title='Группа', slug='backup', description='-')
+        out = StringIO()
+        with tempfile.TemporaryDirectory() as directory:
+            call_command(
+                'maintain_db', backup_dir=directory, pages=1, sleep=0,
+                stdout=out,
+            )
+            backups = os.listdir(directory)
+            self.assertEqual(len(backups), 1)
+            connection = sqlite3.connect(os.path.join(directory, backups[0]))
+            slugs = connection.execute(
+                'SELECT slug FROM posts_group'
+            ).fetchall()
+            connection.close()
+        self.assertEqual(slugs, [('backup',)])
+        report = out.getvalue()
+        for step in ('резервная копия', 'incremental vacuum', 'ANALYZE',
+                     'PRAGMA optimize'):
+            with self.subTest(step=step):
+                self.assertIn(step, report)
@@ -0,0 +1,61 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from posts.models import Comment, Post
+
+User = get_user_model()
+
+
+class AnonymousPageCacheTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='author')
+        cls.post = Post.objects.create(author=cls.user, text='Первый пост')
+
+    def setUp(self):
+        cache.clear()
+        self.url = reverse('posts:index')
+
+    def test_repeated_anonymous_request_skips_database(self):
+        """Повторная страница для гостя отдаётся из кеша без запросов."""
+        self.assertEqual(self.client.get(self.url)['X-Page-Cache'], 'miss')
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url)
+        self.assertEqual(response['X-Page-Cache'], 'hit')
+        self.assertContains(response, 'Первый пост')
+
+    def test_query_string_is_part_of_key(self):
+        """Разные страницы ленты кешируются отдельно."""
+        self.client.get(self.url)
+        response = self.client.get(self.url, {'page': 2})
+        self.assertEqual(response['X-Page-Cache'], 'miss')
+
+    def test_logged_in_user_bypasses_cache(self):
+        """С cookie сессии страница всегда рисуется заново."""
+        client = Client()
+        client.force_login(self.user)
+        client.get(self.url)
+        response = client.get(self.url)
+        self.assertNotIn('X-Page-Cache', response)
+
+    def test_writes_invalidate_pages(self):
+        """Новый пост или комментарий сбрасывает сохранённые страницы."""
+        # На index есть свой фрагментный кеш, поэтому проверяем профиль
+        profile = reverse('posts:profile', args=(self.user.username,))
+        detail = reverse('posts:post_detail', args=(self.post.pk,))
+        self.client.get(profile)
+        self.client.get(detail)
+        Post.objects.create(author=self.user, text='Второй пост')
+        self.assertContains(self.client.get(profile), 'Второй пост')
+        Comment.objects.create(
+            post=self.post, author=self.user, text='Свежий комментарий',
+        )
+        self.assertContains(self.client.get(detail), 'Свежий комментарий')
+
+    def test_only_listed_views_are_cached(self):
+        """Страницы вне PAGE_CACHE_VIEWS не кешируются."""
+        response = self.client.get(reverse('about:author'))
+        self.assertNotIn('X-Page-Cache', response)
@@ -0,0 +1,83 @@
+import os
+import sqlite3
+import tempfile
+
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+
+from core.db import routers
+from core.db.replication import copy_database
+from core.middleware import ReplicaPinMiddleware
+from posts.models import Post
+
+DATABASES_WITH_REPLICA = {
+    'default': {'ENGINE': 'django.db.backends.sqlite3', 'NAME': 'a'},
+    'replica': {'ENGINE': 'django.db.backends.sqlite3', 'NAME': 'b'},
+}
+
+
+@override_settings(DATABASES=DATABASES_WITH_REPLICA)
+class ReplicaRouterTests(SimpleTestCase):
+
+    def setUp(self):
+        self.router = routers.PrimaryReplicaRouter()
+        self.factory = RequestFactory()
+
+    def run_view(self, request, view):
+        middleware = ReplicaPinMiddleware(routers.use_replica(view))
+        return middleware(request)
+
+    def test_marked_view_reads_from_replica(self):
+        """Помеченное представление читает с реплики."""
+        seen = []
+
+        def view(request):
+            seen.append(self.router.db_for_read(Post))
+            return HttpResponse()
+
+        self.run_view(self.factory.get('/'), view)
+        self.assertEqual(seen, ['replica'])
+        self.assertIsNone(self.router.db_for_read(Post))
+
+    def test_write_pins_user_to_primary(self):
+        """После записи следующий запрос читает из основной базы."""
+        def write_view(request):
+            self.assertEqual(self.router.db_for_write(Post), 'default')
+            return HttpResponse()
+
+        response = self.run_view(self.factory.post('/create/'), write_view)
+        cookie = response.cookies[ReplicaPinMiddleware.cookie_name].value
+
+        seen = []
+
+        def read_view(request):
+            seen.append(self.router.db_for_read(Post))
+            return HttpResponse()
+
+        request = self.factory.get('/profile/auth/')
+        request.COOKIES[ReplicaPinMiddleware.cookie_name] = cookie
+        self.run_view(request, read_view)
+        self.assertEqual(seen, [None])
+
+    def test_replica_is_not_migrated(self):
+        """Миграции применяются только к основной базе."""
+        self.assertTrue(self.router.allow_migrate('default', 'posts'))
+        self.assertFalse(self.router.allow_migrate('replica', 'posts'))
+
+
+class ReplicationStandInTests(SimpleTestCase):
+
+    def test_copy_database_replicates_rows(self):
+        """Копия основной базы содержит записанные строки."""
+        with tempfile.TemporaryDirectory() as directory:
+            primary = os.path.join(directory, 'primary.sqlite3')
+            replica = os.path.join(directory, 'replica.sqlite3')
+            with sqlite3.connect(primary) as connection:
+                connection.execute('CREATE TABLE post (text TEXT)')
+                connection.execute("INSERT INTO post VALUES ('пост')")
+            connection.close()
+            copy_database(primary, replica)
+            connection = sqlite3.connect(replica)
+            rows = connection.execute('SELECT text FROM post').fetchall()
+            connection.close()
+        self.assertEqual(rows, [('пост',)])
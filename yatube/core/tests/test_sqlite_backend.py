@@ -0,0 +1,93 @@
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import SimpleTestCase, TestCase
+
+from core.db.backends.sqlite3.base import (
+    Database, DatabaseWrapper, retry_on_busy,
+)
+
+
+class SQLiteBackendTests(TestCase):
+
+    def test_pragmas_applied_to_connection(self):
+        """Новое соединение получает настройки из боевого профиля."""
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA synchronous')
+            self.assertEqual(cursor.fetchone()[0], 1)
+            cursor.execute('PRAGMA temp_store')
+            self.assertEqual(cursor.fetchone()[0], 2)
+
+    def test_wal_is_opt_in(self):
+        """WAL, который меняет файл базы, включается только флагом."""
+        for options, expected in (({}, None), ({'wal': True}, 'WAL')):
+            with self.subTest(options=options):
+                wrapper = DatabaseWrapper({
+                    **connection.settings_dict, 'OPTIONS': options,
+                })
+                wrapper.get_connection_params()
+                self.assertEqual(
+                    wrapper.pragmas.get('journal_mode'), expected
+                )
+
+
+class RetryOnBusyTests(SimpleTestCase):
+
+    @mock.patch('core.db.backends.sqlite3.base.time.sleep')
+    def test_retries_until_success(self, sleep):
+        """При блокировке запрос повторяется с паузой."""
+        func = mock.Mock(side_effect=[
+            Database.OperationalError('database is locked'),
+            Database.OperationalError('database is locked'),
+            'ok',
+        ])
+        self.assertEqual(retry_on_busy(func), 'ok')
+        self.assertEqual(func.call_count, 3)
+        self.assertEqual(sleep.call_count, 2)
+
+    @mock.patch('core.db.backends.sqlite3.base.random.uniform', lambda *a: 1)
+    @mock.patch('core.db.backends.sqlite3.base.time.sleep')
+    def test_gives_up_after_max_wait(self, sleep):
+        """Когда следующая пауза выходит за max_wait, ошибка
+        пробрасывается."""
+        func = mock.Mock(
+            side_effect=Database.OperationalError('database is locked')
+        )
+        with self.assertRaises(Database.OperationalError):
+            retry_on_busy(func, max_wait=0.12, backoff=0.05)
+        self.assertEqual(func.call_count, 3)
+        self.assertEqual(
+            [call.args[0] for call in sleep.call_args_list], [0.05, 0.1]
+        )
+
+    @mock.patch('core.db.backends.sqlite3.base.time.sleep')
+    def test_not_retried_inside_atomic(self, sleep):
+        """Внутри транзакции блокировка не повторяется."""
+        func = mock.Mock(
+            side_effect=Database.OperationalError('database is locked')
+        )
+        db = mock.Mock(in_atomic_block=True)
+        with self.assertRaises(Database.OperationalError):
+            retry_on_busy(func, db)
+        self.assertEqual(func.call_count, 1)
+        sleep.assert_not_called()
+
+    def test_other_errors_are_not_retried(self):
+        """Прочие ошибки базы не повторяются."""
+        func = mock.Mock(
+            side_effect=Database.OperationalError('no such table: x')
+        )
+        with self.assertRaises(Database.OperationalError):
+            retry_on_busy(func)
+        self.assertEqual(func.call_count, 1)
+
+    def test_bench_command_reports_both_profiles(self):
+        """Бенчмарк выводит строку для каждого профиля."""
+        out = StringIO()
+        call_command(
+            'bench_sqlite', duration=0.2, rows=10, readers=1, writers=1,
+            stdout=out,
+        )
+        self.assertEqual(len(out.getvalue().splitlines()), 2)
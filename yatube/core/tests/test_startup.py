@@ -0,0 +1,42 @@
+import gc
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.test import SimpleTestCase, override_settings
+from PIL import Image
+
+from ..startup import parse_importtime, start
+
+IMPORTTIME = """\
+import time: self [us] | cumulative | imported package
+import time:       120 |        120 |     _json
+import time:      1500 |       1620 |   json
+some unrelated line
+"""
+
+
+class StartupTests(SimpleTestCase):
+
+    def test_parse_importtime(self):
+        self.assertEqual(parse_importtime(IMPORTTIME), [
+            ('_json', 0.00012, 0.00012),
+            ('json', 0.0015, 0.00162),
+        ])
+
+    @override_settings(PRELOAD=True, WARMUP_ON_BOOT=False)
+    def test_preload_before_fork(self):
+        """Предзагрузка подгружает форматы PIL и замораживает объекты
+        перед fork."""
+        with mock.patch.object(gc, 'freeze') as freeze:
+            start()
+        freeze.assert_called_once_with()
+        self.assertEqual(Image._initialized, 2)
+
+    def test_profile_startup_command(self):
+        out = StringIO()
+        call_command('profile_startup', top=3, stdout=out)
+        output = out.getvalue()
+        self.assertIn('setup', output)
+        self.assertIn('posts', output)
+        self.assertIn('Самые долгие импорты', output)
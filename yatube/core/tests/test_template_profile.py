@@ -0,0 +1,50 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.template import Context, Template
+from django.test import Client, TestCase, override_settings
+
+from ..template_profile import profiling
+
+
+class TemplateProfileTests(TestCase):
+
+    def test_tags_and_templates_timed(self):
+        """Вложенный тег учитывается в полном времени внешнего,
+        но не в его собственном."""
+        template = Template(
+            '{% if show %}{% url "posts:index" %}{% endif %}{{ show }}'
+        )
+        with profiling() as profile:
+            template.render(Context({'show': True}))
+            template.render(Context({'show': True}))
+        outer = profile.tags['if show']
+        inner = profile.tags['url "posts:index"']
+        self.assertEqual((outer.calls, inner.calls), (2, 2))
+        self.assertAlmostEqual(outer.own, outer.total - inner.total)
+        self.assertEqual(len(profile.templates), 1)
+
+    def test_rendering_outside_profiling_not_recorded(self):
+        template = Template('{% if show %}-{% endif %}')
+        with profiling() as profile:
+            pass
+        template.render(Context({'show': True}))
+        self.assertFalse(profile.tags)
+
+    @override_settings(TEMPLATE_PROFILING=True)
+    def test_middleware_reports_request(self):
+        with self.assertLogs('core.middleware', 'INFO') as logs:
+            response = Client().get('/about/tech/')
+        self.assertTrue(response['Server-Timing'].startswith('templates;'))
+        self.assertIn('about:tech', logs.output[0])
+        self.assertIn("include 'includes/header.html'", logs.output[0])
+
+    def test_middleware_off_by_default(self):
+        response = Client().get('/about/tech/')
+        self.assertNotIn('Server-Timing', response)
+
+    def test_profile_templates_command(self):
+        out = StringIO()
+        call_command('profile_templates', '/about/tech/', repeat=2, stdout=out)
+        self.assertIn('about/tech.html', out.getvalue())
+        self.assertIn('includes/header.html', out.getvalue())
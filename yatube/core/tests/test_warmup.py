@@ -0,0 +1,80 @@
+import os
+import tempfile
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from posts.heads import head_key
+from posts.models import Group, Post
+
+from .. import warmup
+
+User = get_user_model()
+
+
+class WarmUpTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='early')
+        cls.group = Group.objects.create(
+            title='Прогрев', slug='warm', description='-',
+        )
+        Post.objects.create(author=cls.user, group=cls.group, text='Пост')
+
+    def setUp(self):
+        cache.clear()
+        warmup._ready.clear()
+
+    def test_all_stages_fill_caches(self):
+        """Прогрев строит начала лент и кеширует первые страницы."""
+        received = []
+
+        def receiver(report, **kwargs):
+            received.append(report)
+
+        warmup.warmed_up.connect(receiver)
+        self.addCleanup(warmup.warmed_up.disconnect, receiver)
+        report = warmup.warm_up(budget=60)
+        self.assertEqual(
+            [result.name for result in report],
+            ['templates', 'urls', 'heads', 'entities', 'pages',
+             'thumbnails'],
+        )
+        self.assertTrue(all(result.done for result in report))
+        self.assertTrue(warmup.is_ready())
+        self.assertEqual(received, [report])
+        self.assertIsNotNone(cache.get(head_key(self.group.pk)))
+        response = self.client.get(
+            reverse('posts:group_list', args=(self.group.slug,))
+        )
+        self.assertEqual(response['X-Page-Cache'], 'hit')
+
+    def test_exhausted_budget_skips_stages(self):
+        """Без бюджета этапы пропускаются, но процесс готов."""
+        report = warmup.warm_up(budget=0)
+        self.assertFalse(any(result.done for result in report))
+        self.assertTrue(warmup.is_ready())
+
+    def test_selected_stages_only(self):
+        report = warmup.warm_up(budget=60, names=['urls'])
+        self.assertEqual([result.name for result in report], ['urls'])
+
+    def test_ready_file_written(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'ready')
+            with override_settings(WARMUP_READY_FILE=path):
+                warmup.warm_up(budget=60, names=['urls'])
+            self.assertTrue(os.path.exists(path))
+
+    @override_settings(WARMUP_ON_BOOT=True)
+    def test_failed_boot_still_ready(self):
+        """Ошибка прогрева при старте не оставляет процесс неготовым."""
+        with mock.patch.object(
+            warmup, 'warm_up', side_effect=RuntimeError
+        ), self.assertLogs('core.warmup', 'ERROR'):
+            warmup.boot()
+        self.assertTrue(warmup.is_ready())
@@ -1,9 +1,23 @@
+from functools import lru_cache
+
+from django.http import HttpResponseNotFound
 from django.shortcuts import render
+from django.template.loader import render_to_string
+
+from .exceptions import KnownNotFound
+
+
+@lru_cache(maxsize=None)
+def light_not_found_body():
+    """Короткая страница 404, отрисованная один раз на процесс."""
+    return render_to_string('core/404_light.html')
 
 
 def page_not_found(request, exception):
     # Переменная exception содержит отладочную информацию;
     # выводить её в шаблон пользовательской страницы 404 мы не станем
+    if isinstance(exception, KnownNotFound):
+        return HttpResponseNotFound(light_not_found_body())
     return render(request, 'core/404.html', {'path': request.path}, status=404)
 
 
@@ -0,0 +1,185 @@
+"""Прогрев кешей после выкладки и при старте обработчика.
+
+warm_up() по очереди выполняет зарегистрированные этапы: компиляцию
+шаблонов, заполнение таблиц URL, затем этапы приложений из модулей
+warmup.py (кеш объектов, начала лент, первые страницы, миниатюры).
+Этап получает deadline и прекращает работу, когда общий бюджет времени
+исчерпан; оставшиеся этапы пропускаются. По окончании процесс считается
+готовым: is_ready() возвращает True, рассылается сигнал warmed_up
+и, если задан WARMUP_READY_FILE, создаётся файл для проверки готовности.
+
+LocMemCache свой в каждом процессе, поэтому прогревать его нужно при
+старте обработчика (WARMUP_ON_BOOT); команда manage.py warm_up
+заполняет только общие кеши: миниатюры, хранилище sorl и кеш,
+если он вынесен в отдельный сервер.
+"""
+import logging
+import os
+import threading
+import time
+from collections import namedtuple
+
+from django.conf import settings
+from django.core.handlers.base import BaseHandler
+from django.dispatch import Signal
+from django.template import TemplateDoesNotExist, TemplateSyntaxError, engines
+from django.test import RequestFactory
+from django.urls import get_resolver, reverse
+from django.utils.module_loading import autodiscover_modules
+
+logger = logging.getLogger(__name__)
+
+Result = namedtuple('Result', 'name seconds done')
+
+warmed_up = Signal(providing_args=['report'])
+
+_stages = {}
+_ready = threading.Event()
+
+
+def stage(name, order=100):
+    """Регистрирует этап прогрева; этапы идут по возрастанию order.
+
+    Функция этапа получает deadline (time.monotonic()) и возвращает
+    False, если не успела всё.
+    """
+    def decorator(func):
+        _stages[name] = (order, func)
+        return func
+    return decorator
+
+
+def registered_stages():
+    autodiscover_modules('warmup')
+    return [
+        (name, func)
+        for name, (order, func) in sorted(
+            _stages.items(), key=lambda item: item[1][0]
+        )
+    ]
+
+
+def in_time(deadline):
+    return time.monotonic() < deadline
+
+
+def is_ready():
+    return _ready.is_set()
+
+
+def mark_ready(report):
+    _ready.set()
+    if settings.WARMUP_READY_FILE:
+        with open(settings.WARMUP_READY_FILE, 'w') as file:
+            file.write(str(os.getpid()))
+    warmed_up.send(sender=None, report=report)
+
+
+def warm_up(budget=None, names=None):
+    """Выполняет этапы прогрева в пределах budget секунд.
+
+    Возвращает список Result по всем этапам; пропущенные из-за
+    бюджета этапы отмечены done=False с нулевым временем.
+    """
+    if budget is None:
+        budget = settings.WARMUP_BUDGET
+    deadline = time.monotonic() + budget
+    report = []
+    for name, func in registered_stages():
+        if names and name not in names:
+            continue
+        if not in_time(deadline):
+            report.append(Result(name, 0.0, False))
+            continue
+        started = time.monotonic()
+        done = func(deadline) is not False
+        report.append(Result(name, time.monotonic() - started, done))
+    mark_ready(report)
+    return report
+
+
+def boot():
+    """Прогрев при старте обработчика, если включён WARMUP_ON_BOOT.
+
+    Ошибка прогрева не мешает обслуживать запросы: процесс
+    объявляется готовым с холодными кешами.
+    """
+    if not settings.WARMUP_ON_BOOT:
+        return
+    try:
+        report = warm_up()
+    except Exception:
+        logger.exception('Прогрев кешей не удался')
+        mark_ready([])
+        return
+    for result in report:
+        logger.info(
+            'Прогрев %s: %.3f с%s', result.name, result.seconds,
+            '' if result.done else ', не завершён',
+        )
+
+
+def get_anonymous(path):
+    """Запрос гостя через весь стек middleware, как от прокси.
+
+    Заполняет те же кеши, что и обычный запрос, включая кеш страниц.
+    """
+    handler = BaseHandler()
+    handler.load_middleware()
+    request = RequestFactory(HTTP_HOST=settings.WARMUP_HOST).get(path)
+    return handler.get_response(request)
+
+
+def template_dirs(engine):
+    """Каталоги, из которых загрузчики движка берут шаблоны."""
+    if not hasattr(engine, 'engine'):
+        return list(engine.template_dirs)
+    directories = []
+    for loader in engine.engine.template_loaders:
+        for inner in getattr(loader, 'loaders', [loader]):
+            directories += inner.get_dirs()
+    return directories
+
+
+def template_names(directory):
+    for root, _, files in os.walk(directory):
+        for file_name in files:
+            if file_name.endswith(('.html', '.txt')):
+                yield os.path.relpath(
+                    os.path.join(root, file_name), directory
+                )
+
+
+@stage('templates', order=10)
+def compile_templates(deadline):
+    """Загружает все шаблоны проекта, а с ними и библиотеки тегов.
+
+    С кеширующим загрузчиком разобранные шаблоны остаются в памяти
+    процесса.
+    """
+    for engine in engines.all():
+        for directory in template_dirs(engine):
+            for name in template_names(str(directory)):
+                if not in_time(deadline):
+                    return False
+                try:
+                    engine.get_template(name)
+                except (TemplateDoesNotExist, TemplateSyntaxError):
+                    # Фрагменты вроде писем и чужие шаблоны
+                    # под другой движок пропускаем
+                    pass
+    from .views import light_not_found_body
+    light_not_found_body()
+
+
+@stage('urls', order=20)
+def populate_urls(deadline):
+    """Строит таблицы разбора и обратного разбора URL."""
+    resolver = get_resolver()
+    resolver.resolve('/')
+    reverse('posts:index')
+    for namespace in resolver.namespace_dict:
+        if not in_time(deadline):
+            return False
+        # Обращение к reverse_dict заполняет таблицу пространства имён
+        resolver.namespace_dict[namespace][1].reverse_dict
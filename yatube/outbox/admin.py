@@ -0,0 +1,17 @@
+from django.contrib import admin
+
+from .models import ConsumerCheckpoint, OutboxEvent
+
+
+class OutboxEventAdmin(admin.ModelAdmin):
+    list_display = ('pk', 'topic', 'object_id', 'action', 'created')
+    list_filter = ('topic', 'action')
+    empty_value_display = '-пусто-'
+
+
+class ConsumerCheckpointAdmin(admin.ModelAdmin):
+    list_display = ('consumer', 'offset', 'updated')
+
+
+admin.site.register(OutboxEvent, OutboxEventAdmin)
+admin.site.register(ConsumerCheckpoint, ConsumerCheckpointAdmin)
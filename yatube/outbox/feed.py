@@ -0,0 +1,122 @@
+"""Лента изменений: чтение событий outbox по смещениям.
+
+Потребитель читает события после своей контрольной точки, обрабатывает
+их и сдвигает точку через commit(). compact() удаляет события, которые
+уже прочитали все потребители; потребитель, не обновлявший точку дольше
+OUTBOX_CONSUMER_TIMEOUT, удаление не держит и теряет свою точку.
+"""
+from datetime import timedelta
+
+import json
+import threading
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core import serializers
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Max, Min
+from django.utils import timezone
+
+from .models import ConsumerCheckpoint, OutboxEvent
+
+_local = threading.local()
+
+
+@contextmanager
+def suppressed():
+    """Изменения внутри блока не попадают в ленту, например перенос
+    постов в архив, который для потребителей ничего не меняет."""
+    previous = getattr(_local, 'suppressed', False)
+    _local.suppressed = True
+    try:
+        yield
+    finally:
+        _local.suppressed = previous
+
+
+def record(instance, action, using='default', fields=None):
+    """Пишет событие об изменении instance в текущей транзакции.
+
+    fields - поля объекта в событии, по умолчанию все.
+    """
+    if getattr(_local, 'suppressed', False):
+        return
+    fields = serializers.serialize(
+        'python', [instance], fields=fields
+    )[0]['fields']
+    OutboxEvent.objects.using(using).create(
+        topic=instance._meta.label_lower,
+        object_id=instance.pk,
+        action=action,
+        payload=json.dumps(fields, cls=DjangoJSONEncoder, ensure_ascii=False),
+    )
+
+
+def checkpoint(consumer):
+    return (
+        ConsumerCheckpoint.objects.filter(consumer=consumer)
+        .values_list('offset', flat=True)
+        .first()
+    ) or 0
+
+
+def has_checkpoint(consumer):
+    """Есть ли у consumer контрольная точка: её нет у нового
+    потребителя и у того, чью точку удалил compact()."""
+    return ConsumerCheckpoint.objects.filter(consumer=consumer).exists()
+
+
+def read(consumer, limit=100, offset=None):
+    """Следующая порция событий после контрольной точки consumer."""
+    if offset is None:
+        offset = checkpoint(consumer)
+    return list(OutboxEvent.objects.filter(pk__gt=offset)[:limit])
+
+
+def commit(consumer, offset):
+    """Сдвигает контрольную точку consumer вперёд до offset.
+
+    Время обновления точки меняется и без новых событий: потребитель
+    жив, хотя читать ему нечего.
+    """
+    point, _ = ConsumerCheckpoint.objects.get_or_create(consumer=consumer)
+    point.offset = max(point.offset, offset)
+    point.save(update_fields=['offset', 'updated'])
+
+
+def compact():
+    """Удаляет события, прочитанные всеми живыми потребителями.
+
+    Точки, не обновлявшиеся дольше OUTBOX_CONSUMER_TIMEOUT, не держат
+    удаление; если удаляются непрочитанные такой точкой события, точка
+    удаляется, и потребитель по has_checkpoint() узнаёт о пропуске.
+    """
+    alive_since = timezone.now() - timedelta(
+        seconds=settings.OUTBOX_CONSUMER_TIMEOUT
+    )
+    alive = ConsumerCheckpoint.objects.filter(updated__gte=alive_since)
+    if alive.exists():
+        offset = alive.aggregate(offset=Min('offset'))['offset']
+    elif ConsumerCheckpoint.objects.exists():
+        # Живых потребителей нет, ждать некого
+        offset = OutboxEvent.objects.aggregate(offset=Max('pk'))['offset']
+    else:
+        offset = None
+    if not offset:
+        return 0
+    ConsumerCheckpoint.objects.filter(
+        updated__lt=alive_since, offset__lt=offset
+    ).delete()
+    deleted, _ = OutboxEvent.objects.filter(pk__lte=offset).delete()
+    return deleted
+
+
+def as_dict(event):
+    return {
+        'offset': event.pk,
+        'topic': event.topic,
+        'object_id': event.object_id,
+        'action': event.action,
+        'created': event.created.isoformat(),
+        'payload': json.loads(event.payload),
+    }
@@ -0,0 +1,44 @@
+import json
+import time
+
+from django.core.management.base import BaseCommand
+
+from outbox import feed
+
+
+class Command(BaseCommand):
+    help = (
+        'Выдаёт события ленты изменений после контрольной точки '
+        'потребителя в виде JSON-строк и сдвигает точку после каждой порции.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('consumer')
+        parser.add_argument('--batch-size', type=int, default=100)
+        parser.add_argument(
+            '--follow', action='store_true',
+            help='Ждать новых событий, а не завершаться.',
+        )
+        parser.add_argument('--poll-interval', type=float, default=1.0)
+        parser.add_argument(
+            '--no-commit', action='store_true',
+            help='Не сдвигать контрольную точку.',
+        )
+
+    def handle(self, *args, **options):
+        consumer = options['consumer']
+        offset = feed.checkpoint(consumer)
+        while True:
+            events = feed.read(consumer, options['batch_size'], offset)
+            for event in events:
+                self.stdout.write(
+                    json.dumps(feed.as_dict(event), ensure_ascii=False)
+                )
+            if events:
+                offset = events[-1].pk
+                if not options['no_commit']:
+                    feed.commit(consumer, offset)
+                continue
+            if not options['follow']:
+                break
+            time.sleep(options['poll_interval'])
@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+
+from outbox import feed
+
+
+class Command(BaseCommand):
+    help = 'Удаляет события ленты изменений, прочитанные всеми потребителями.'
+
+    def handle(self, *args, **options):
+        self.stdout.write(f'Удалено событий: {feed.compact()}')
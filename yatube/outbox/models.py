@@ -0,0 +1,48 @@
+from django.db import models
+
+from core.models import CreatedModel
+
+
+class OutboxEvent(CreatedModel):
+    """Изменение поста, комментария, подписки, группы или пользователя
+    для внешних потребителей.
+
+    Пишется в той же транзакции, что и само изменение; id события
+    служит смещением в ленте изменений.
+    """
+    CREATED = 'created'
+    UPDATED = 'updated'
+    DELETED = 'deleted'
+    ACTIONS = (
+        (CREATED, 'Создан'),
+        (UPDATED, 'Изменён'),
+        (DELETED, 'Удалён'),
+    )
+
+    topic = models.CharField('Тип объекта', max_length=50)
+    object_id = models.BigIntegerField('id объекта')
+    action = models.CharField('Действие', max_length=10, choices=ACTIONS)
+    payload = models.TextField('Данные (JSON)')
+
+    class Meta:
+        ordering = ('pk',)
+        verbose_name = 'Событие ленты изменений'
+        verbose_name_plural = 'События ленты изменений'
+
+    def __str__(self):
+        return f'{self.pk}: {self.topic} {self.object_id} {self.action}'
+
+
+class ConsumerCheckpoint(models.Model):
+    consumer = models.CharField('Потребитель', max_length=100, unique=True)
+    offset = models.BigIntegerField(
+        'Последнее обработанное событие', default=0
+    )
+    updated = models.DateTimeField('Обновлено', auto_now=True)
+
+    class Meta:
+        verbose_name = 'Контрольная точка потребителя'
+        verbose_name_plural = 'Контрольные точки потребителей'
+
+    def __str__(self):
+        return f'{self.consumer}: {self.offset}'
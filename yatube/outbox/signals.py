@@ -0,0 +1,41 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from posts.models import Comment, Follow, Group, Post, User
+
+from .feed import record
+from .models import OutboxEvent
+
+# Пароль, почта и служебные поля пользователя в ленту не попадают
+USER_FIELDS = ('username', 'first_name', 'last_name', 'is_active')
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_save, sender=Comment)
+@receiver(post_save, sender=Follow)
+@receiver(post_save, sender=Group)
+def model_saved(sender, instance, created, using, **kwargs):
+    action = OutboxEvent.CREATED if created else OutboxEvent.UPDATED
+    record(instance, action, using)
+
+
+@receiver(post_delete, sender=Post)
+@receiver(post_delete, sender=Comment)
+@receiver(post_delete, sender=Follow)
+@receiver(post_delete, sender=Group)
+def model_deleted(sender, instance, using, **kwargs):
+    record(instance, OutboxEvent.DELETED, using)
+
+
+@receiver(post_save, sender=User)
+def user_saved(sender, instance, created, using, update_fields, **kwargs):
+    # Вход пользователя меняет только last_login
+    if update_fields and set(update_fields) <= {'last_login'}:
+        return
+    action = OutboxEvent.CREATED if created else OutboxEvent.UPDATED
+    record(instance, action, using, USER_FIELDS)
+
+
+@receiver(post_delete, sender=User)
+def user_deleted(sender, instance, using, **kwargs):
+    record(instance, OutboxEvent.DELETED, using, USER_FIELDS)
@@ -0,0 +1,131 @@
+import json
+from datetime import timedelta
+from io import StringIO
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import transaction
+from django.test import Client, TestCase, TransactionTestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from outbox import feed
+from outbox.models import ConsumerCheckpoint, OutboxEvent
+from posts.models import Follow, Post
+
+User = get_user_model()
+
+
+class OutboxTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='writer')
+        cls.reader = User.objects.create_user(username='reader')
+
+    def setUp(self):
+        OutboxEvent.objects.all().delete()
+        self.client = Client()
+        self.client.force_login(self.reader)
+
+    def test_changes_written_to_outbox(self):
+        """Создание, правка и удаление поста попадают в ленту по порядку."""
+        post = Post.objects.create(author=self.user, text='Первый')
+        post.text = 'Исправленный'
+        post.save()
+        post_id = post.pk
+        post.delete()
+        events = feed.read('test')
+        self.assertEqual(
+            [(e.topic, e.object_id, e.action) for e in events],
+            [
+                ('posts.post', post_id, OutboxEvent.CREATED),
+                ('posts.post', post_id, OutboxEvent.UPDATED),
+                ('posts.post', post_id, OutboxEvent.DELETED),
+            ],
+        )
+        self.assertEqual(
+            json.loads(events[1].payload)['text'], 'Исправленный'
+        )
+
+    def test_follow_view_emits_event(self):
+        """Подписка через страницу пишет событие о Follow."""
+        self.client.get(
+            reverse('posts:profile_follow', args=(self.user.username,))
+        )
+        event = OutboxEvent.objects.get()
+        self.assertEqual(event.topic, 'posts.follow')
+        self.assertEqual(
+            event.object_id,
+            Follow.objects.get(user=self.reader, author=self.user).pk,
+        )
+
+    def test_checkpoints_and_compaction(self):
+        """Потребитель читает с контрольной точки, compact чистит общее."""
+        for i in range(3):
+            Post.objects.create(author=self.user, text=f'Пост {i}')
+        first, *rest = feed.read('search', limit=1)
+        self.assertEqual(rest, [])
+        feed.commit('search', first.pk)
+        feed.commit('mail', 0)
+        self.assertEqual(len(feed.read('search')), 2)
+        self.assertEqual(feed.compact(), 0)
+        feed.commit('mail', first.pk)
+        self.assertEqual(feed.compact(), 1)
+        self.assertEqual(OutboxEvent.objects.count(), 2)
+
+    def test_stale_checkpoint_does_not_block_compaction(self):
+        """Давно не обновлявшаяся точка не держит удаление и теряется."""
+        for i in range(2):
+            Post.objects.create(author=self.user, text=f'Пост {i}')
+        events = feed.read('search')
+        feed.commit('search', events[-1].pk)
+        feed.commit('forgotten', 0)
+        ConsumerCheckpoint.objects.filter(consumer='forgotten').update(
+            updated=timezone.now() - timedelta(
+                seconds=settings.OUTBOX_CONSUMER_TIMEOUT + 1
+            )
+        )
+        self.assertEqual(feed.compact(), 2)
+        self.assertFalse(feed.has_checkpoint('forgotten'))
+        self.assertTrue(feed.has_checkpoint('search'))
+
+    def test_user_events_hide_private_fields(self):
+        """События пользователя не содержат пароль и почту,
+        вход пользователя событий не пишет."""
+        user = User.objects.create_user(
+            username='new', email='new@example.com', password='secret'
+        )
+        self.client.force_login(user)
+        [event] = feed.read('test')
+        self.assertEqual(event.topic, 'auth.user')
+        self.assertEqual(
+            set(json.loads(event.payload)),
+            {'username', 'first_name', 'last_name', 'is_active'},
+        )
+
+    def test_change_feed_command(self):
+        """Команда выдаёт JSON-строки и сдвигает контрольную точку."""
+        Post.objects.create(author=self.user, text='Для индекса')
+        out = StringIO()
+        call_command('change_feed', 'indexer', stdout=out)
+        lines = out.getvalue().splitlines()
+        self.assertEqual(len(lines), 1)
+        self.assertEqual(
+            json.loads(lines[0])['payload']['text'], 'Для индекса'
+        )
+        self.assertEqual(feed.read('indexer'), [])
+
+
+class OutboxTransactionTests(TransactionTestCase):
+
+    def test_rolled_back_change_leaves_no_event(self):
+        """Событие откатывается вместе с изменением."""
+        user = User.objects.create_user(username='ghost')
+        OutboxEvent.objects.all().delete()
+        with self.assertRaises(RuntimeError):
+            with transaction.atomic():
+                Post.objects.create(author=user, text='Не сохранится')
+                raise RuntimeError
+        self.assertFalse(OutboxEvent.objects.exists())
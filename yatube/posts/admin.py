@@ -1,9 +1,39 @@
 from django.contrib import admin
+from django.db.models import Max
 
+from .cache import group_choices
+from .deletion import soft_delete_post
 from .models import Post, Group, Follow, Comment
+from .utils import LargeTablePaginator, pk_prefix_q, prefix_q
 
 
-class PostAdmin(admin.ModelAdmin):
+class LargeTableAdmin(admin.ModelAdmin):
+    """Настройки списка для больших таблиц: без COUNT(*) по всей
+    таблице и с выборкой страницы по первичному ключу."""
+    paginator = LargeTablePaginator
+    show_full_result_count = False
+    empty_value_display = '-пусто-'
+
+
+class SoftDeleteAdminMixin:
+    """Удаление из админки через soft_delete: объект сразу скрывается,
+    а связанные строки удаляет фоновая задача порциями."""
+    soft_delete = None
+
+    def get_deleted_objects(self, objs, request):
+        # Страница подтверждения не обходит каскад связанных строк.
+        return [str(obj) for obj in objs], {}, set(), []
+
+    def delete_model(self, request, obj):
+        self.soft_delete(obj)
+
+    def delete_queryset(self, request, queryset):
+        for obj in queryset:
+            self.soft_delete(obj)
+
+
+class PostAdmin(SoftDeleteAdminMixin, LargeTableAdmin):
+    soft_delete = staticmethod(soft_delete_post)
     list_display = (
         'pk',
         'text',
@@ -12,12 +42,71 @@ class PostAdmin(admin.ModelAdmin):
         'group',
     )
     list_editable = ('group',)
+    list_select_related = ('author', 'group')
     search_fields = ('text',)
     list_filter = ('pub_date',)
-    empty_value_display = '-пусто-'
+    date_hierarchy = 'pub_date'
+    autocomplete_fields = ('author',)
+
+    def get_search_results(self, request, queryset, search_term):
+        # Число ищем ещё и как префикс id по первичному ключу.
+        results, use_distinct = super().get_search_results(
+            request, queryset, search_term
+        )
+        term = search_term.strip()
+        if term.isascii() and term.isdecimal():
+            max_pk = Post.all_objects.aggregate(max_pk=Max('pk'))['max_pk']
+            results |= queryset.filter(pk_prefix_q(term, max_pk))
+        return results, use_distinct
+
+    def formfield_for_foreignkey(self, db_field, request, **kwargs):
+        formfield = super().formfield_for_foreignkey(
+            db_field, request, **kwargs
+        )
+        if db_field.name == 'group':
+            # Варианты берём из кеша, а не запросом на каждую строку.
+            formfield.choices = (
+                [('', formfield.empty_label)] + group_choices()
+            )
+        return formfield
+
+
+class CommentAdmin(LargeTableAdmin):
+    list_display = (
+        'pk',
+        'text',
+        'created',
+        'author',
+        'post',
+    )
+    list_select_related = ('author', 'post')
+    search_fields = ('text',)
+    autocomplete_fields = ('author', 'post')
+
+
+class FollowAdmin(LargeTableAdmin):
+    list_display = (
+        'pk',
+        'user',
+        'author',
+    )
+    list_select_related = ('user', 'author')
+    autocomplete_fields = ('user', 'author')
+
+
+class GroupAdmin(admin.ModelAdmin):
+    list_display = ('pk', 'title', 'slug')
+    search_fields = ('^title',)
+    prepopulated_fields = {'slug': ('title',)}
+
+    def get_search_results(self, request, queryset, search_term):
+        term = search_term.strip()
+        if not term:
+            return queryset, False
+        return queryset.filter(prefix_q('title', term)), False
 
 
 admin.site.register(Post, PostAdmin)
-admin.site.register(Group)
-admin.site.register(Comment)
-admin.site.register(Follow)
+admin.site.register(Group, GroupAdmin)
+admin.site.register(Comment, CommentAdmin)
+admin.site.register(Follow, FollowAdmin)
@@ -0,0 +1,104 @@
+"""Перенос старых постов с комментариями в архивные таблицы.
+
+Горячие таблицы Post и Comment и их индексы остаются маленькими, а
+post_detail и profile дочитывают архив, когда выходят за их пределы.
+"""
+from django.db import transaction
+from django.http import Http404
+
+from outbox import feed
+
+from .cache import get_post_or_404
+from .models import ArchivedComment, ArchivedPost, Comment, Post
+
+POST_FIELDS = (
+    'id', 'text', 'text_html', 'excerpt', 'pub_date', 'author_id',
+    'group_id', 'image',
+)
+COMMENT_FIELDS = ('id', 'text', 'author_id', 'post_id', 'created')
+
+
+def archive_batch(cutoff, batch_size):
+    """Переносит в архив до batch_size постов старше cutoff.
+
+    Всё делается одной короткой транзакцией; возвращает число
+    перенесённых постов. Пост остаётся доступен из архива, поэтому
+    удаление из горячих таблиц не пишется в ленту изменений.
+    """
+    with transaction.atomic(), feed.suppressed():
+        posts = list(
+            Post.objects.filter(pub_date__lt=cutoff)
+            .order_by('pk')
+            .values(*POST_FIELDS)[:batch_size]
+        )
+        if not posts:
+            return 0
+        ids = [post['id'] for post in posts]
+        comments = Comment.objects.filter(post_id__in=ids)
+        ArchivedPost.objects.bulk_create(
+            ArchivedPost(**post) for post in posts
+        )
+        ArchivedComment.objects.bulk_create(
+            ArchivedComment(**comment)
+            for comment in comments.values(*COMMENT_FIELDS)
+        )
+        comments.delete()
+        Post.objects.filter(pk__in=ids).delete()
+    return len(posts)
+
+
+def get_live_or_archived_post_or_404(post_id, *related):
+    """Пост по id из живой таблицы, а если его там нет - из архива.
+
+    Архивные посты отключённых пользователей не показываются, как
+    и их живые посты, помеченные на удаление. Возвращает пару (пост,
+    взят ли он из архива).
+    """
+    try:
+        post = get_post_or_404(
+            post_id, Post.objects.select_related(*related)
+        )
+        return post, False
+    except Http404:
+        post = get_post_or_404(
+            post_id,
+            ArchivedPost.objects.filter(
+                author__is_active=True
+            ).select_related(*related),
+        )
+        return post, True
+
+
+class ArchiveChain:
+    """Живые посты, а за ними архивные - как одна выборка для Paginator."""
+    ordered = True
+
+    def __init__(self, live, archived):
+        self.live = live
+        self.archived = archived
+
+    def count(self):
+        return self.live_count + self.archived.count()
+
+    def __len__(self):
+        return self.count()
+
+    @property
+    def live_count(self):
+        if not hasattr(self, '_live_count'):
+            self._live_count = self.live.count()
+        return self._live_count
+
+    def __getitem__(self, index):
+        if not isinstance(index, slice):
+            return self[index:index + 1][0]
+        start, stop = index.start or 0, index.stop
+        live_count = self.live_count
+        objects = []
+        if start < live_count:
+            objects += list(self.live[start:min(stop, live_count)])
+        if stop > live_count:
+            objects += list(
+                self.archived[max(start - live_count, 0):stop - live_count]
+            )
+        return objects
@@ -0,0 +1,35 @@
+from core.backfill import Backfill, backfill
+
+from .cache import invalidate_cards, invalidate_details
+from .models import ArchivedPost, Post
+from .utils import render_post_text
+
+
+def fill_text_html(queryset):
+    """Заполняет text_html и excerpt постов порции.
+
+    bulk_update() не вызывает post_save, поэтому карточки и страницы
+    постов порции сбрасываются здесь.
+    """
+    posts = list(queryset.select_related('author', 'group'))
+    for post in posts:
+        post.text_html, post.excerpt = render_post_text(post.text)
+    queryset.bulk_update(posts, ['text_html', 'excerpt'])
+    invalidate_cards(posts)
+    invalidate_details(post.pk for post in posts)
+    return len(posts)
+
+
+@backfill('posts.text_html')
+def post_text_html(**options):
+    return Backfill(
+        'posts.text_html', Post.all_objects.all(), fill_text_html, **options
+    )
+
+
+@backfill('posts.archived_text_html')
+def archived_post_text_html(**options):
+    return Backfill(
+        'posts.archived_text_html', ArchivedPost.objects.all(),
+        fill_text_html, **options
+    )
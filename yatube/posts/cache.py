@@ -0,0 +1,240 @@
+import hashlib
+from itertools import chain
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+from django.db.models import Max
+from django.template import engines
+from django.utils import translation
+
+from core.exceptions import KnownNotFound
+from .models import (
+    ArchivedComment, ArchivedPost, Comment, Group, Post, User,
+)
+
+GROUP_CHOICES_KEY = 'posts:group_choices'
+POST_MAX_PK_KEY = 'posts:post:max_pk'
+# Метка в кеше для объектов, которых нет в базе
+MISSING = 'posts:missing'
+
+
+def group_choices():
+    """Список (pk, title) всех групп для выпадающих списков."""
+    return cache.get_or_set(
+        GROUP_CHOICES_KEY,
+        lambda: list(
+            Group.objects.order_by('title').values_list('pk', 'title')
+        ),
+        settings.ENTITY_CACHE_TIMEOUT,
+    )
+
+
+def invalidate_group_choices():
+    cache.delete(GROUP_CHOICES_KEY)
+
+
+def entity_key(model, value):
+    """Ключ кеша объекта по значению из URL (любой длины и состава)."""
+    digest = hashlib.md5(str(value).encode()).hexdigest()
+    return f'posts:{model._meta.model_name}:{digest}'
+
+
+def pk_index_key(model, pk):
+    return f'posts:{model._meta.model_name}:pk:{pk}'
+
+
+def remember_missing(key):
+    cache.set(key, MISSING, settings.NEGATIVE_CACHE_TIMEOUT)
+
+
+def get_confirmed(queryset, **lookup):
+    """Ищет объект; промах на реплике перепроверяется в основной базе,
+    чтобы не закешировать отсутствие ещё не доехавшего объекта."""
+    try:
+        return queryset.get(**lookup)
+    except queryset.model.DoesNotExist:
+        if queryset.db == DEFAULT_DB_ALIAS:
+            raise
+    return queryset.using(DEFAULT_DB_ALIAS).get(**lookup)
+
+
+def get_cached_or_404(model, field, value):
+    """Читает объект из кеша, при промахе - из базы с записью в кеш.
+
+    Отсутствие объекта тоже кешируется на NEGATIVE_CACHE_TIMEOUT.
+    Сохранение объекта сбрасывает такую запись только в кеше своего
+    процесса: с LocMemCache другие процессы видят новый объект лишь
+    по истечении этого срока.
+    Рядом хранится pk -> значение поля, чтобы при переименовании
+    сбросить запись и по старому значению.
+    """
+    key = entity_key(model, value)
+    obj = cache.get(key)
+    if obj == MISSING:
+        raise KnownNotFound
+    if obj is None:
+        try:
+            obj = get_confirmed(model.objects.all(), **{field: value})
+        except model.DoesNotExist:
+            remember_missing(key)
+            raise KnownNotFound
+        cache.set_many(
+            {key: obj, pk_index_key(model, obj.pk): value},
+            settings.ENTITY_CACHE_TIMEOUT,
+        )
+    return obj
+
+
+def invalidate_entity(model, field, obj):
+    keys = [
+        entity_key(model, getattr(obj, field)),
+        pk_index_key(model, obj.pk),
+    ]
+    old_value = cache.get(keys[1])
+    if old_value is not None:
+        keys.append(entity_key(model, old_value))
+    cache.delete_many(keys)
+
+
+def get_user_or_404(username):
+    """Пользователь по username; отключённого нет, как и его постов."""
+    user = get_cached_or_404(User, 'username', username)
+    if not user.is_active:
+        raise KnownNotFound
+    return user
+
+
+def get_group_or_404(slug):
+    return get_cached_or_404(Group, 'slug', slug)
+
+
+def post_pk_ceiling():
+    """Граница id, выше которой постов заведомо нет.
+
+    К максимальному id добавляется запас NEGATIVE_CACHE_PK_MARGIN
+    на посты, созданные другими процессами, пока значение в кеше.
+    """
+    max_pk = cache.get(POST_MAX_PK_KEY)
+    if max_pk is None:
+        max_pk = Post.objects.aggregate(max_pk=Max('pk'))['max_pk'] or 0
+        cache.set(POST_MAX_PK_KEY, max_pk, settings.NEGATIVE_CACHE_TIMEOUT)
+    return max_pk + settings.NEGATIVE_CACHE_PK_MARGIN
+
+
+def get_post_or_404(post_id, queryset=None):
+    """Пост по id; промахи кешируются, а id за границей
+    post_pk_ceiling() отсекаются без запроса к базе.
+
+    queryset может быть и выборкой архивных постов.
+    """
+    if queryset is None:
+        queryset = Post.objects.all()
+    key = entity_key(queryset.model, post_id)
+    if post_id > post_pk_ceiling() or cache.get(key) == MISSING:
+        raise KnownNotFound
+    try:
+        return get_confirmed(queryset, pk=post_id)
+    except queryset.model.DoesNotExist:
+        remember_missing(key)
+        raise KnownNotFound
+
+
+def post_created(post):
+    cache.delete_many([entity_key(Post, post.pk), POST_MAX_PK_KEY])
+
+
+def card_key(post, language=None):
+    """Ключ карточки поста в лентах.
+
+    Меняется вместе с постом, а также с именем автора и группой,
+    которые выводятся в карточке.
+    """
+    language = language or translation.get_language()
+    shown = (
+        post.author.username,
+        post.author.get_full_name(),
+        post.group and (post.group.slug, post.group.title),
+    )
+    digest = hashlib.md5(repr(shown).encode()).hexdigest()
+    return (
+        f'posts:card:{post._meta.model_name}:{post.pk}:'
+        f'{post.updated.timestamp()}:{language}:{digest}'
+    )
+
+
+def invalidate_cards(posts):
+    """Сбрасывает карточки постов во всех движках шаблонов.
+
+    Нужно, когда пост меняют мимо save() и его updated остаётся
+    прежним. У постов должны быть загружены автор и группа.
+    """
+    suffixes = [''] + [f':{engine.name}' for engine in engines.all()]
+    cache.delete_many([
+        card_key(post, settings.LANGUAGE_CODE) + suffix
+        for post in posts
+        for suffix in suffixes
+    ])
+
+
+def detail_key(post_id):
+    return f'posts:detail:{post_id}'
+
+
+def invalidate_detail(post_id):
+    cache.delete(detail_key(post_id))
+
+
+def invalidate_details(post_ids):
+    cache.delete_many([detail_key(post_id) for post_id in set(post_ids)])
+
+
+def invalidate_user_details(user_id):
+    """Сбрасывает страницы постов, где видно имя пользователя:
+    его живые и архивные посты и посты с его комментариями."""
+    invalidate_details(chain(
+        Post.all_objects.filter(author_id=user_id).values_list(
+            'pk', flat=True
+        ),
+        ArchivedPost.objects.filter(author_id=user_id).values_list(
+            'pk', flat=True
+        ),
+        Comment.objects.filter(author_id=user_id).values_list(
+            'post_id', flat=True
+        ),
+        ArchivedComment.objects.filter(author_id=user_id).values_list(
+            'post_id', flat=True
+        ),
+    ))
+
+
+def invalidate_group_details(group_id):
+    """Сбрасывает страницы постов группы."""
+    invalidate_details(chain(
+        Post.all_objects.filter(group_id=group_id).values_list(
+            'pk', flat=True
+        ),
+        ArchivedPost.objects.filter(group_id=group_id).values_list(
+            'pk', flat=True
+        ),
+    ))
+
+
+def author_posts_key(author_id):
+    return f'posts:author_posts:{author_id}'
+
+
+def author_post_count(author_id):
+    """Число живых и архивных постов автора."""
+    return cache.get_or_set(
+        author_posts_key(author_id),
+        lambda: (
+            Post.objects.filter(author_id=author_id).count()
+            + ArchivedPost.objects.filter(author_id=author_id).count()
+        ),
+        settings.ENTITY_CACHE_TIMEOUT,
+    )
+
+
+def post_changed(post):
+    cache.delete_many([detail_key(post.pk), author_posts_key(post.author_id)])
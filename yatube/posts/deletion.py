@@ -0,0 +1,93 @@
+"""Мягкое удаление постов и пользователей с фоновой очисткой.
+
+Пост или пользователь сразу помечается и пропадает из лент, а связанные
+строки и картинки удаляет задача из очереди: порциями по возрастанию id,
+каждая порция - отдельная короткая транзакция. Так удаление большого
+автора не держит блокировку записи SQLite и не грузит все строки в память.
+"""
+from django.conf import settings
+from django.db import transaction
+from sorl.thumbnail import delete as delete_image
+
+from core.edge import post_keys, purge_later
+from outbox import feed
+from outbox.models import OutboxEvent
+from tasks.queue import enqueue
+
+from .cache import post_changed
+from .heads import drop_heads
+from .models import ArchivedComment, ArchivedPost, Comment, Post
+
+
+def delete_in_batches(queryset, batch_size=None):
+    """Удаляет строки выборки порциями; возвращает их число.
+
+    Картинки удалённых постов стираются после фиксации порции.
+    """
+    batch_size = batch_size or settings.PURGE_BATCH_SIZE
+    model = queryset.model
+    has_images = model in (Post, ArchivedPost)
+    total = 0
+    while True:
+        with transaction.atomic():
+            rows = list(
+                queryset.order_by('pk')
+                .values_list('pk', *(['image'] if has_images else []))
+                [:batch_size]
+            )
+            if not rows:
+                return total
+            ids = [row[0] for row in rows]
+            if model is Post:
+                Comment.objects.filter(post_id__in=ids).delete()
+            elif model is ArchivedPost:
+                ArchivedComment.objects.filter(post_id__in=ids).delete()
+            model._base_manager.filter(pk__in=ids).delete()
+        if has_images:
+            for _, image in rows:
+                if image:
+                    delete_image(image)
+        total += len(rows)
+
+
+def soft_delete_post(post):
+    """Скрывает пост и ставит его очистку в очередь."""
+    post.is_deleted = True
+    post.save(update_fields=['is_deleted'])
+    transaction.on_commit(lambda: enqueue(
+        'posts.purge_post', post.pk,
+        idempotency_key=f'posts.purge_post:{post.pk}',
+    ))
+
+
+def soft_delete_user(user):
+    """Отключает пользователя, скрывает его посты и ставит очистку
+    в очередь.
+
+    update() не вызывает post_save, поэтому события ленты изменений
+    пишутся здесь же, как при сохранении каждого поста, а кеши скрытых
+    постов сбрасываются после фиксации.
+    """
+    user.is_active = False
+    user.save(update_fields=['is_active'])
+    posts = Post.objects.filter(author=user)
+    hidden = list(posts)
+    posts.update(is_deleted=True)
+    for post in hidden:
+        post.is_deleted = True
+        feed.record(post, OutboxEvent.UPDATED)
+
+    def committed():
+        keys = []
+        for post in hidden:
+            drop_heads(post)
+            post_changed(post)
+            keys += post_keys(post)
+        # Вне транзакции каждый вызов purge_later очищает сразу
+        purge_later(keys)
+        enqueue(
+            'posts.purge_user', user.pk,
+            idempotency_key=f'posts.purge_user:{user.pk}',
+        )
+
+    transaction.on_commit(committed)
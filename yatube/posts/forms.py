@@ -1,12 +1,16 @@
 from django import forms
 
 from .models import Post, Comment
+from .widgets import AutocompleteSelect
 
 
 class PostForm(forms.ModelForm):
     class Meta:
         model = Post
         fields = ('text', 'group', 'image',)
+        widgets = {
+            'group': AutocompleteSelect('posts:group_autocomplete'),
+        }
 
 
 class CommentForm(forms.ModelForm):
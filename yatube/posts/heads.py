@@ -0,0 +1,101 @@
+"""Начало главной ленты и лент групп в кеше.
+
+Для каждой ленты хранятся id FEED_HEAD_SIZE последних постов и общее
+число постов. Первые страницы собираются по этим id одним запросом
+pk IN (...), без сортировки таблицы и COUNT(*). Новый пост добавляется
+в начало списка, удаление и правка сбрасывают его; холодная лента
+строится заново при первом чтении или командой rebuild_feed_heads.
+"""
+from django.conf import settings
+from django.core.cache import cache
+
+from .models import Group, Post
+
+
+def head_key(group_id=None):
+    if group_id is None:
+        return 'posts:head:index'
+    return f'posts:head:group:{group_id}'
+
+
+def feed_queryset(group_id=None):
+    posts = Post.objects.all()
+    if group_id is not None:
+        posts = posts.filter(group_id=group_id)
+    return posts
+
+
+def rebuild_head(group_id=None):
+    posts = feed_queryset(group_id)
+    head = {
+        'ids': list(
+            posts.order_by('-pub_date', '-pk')
+            .values_list('pk', flat=True)[:settings.FEED_HEAD_SIZE]
+        ),
+        'count': posts.count(),
+    }
+    cache.set(head_key(group_id), head, settings.FEED_HEAD_TIMEOUT)
+    return head
+
+
+def rebuild_all_heads():
+    rebuild_head()
+    for group_id in Group.objects.values_list('pk', flat=True).iterator():
+        rebuild_head(group_id)
+
+
+def get_head(group_id=None):
+    return cache.get(head_key(group_id)) or rebuild_head(group_id)
+
+
+def drop_heads(post):
+    """Сбрасывает начало главной ленты, группы поста и группы,
+    в которой он был при загрузке."""
+    previous = getattr(post, 'loaded_group_id', post.group_id)
+    cache.delete_many(list(
+        {head_key(), head_key(post.group_id), head_key(previous)}
+    ))
+
+
+def push_post(post):
+    """Добавляет новый пост в начало лент, которые уже в кеше."""
+    group_ids = [None] if post.group_id is None else [None, post.group_id]
+    for group_id in group_ids:
+        key = head_key(group_id)
+        head = cache.get(key)
+        if head is not None:
+            head['ids'] = [post.pk] + head['ids'][:settings.FEED_HEAD_SIZE - 1]
+            head['count'] += 1
+            cache.set(key, head, settings.FEED_HEAD_TIMEOUT)
+
+
+class HeadList:
+    """Лента для Paginator: страницы в пределах начала берутся по id
+    из кеша, дальние - обычным запросом queryset."""
+    ordered = True
+
+    def __init__(self, queryset, group_id=None):
+        self.queryset = queryset
+        self.group_id = group_id
+        self.head = get_head(group_id)
+
+    def count(self):
+        return self.head['count']
+
+    def __len__(self):
+        return self.count()
+
+    def __getitem__(self, index):
+        if not isinstance(index, slice):
+            return self[index:index + 1][0]
+        ids = self.head['ids']
+        start, stop = index.start or 0, index.stop
+        if stop > len(ids) and len(ids) < self.head['count']:
+            return list(self.queryset[index])
+        page_ids = ids[start:stop]
+        found = self.queryset.in_bulk(page_ids)
+        if len(found) != len(page_ids):
+            # Пост из начала удалён или перенесён мимо сигналов
+            cache.delete(head_key(self.group_id))
+            return list(self.queryset[index])
+        return [found[pk] for pk in page_ids]
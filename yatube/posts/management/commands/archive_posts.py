@@ -0,0 +1,38 @@
+import datetime as dt
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from posts.archive import archive_batch
+
+
+class Command(BaseCommand):
+    help = (
+        'Переносит посты старше заданного срока вместе с комментариями '
+        'в архивные таблицы небольшими транзакциями.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days', type=int, default=settings.ARCHIVE_AFTER_DAYS,
+            help='Архивировать посты старше стольких дней.',
+        )
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument(
+            '--sleep', type=float, default=0.1,
+            help='Пауза между транзакциями, секунды.',
+        )
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - dt.timedelta(days=options['days'])
+        total = 0
+        while True:
+            moved = archive_batch(cutoff, options['batch_size'])
+            if not moved:
+                break
+            total += moved
+            self.stdout.write(f'перенесено постов: {total}')
+            time.sleep(options['sleep'])
+        self.stdout.write(f'Готово, в архив перенесено постов: {total}')
@@ -0,0 +1,99 @@
+import time
+
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.core.management.base import BaseCommand
+from django.core.paginator import Paginator
+from django.template import loader
+from django.test import RequestFactory, override_settings
+from django.urls import resolve
+from django.utils import timezone
+
+from posts.models import Group, Post, User
+from posts.utils import render_post_text
+
+ENGINES = ('django', 'jinja2')
+# Без кеша карточки и фрагменты отрисовываются при каждом проходе
+COLD_CACHES = {
+    'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'},
+}
+WARM_CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'bench-templates',
+    },
+}
+
+
+def sample_page(pages=5):
+    """Первая страница ленты из несохранённых постов, как из базы."""
+    author = User(
+        pk=1, username='bench', first_name='Автор', last_name='Ленты',
+    )
+    group = Group(
+        pk=1, title='Группа', slug='bench', description='Описание\nгруппы',
+    )
+    now = timezone.now()
+    posts = []
+    for pk in range(1, settings.PAGINATOR * pages + 1):
+        post = Post(
+            pk=pk, author=author, group=group, pub_date=now, updated=now,
+            text=f'Пост {pk}\n' + 'Текст поста. ' * 40,
+        )
+        post.text_html, post.excerpt = render_post_text(post.text)
+        posts.append(post)
+    return author, group, Paginator(posts, settings.PAGINATOR).get_page(1)
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает скорость отрисовки шаблонов лент на Django и Jinja2 '
+        'на одинаковой странице из несохранённых постов.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=200)
+        parser.add_argument(
+            '--warm-cards', action='store_true',
+            help='Держать карточки и фрагменты в кеше между проходами.',
+        )
+
+    def handle(self, *args, **options):
+        author, group, page_obj = sample_page()
+        cases = (
+            ('posts/index.html', '/', AnonymousUser(),
+             {'page_obj': page_obj}),
+            ('posts/group_list.html', '/group/bench/', AnonymousUser(),
+             {'group': group, 'page_obj': page_obj}),
+            ('posts/profile.html', '/profile/bench/', AnonymousUser(),
+             {'author': author, 'page_obj': page_obj, 'following': False}),
+            ('posts/follow_index.html', '/follow/', author,
+             {'page_obj': page_obj}),
+        )
+        caches = WARM_CACHES if options['warm_cards'] else COLD_CACHES
+        with override_settings(CACHES=caches):
+            for name, path, user, context in cases:
+                request = RequestFactory().get(path)
+                request.user = user
+                request.resolver_match = resolve(path)
+                rates = [
+                    self.measure(
+                        loader.get_template(name, using=engine),
+                        context, request, options['repeat'],
+                    )
+                    for engine in ENGINES
+                ]
+                self.stdout.write(
+                    f'{name}: ' + ', '.join(
+                        f'{engine} {rate:.0f}/с'
+                        for engine, rate in zip(ENGINES, rates)
+                    ) + f'; Jinja2 быстрее в {rates[1] / rates[0]:.1f} раза'
+                )
+
+    def measure(self, template, context, request, repeat):
+        """Отрисовок в секунду после одного прохода для разогрева."""
+        template.render(context, request)
+        started = time.perf_counter()
+        for _ in range(repeat):
+            template.render(context, request)
+        return repeat / (time.perf_counter() - started)
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from posts.heads import rebuild_all_heads
+
+
+class Command(BaseCommand):
+    help = (
+        'Заново заполняет в кеше начало главной ленты и лент всех групп, '
+        'например при старте.'
+    )
+
+    def handle(self, *args, **options):
+        rebuild_all_heads()
+        self.stdout.write('Начала лент перестроены.')
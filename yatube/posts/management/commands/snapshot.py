@@ -0,0 +1,43 @@
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from posts.snapshot import Snapshot
+
+
+class Command(BaseCommand):
+    help = (
+        'Сохраняет статические копии популярных страниц для гостей; '
+        'повторный запуск перерисовывает только изменившиеся страницы.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output-dir', default=settings.SNAPSHOT_ROOT)
+        parser.add_argument(
+            '--full', action='store_true',
+            help='Перерисовать все страницы, не глядя на ленту изменений.',
+        )
+        parser.add_argument(
+            '--workers', type=int, default=os.cpu_count() or 1,
+            help='Число процессов отрисовки.',
+        )
+        parser.add_argument('--feed-pages', type=int)
+        parser.add_argument('--profiles', type=int)
+        parser.add_argument('--posts', type=int)
+
+    def handle(self, *args, **options):
+        snapshot = Snapshot(
+            options['output_dir'],
+            workers=options['workers'],
+            feed_pages=options['feed_pages'],
+            profiles=options['profiles'],
+            posts=options['posts'],
+        )
+        result = snapshot.run(full=options['full'])
+        for url, status in result['failed']:
+            self.stderr.write(f'{url}: ответ {status}')
+        self.stdout.write(
+            f'Отрисовано страниц: {result["rendered"]}, '
+            f'удалено: {result["removed"]}.'
+        )
@@ -0,0 +1,63 @@
+from django.db import migrations, transaction
+from django.utils.html import linebreaks
+from django.utils.text import Truncator
+
+# Копия posts.utils.render_post_text и core.backfill на момент
+# миграции: живой код может измениться, а миграция - нет
+EXCERPT_LENGTH = 300
+CHUNK_SIZE = 500
+
+
+def render_post_text(text):
+    excerpt = Truncator(text).chars(EXCERPT_LENGTH)
+    return (
+        linebreaks(text, autoescape=True),
+        linebreaks(excerpt, autoescape=True),
+    )
+
+
+def backfill_text_html(apps, schema_editor):
+    """Заполняет text_html и excerpt порциями по id, каждая порция -
+    отдельная транзакция с контрольной точкой manage.py backfill."""
+    using = schema_editor.connection.alias
+    checkpoints = apps.get_model('core', 'BackfillCheckpoint').objects
+    for model_name, name in (
+        ('Post', 'posts.text_html'),
+        ('ArchivedPost', 'posts.archived_text_html'),
+    ):
+        posts = apps.get_model('posts', model_name)._base_manager.using(
+            using
+        ).order_by('pk')
+        point, _ = checkpoints.using(using).get_or_create(name=name)
+        while True:
+            with transaction.atomic(using=using):
+                chunk = list(
+                    posts.filter(pk__gt=point.last_pk)
+                    .only('pk', 'text')[:CHUNK_SIZE]
+                )
+                if chunk:
+                    for post in chunk:
+                        post.text_html, post.excerpt = render_post_text(
+                            post.text
+                        )
+                    posts.bulk_update(chunk, ['text_html', 'excerpt'])
+                    point.last_pk = chunk[-1].pk
+                else:
+                    point.done = True
+                point.save(using=using)
+            if not chunk:
+                break
+
+
+class Migration(migrations.Migration):
+    # Каждая порция фиксируется отдельно
+    atomic = False
+
+    dependencies = [
+        ('core', '0001_initial'),
+        ('posts', '0024_post_text_html'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_text_html, migrations.RunPython.noop),
+    ]
@@ -1,11 +1,13 @@
 from django.db import models
 from django.contrib.auth import get_user_model
 
+from .utils import render_post_text
+
 User = get_user_model()
 
 
 class Group(models.Model):
-    title = models.CharField(max_length=200)
+    title = models.CharField(max_length=200, db_index=True)
     slug = models.SlugField(max_length=100, unique=True)
     description = models.TextField()
 
@@ -13,6 +15,13 @@ class Group(models.Model):
         return self.title
 
 
+class VisiblePostManager(models.Manager):
+    """Посты без помеченных на удаление."""
+
+    def get_queryset(self):
+        return super().get_queryset().filter(is_deleted=False)
+
+
 class Post(models.Model):
     text = models.TextField(
         verbose_name='Ваш пост:',
@@ -23,6 +32,7 @@ class Post(models.Model):
         auto_now_add=True,
         db_index=True,
     )
+    updated = models.DateTimeField('Дата изменения', auto_now=True)
     author = models.ForeignKey(
         User,
         on_delete=models.CASCADE,
@@ -42,6 +52,20 @@ class Post(models.Model):
         upload_to='posts/',
         blank=True
     )
+    is_deleted = models.BooleanField(
+        'Помечен на удаление',
+        default=False,
+        editable=False,
+    )
+    # Готовый HTML текста и начала поста, см. render_post_text
+    text_html = models.TextField('HTML текста', editable=False, default='')
+    excerpt = models.TextField(
+        'HTML начала текста', editable=False, default=''
+    )
+
+    objects = VisiblePostManager()
+    # Все посты, включая ожидающие фоновой очистки
+    all_objects = models.Manager()
 
     class Meta:
         ordering = ('-pub_date',)
@@ -51,6 +75,19 @@ class Post(models.Model):
     def __str__(self):
         return self.text[:15]
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        post = super().from_db(db, field_names, values)
+        # Группа на момент загрузки: при переносе поста в другую группу
+        # сбрасывается и начало ленты прежней группы
+        post.loaded_group_id = post.__dict__.get('group_id')
+        return post
+
+    def save(self, *args, **kwargs):
+        self.text_html, self.excerpt = render_post_text(self.text)
+        super().save(*args, **kwargs)
+        self.loaded_group_id = self.group_id
+
 
 class Comment(models.Model):
     text = models.TextField(
@@ -76,6 +113,12 @@ class Comment(models.Model):
 
     class Meta:
         ordering = ['created']
+        indexes = [
+            models.Index(
+                fields=['post', 'created', 'id'],
+                name='comment_post_created_idx',
+            ),
+        ]
         verbose_name = 'Комментарий'
         verbose_name_plural = 'Комментарии'
 
@@ -107,3 +150,75 @@ class Follow(models.Model):
         ]
         verbose_name = 'Подписка'
         verbose_name_plural = 'Подписки'
+
+
+class ArchivedPost(models.Model):
+    """Старый пост, перенесённый из Post командой archive_posts."""
+    id = models.IntegerField(primary_key=True)
+    text = models.TextField('Текст поста')
+    pub_date = models.DateTimeField('Дата публикации', db_index=True)
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='archived_posts',
+    )
+    group = models.ForeignKey(
+        Group,
+        on_delete=models.SET_NULL,
+        blank=True,
+        null=True,
+        related_name='archived_posts',
+    )
+    image = models.ImageField(
+        'Картинка',
+        upload_to='posts/',
+        blank=True
+    )
+    text_html = models.TextField('HTML текста', editable=False, default='')
+    excerpt = models.TextField(
+        'HTML начала текста', editable=False, default=''
+    )
+    archived = models.DateTimeField('Дата переноса в архив', auto_now_add=True)
+
+    class Meta:
+        ordering = ('-pub_date',)
+        verbose_name = 'Архивный пост'
+        verbose_name_plural = 'Архивные посты'
+
+    def __str__(self):
+        return self.text[:15]
+
+    @property
+    def updated(self):
+        # Архивный пост не меняется: версия его карточки - время переноса
+        return self.archived
+
+
+class ArchivedComment(models.Model):
+    id = models.IntegerField(primary_key=True)
+    text = models.TextField('Текст комментария')
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='archived_comments',
+    )
+    post = models.ForeignKey(
+        ArchivedPost,
+        on_delete=models.CASCADE,
+        related_name='comments',
+    )
+    created = models.DateTimeField('Дата комментария')
+
+    class Meta:
+        ordering = ['created']
+        indexes = [
+            models.Index(
+                fields=['post', 'created', 'id'],
+                name='archcomment_post_created_idx',
+            ),
+        ]
+        verbose_name = 'Архивный комментарий'
+        verbose_name_plural = 'Архивные комментарии'
+
+    def __str__(self):
+        return self.text[:15]
@@ -0,0 +1,81 @@
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from core.edge import post_keys, purge_later
+from core.page_cache import invalidate_pages
+
+from .cache import (
+    invalidate_detail, invalidate_entity, invalidate_group_choices,
+    invalidate_group_details, invalidate_user_details, post_changed,
+    post_created,
+)
+from .heads import drop_heads, push_post
+from .models import Comment, Follow, Group, Post, User
+
+
+@receiver(post_save, sender=Group)
+@receiver(post_delete, sender=Group)
+def group_changed(sender, instance, **kwargs):
+    invalidate_group_choices()
+    invalidate_entity(Group, 'slug', instance)
+    invalidate_pages()
+    purge_later([f'group-{instance.pk}'])
+
+
+@receiver(post_save, sender=Group)
+@receiver(pre_delete, sender=Group)
+def group_details_changed(sender, instance, **kwargs):
+    # Перед удалением: после него у постов группы уже нет group_id
+    invalidate_group_details(instance.pk)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def user_changed(sender, instance, update_fields=None, **kwargs):
+    invalidate_entity(User, 'username', instance)
+    # Вход пользователя обновляет только last_login - страницы не меняются
+    if update_fields != frozenset({'last_login'}):
+        invalidate_pages()
+        invalidate_user_details(instance.pk)
+        purge_later([f'author-{instance.pk}'])
+
+
+@receiver(post_save, sender=Post)
+def post_saved(sender, instance, created, **kwargs):
+    if created:
+        post_created(instance)
+        push_post(instance)
+        # Новый пост сдвигает страницы главной ленты
+        purge_later(post_keys(instance) + ['index'])
+    else:
+        drop_heads(instance)
+        keys = post_keys(instance)
+        previous = getattr(instance, 'loaded_group_id', None)
+        if previous and previous != instance.group_id:
+            keys.append(f'group-{previous}')
+        purge_later(keys)
+    post_changed(instance)
+
+
+@receiver(post_delete, sender=Post)
+def post_deleted(sender, instance, **kwargs):
+    post_changed(instance)
+    drop_heads(instance)
+    purge_later(post_keys(instance) + ['index'])
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def comment_changed(sender, instance, **kwargs):
+    invalidate_detail(instance.post_id)
+    purge_later([f'post-{instance.post_id}'])
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+@receiver(post_save, sender=Follow)
+@receiver(post_delete, sender=Follow)
+def content_changed(sender, **kwargs):
+    invalidate_pages()
@@ -0,0 +1,277 @@
+"""Статические копии страниц для гостей.
+
+Snapshot отрисовывает первые страницы главной ленты и лент групп,
+профили популярных авторов, обсуждаемые посты и страницы about
+в файлы, которые фронтовой сервер отдаёт без Django. Страница с
+адресом /group/slug/ лежит в group/slug/index.html, её вторая страница
+(?page=2) - в group/slug/index-2.html. Отдавать копии можно только
+запросам без cookie sessionid, например для nginx:
+
+    set $snapshot index.html;
+    if ($arg_page ~ "^[0-9]+$") { set $snapshot index-$arg_page.html; }
+    try_files /snapshot$uri$snapshot @django;
+
+Повторный запуск перерисовывает только страницы, которые затронули
+события outbox после контрольной точки потребителя snapshot (посты,
+комментарии, группы и пользователи), и те, что впервые попали в
+выборку; выбывшие из выборки файлы удаляются. Если compact_outbox
+удалил точку давно не запускавшейся копии, копия собирается заново.
+"""
+import json
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from urllib.parse import unquote, urlsplit
+
+import django
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from django.db import connections
+from django.db.models import Count, Max, Q
+from django.test import RequestFactory
+from django.urls import resolve, reverse
+
+from outbox import feed
+from outbox.models import OutboxEvent
+
+from .models import Comment, Group, Post
+
+User = get_user_model()
+
+CONSUMER = 'snapshot'
+MANIFEST = 'manifest.json'
+FEED_VIEWS = ('posts:index', 'posts:group_list')
+
+
+def page_urls(url, count, pages):
+    """Адреса первых pages страниц ленты из count постов."""
+    total = min(pages, max(math.ceil(count / settings.PAGINATOR), 1))
+    return [url] + [f'{url}?page={number}' for number in range(2, total + 1)]
+
+
+def select_pages(feed_pages=None, profiles=None, posts=None):
+    """Адреса страниц, которые входят в копию."""
+    feed_pages = feed_pages or settings.SNAPSHOT_FEED_PAGES
+    profiles = profiles or settings.SNAPSHOT_PROFILES
+    posts = posts or settings.SNAPSHOT_POSTS
+    urls = [reverse('about:author'), reverse('about:tech')]
+    urls += page_urls(reverse('posts:index'), Post.objects.count(), feed_pages)
+    groups = Group.objects.annotate(
+        posts_count=Count('posts')
+    ).order_by('slug').values_list('slug', 'posts_count')
+    for slug, count in groups:
+        urls += page_urls(
+            reverse('posts:group_list', args=(slug,)), count, feed_pages
+        )
+    authors = User.objects.filter(is_active=True).annotate(
+        followers=Count('following')
+    ).order_by('-followers', 'pk').values_list('username', flat=True)
+    urls += [
+        reverse('posts:profile', args=(username,))
+        for username in authors[:profiles]
+    ]
+    popular = Post.objects.annotate(
+        comments_count=Count('comments')
+    ).order_by('-comments_count', '-pub_date').values_list('pk', flat=True)
+    urls += [
+        reverse('posts:post_detail', args=(post_id,))
+        for post_id in popular[:posts]
+    ]
+    return urls
+
+
+def page_path(url):
+    """Путь файла копии относительно корня или None для адреса,
+    который выходит за его пределы."""
+    parts = urlsplit(url)
+    name = 'index.html'
+    if parts.query:
+        name = 'index-{}.html'.format(parts.query.split('=', 1)[1])
+    path = os.path.normpath(
+        os.path.join(unquote(parts.path).strip('/'), name)
+    )
+    if path.startswith(('..', '/')):
+        return None
+    return path
+
+
+def shown_posts(group_ids, user_ids):
+    """Посты, в которых видны группы group_ids или имена
+    пользователей user_ids, и их авторы."""
+    rows = Post.objects.filter(
+        Q(group_id__in=group_ids) | Q(author_id__in=user_ids)
+    ).values_list('pk', 'author_id')
+    post_ids = {post_id for post_id, _ in rows}
+    post_ids.update(Comment.objects.filter(
+        author_id__in=user_ids
+    ).values_list('post_id', flat=True))
+    return post_ids, {author_id for _, author_id in rows}
+
+
+def affected_urls(events, urls):
+    """Адреса из urls, страницы которых изменили события outbox."""
+    feeds = False
+    post_ids = set()
+    author_ids = set()
+    group_ids = set()
+    user_ids = set()
+    for event in events:
+        payload = json.loads(event.payload)
+        if event.topic == 'posts.post':
+            feeds = True
+            post_ids.add(event.object_id)
+            author_ids.add(payload['author'])
+        elif event.topic == 'posts.comment':
+            post_ids.add(payload['post'])
+        elif event.topic == 'posts.group':
+            # Страницы самой группы - ленты, они отрисуются заново
+            feeds = True
+            group_ids.add(event.object_id)
+        elif event.topic == User._meta.label_lower:
+            author_ids.add(event.object_id)
+            user_ids.add(event.object_id)
+    if group_ids or user_ids:
+        shown_ids, shown_authors = shown_posts(group_ids, user_ids)
+        feeds = feeds or bool(shown_authors)
+        post_ids |= shown_ids
+        author_ids |= shown_authors
+    changed = {
+        reverse('posts:post_detail', args=(post_id,))
+        for post_id in post_ids
+    }
+    changed.update(
+        reverse('posts:profile', args=(username,))
+        for username in User.objects.filter(
+            pk__in=author_ids
+        ).values_list('username', flat=True)
+    )
+    return {
+        url for url in urls
+        if url in changed
+        or feeds and resolve(urlsplit(url).path).view_name in FEED_VIEWS
+    }
+
+
+def render_page(url, root):
+    """Отрисовывает страницу как для гостя и пишет её в файл.
+
+    Возвращает (url, путь файла или None, код ответа).
+    """
+    path = page_path(url)
+    if path is None:
+        return url, None, 400
+    request = RequestFactory().get(url)
+    request.user = AnonymousUser()
+    match = resolve(request.path_info)
+    request.resolver_match = match
+    response = match.func(request, *match.args, **match.kwargs)
+    if hasattr(response, 'render'):
+        response.render()
+    if response.status_code != 200:
+        return url, None, response.status_code
+    target = os.path.join(root, path)
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    temporary = f'{target}.tmp{os.getpid()}'
+    with open(temporary, 'wb') as file:
+        file.write(response.content)
+    os.replace(temporary, target)
+    return url, path, 200
+
+
+def setup_worker():
+    django.setup()
+
+
+class Snapshot:
+    """Копия страниц в каталоге root с описанием manifest.json."""
+
+    def __init__(self, root, workers=1, consumer=CONSUMER, **limits):
+        self.root = root
+        self.workers = workers
+        self.consumer = consumer
+        self.limits = limits
+
+    def load_manifest(self):
+        try:
+            with open(os.path.join(self.root, MANIFEST)) as file:
+                return json.load(file)
+        except FileNotFoundError:
+            return None
+
+    def save_manifest(self, manifest):
+        target = os.path.join(self.root, MANIFEST)
+        with open(target + '.tmp', 'w') as file:
+            json.dump(manifest, file, ensure_ascii=False, indent=1)
+        os.replace(target + '.tmp', target)
+
+    def changes(self, urls):
+        """Адреса, затронутые событиями после контрольной точки,
+        и смещение последнего события."""
+        offset = feed.checkpoint(self.consumer)
+        affected = set()
+        while True:
+            events = feed.read(self.consumer, 1000, offset)
+            if not events:
+                return affected, offset
+            affected |= affected_urls(events, urls)
+            offset = events[-1].pk
+
+    def render(self, urls):
+        if self.workers <= 1 or len(urls) <= 1:
+            return [render_page(url, self.root) for url in urls]
+        # Процессы-обработчики открывают соединения с базой заново
+        connections.close_all()
+        with ProcessPoolExecutor(
+            self.workers, initializer=setup_worker
+        ) as pool:
+            return list(pool.map(
+                render_page, urls, repeat(self.root),
+                chunksize=max(len(urls) // (self.workers * 4), 1),
+            ))
+
+    def run(self, full=False):
+        """Перерисовывает устаревшие страницы, возвращает словарь
+        с числом отрисованных, удалённых и неудачных страниц."""
+        os.makedirs(self.root, exist_ok=True)
+        urls = select_pages(**self.limits)
+        manifest = self.load_manifest()
+        # Без контрольной точки пропущенные события не восстановить
+        if (
+            full or manifest is None
+            or not feed.has_checkpoint(self.consumer)
+        ):
+            manifest = {}
+            offset = OutboxEvent.objects.aggregate(
+                offset=Max('pk')
+            )['offset'] or 0
+            todo = urls
+        else:
+            affected, offset = self.changes(urls)
+            todo = [
+                url for url in urls
+                if url not in manifest or url in affected
+            ]
+        failed = []
+        for url, path, status in self.render(todo):
+            if path is None:
+                failed.append((url, status))
+            else:
+                manifest[url] = path
+        # Выбывшие из выборки и не отрисованные страницы не отдаём
+        stale = (set(manifest) - set(urls)) | {url for url, _ in failed}
+        removed = 0
+        for url in stale & set(manifest):
+            try:
+                os.remove(os.path.join(self.root, manifest.pop(url)))
+            except FileNotFoundError:
+                pass
+            removed += 1
+        self.save_manifest(manifest)
+        feed.commit(self.consumer, offset)
+        return {
+            'rendered': len(todo) - len(failed),
+            'removed': removed,
+            'failed': failed,
+        }
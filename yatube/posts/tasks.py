@@ -0,0 +1,42 @@
+from django.conf import settings
+from sorl.thumbnail import get_thumbnail
+
+from tasks.registry import task
+
+from .deletion import delete_in_batches
+from .models import (
+    ArchivedComment, ArchivedPost, Comment, Follow, Post, User,
+)
+
+
+@task('posts.warm_thumbnail')
+def warm_thumbnail(post_id):
+    """Заранее готовит миниатюру картинки поста для лент."""
+    post = Post.objects.filter(pk=post_id).first()
+    if post is None or not post.image:
+        return
+    get_thumbnail(post.image, **settings.POST_THUMBNAIL)
+
+
+@task('posts.purge_post')
+def purge_post(post_id):
+    """Удаляет помеченный пост вместе с комментариями и картинкой."""
+    post_ids = Post.all_objects.filter(pk=post_id, is_deleted=True)
+    delete_in_batches(Comment.objects.filter(post__in=post_ids))
+    delete_in_batches(post_ids)
+
+
+@task('posts.purge_user')
+def purge_user(user_id):
+    """Удаляет всё, что оставил отключённый пользователь, а затем его."""
+    user = User.objects.filter(pk=user_id, is_active=False).first()
+    if user is None:
+        return
+    delete_in_batches(Follow.objects.filter(user=user))
+    delete_in_batches(Follow.objects.filter(author=user))
+    delete_in_batches(Comment.objects.filter(author=user))
+    delete_in_batches(ArchivedComment.objects.filter(author=user))
+    # Комментарии к постам удаляются вместе с каждой порцией постов
+    delete_in_batches(Post.all_objects.filter(author=user))
+    delete_in_batches(ArchivedPost.objects.filter(author=user))
+    user.delete()
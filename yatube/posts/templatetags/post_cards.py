@@ -0,0 +1,38 @@
+from django import template
+from django.conf import settings
+from django.core.cache import cache
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
+
+from ..cache import card_key
+
+register = template.Library()
+
+
+def render_cards(posts, using=None):
+    """HTML карточек постов страницы.
+
+    Карточки берутся из кеша одним get_many, отрисовываются
+    только промахи. using - движок шаблонов карточки; карточки
+    разных движков кешируются отдельно.
+    """
+    posts = list(posts)
+    suffix = f':{using}' if using else ''
+    keys = [card_key(post) + suffix for post in posts]
+    cached = cache.get_many(keys)
+    missing = {}
+    cards = []
+    for key, post in zip(keys, posts):
+        if key not in cached:
+            missing[key] = cached[key] = render_to_string(
+                'posts/includes/post_card.html', {'post': post}, using=using
+            )
+        cards.append(mark_safe(cached[key]))
+    if missing:
+        cache.set_many(missing, settings.CARD_CACHE_TIMEOUT)
+    return cards
+
+
+@register.simple_tag
+def post_cards(posts):
+    return render_cards(posts)
@@ -0,0 +1,149 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from ..cache import group_choices
+from ..models import Post, Group, Comment, Follow
+from ..utils import LargeTablePaginator, estimate_count
+
+User = get_user_model()
+
+
+class AdminChangelistTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.admin = User.objects.create_superuser(
+            username='admin', email='admin@example.com', password='pass',
+        )
+        cls.author = User.objects.create_user(username='writer')
+        cls.group = Group.objects.create(
+            title='Группа', slug='admin-group', description='Описание',
+        )
+        Post.objects.create(author=cls.author, text='Первый', group=cls.group)
+
+    def setUp(self):
+        cache.clear()
+        self.admin_client = Client()
+        self.admin_client.force_login(self.admin)
+
+    def changelist_queries(self, model):
+        url = reverse(f'admin:posts_{model}_changelist')
+        with CaptureQueriesContext(connection) as context:
+            response = self.admin_client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(context)
+
+    def test_changelists_open(self):
+        """Списки постов, комментариев и подписок открываются."""
+        post = Post.objects.first()
+        Comment.objects.create(post=post, author=self.author, text='к')
+        Follow.objects.create(user=self.admin, author=self.author)
+        for model in ('post', 'comment', 'follow'):
+            with self.subTest(model=model):
+                self.changelist_queries(model)
+
+    def test_post_changelist_queries_do_not_grow(self):
+        """Число запросов списка постов не зависит от числа строк."""
+        self.changelist_queries('post')
+        before = self.changelist_queries('post')
+        for i in range(5):
+            author = User.objects.create_user(username=f'writer{i}')
+            group = Group.objects.create(
+                title=f'Группа {i}', slug=f'group-{i}', description='-',
+            )
+            Post.objects.create(author=author, text=f'{i}', group=group)
+        self.changelist_queries('post')
+        self.assertEqual(self.changelist_queries('post'), before)
+
+    def test_group_choices_invalidated_on_save(self):
+        """Кеш вариантов групп сбрасывается при изменении групп."""
+        self.assertIn((self.group.pk, self.group.title), group_choices())
+        group = Group.objects.create(
+            title='Новая', slug='new-group', description='-',
+        )
+        self.assertIn((group.pk, group.title), group_choices())
+
+    def test_large_table_paginator_keeps_queryset_page(self):
+        """Страница пагинатора остаётся QuerySet с нужными строками."""
+        paginator = LargeTablePaginator(Post.objects.all(), 1)
+        page = paginator.page(1)
+        self.assertEqual(list(page.object_list), [Post.objects.first()])
+
+    def test_estimate_count(self):
+        """Оценка числа строк без COUNT(*) не меньше настоящего числа."""
+        for i in range(3):
+            Post.objects.create(author=self.author, text=f'Ещё {i}')
+        estimate = estimate_count(Post)
+        self.assertIsNotNone(estimate)
+        self.assertGreaterEqual(estimate, Post.all_objects.count())
+
+    @mock.patch('posts.utils.estimate_count', return_value=1000)
+    def test_paginator_counts_filtered_queryset(self, estimate):
+        """Без фильтров число строк оценивается, с фильтром -
+        считается COUNT(*)."""
+        self.assertEqual(
+            LargeTablePaginator(Post.all_objects.all(), 10).count, 1000
+        )
+        filtered = Post.all_objects.filter(text='Первый')
+        self.assertEqual(LargeTablePaginator(filtered, 10).count, 1)
+        estimate.assert_called_once()
+
+    @mock.patch('posts.utils.estimate_count', return_value=1000)
+    def test_post_changelist_uses_estimate(self, estimate):
+        """Список постов оценивает число строк, несмотря на скрытие
+        помеченных на удаление постов менеджером."""
+        response = self.admin_client.get(
+            reverse('admin:posts_post_changelist')
+        )
+        estimate.assert_called_once()
+        self.assertEqual(response.context['cl'].result_count, 1000)
+        self.assertEqual(
+            LargeTablePaginator(Post.objects.filter(text='Первый'), 10).count,
+            1,
+        )
+
+    def test_post_autocomplete_by_id_prefix(self):
+        """Автодополнение постов в админке ищет по началу id."""
+        post = Post.objects.first()
+        response = self.admin_client.get(
+            reverse('admin:posts_post_autocomplete'),
+            {'term': str(post.pk)},
+        )
+        ids = [item['id'] for item in response.json()['results']]
+        self.assertIn(str(post.pk), ids)
+
+    def test_post_search_by_number(self):
+        """Число ищется и в начале id, и в тексте постов; прочие
+        цифры Юникода не ломают поиск."""
+        post = Post.objects.create(author=self.author, text='Глава 777')
+        url = reverse('admin:posts_post_changelist')
+        response = self.admin_client.get(url, {'q': '777'})
+        self.assertIn(post, response.context['cl'].result_list)
+        response = self.admin_client.get(url, {'q': str(post.pk)})
+        self.assertIn(post, response.context['cl'].result_list)
+        self.assertEqual(
+            self.admin_client.get(url, {'q': '²'}).status_code, 200
+        )
+
+    def test_user_search_by_email(self):
+        """Пользователей в админке можно найти по email."""
+        response = self.admin_client.get(
+            reverse('admin:auth_user_changelist'), {'q': 'admin@'}
+        )
+        self.assertEqual(
+            list(response.context['cl'].result_list), [self.admin]
+        )
+
+    def test_user_autocomplete_by_username_prefix(self):
+        """Автодополнение пользователей ищет по началу username."""
+        response = self.admin_client.get(
+            reverse('admin:auth_user_autocomplete'), {'term': 'wri'}
+        )
+        ids = [item['id'] for item in response.json()['results']]
+        self.assertEqual(ids, [str(self.author.pk)])
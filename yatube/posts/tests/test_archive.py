@@ -0,0 +1,76 @@
+import datetime as dt
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from outbox.models import OutboxEvent
+
+from ..models import ArchivedComment, ArchivedPost, Comment, Post
+
+User = get_user_model()
+
+
+class ArchiveTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='veteran')
+        cls.old_post = Post.objects.create(author=cls.user, text='Старый пост')
+        Comment.objects.create(
+            post=cls.old_post, author=cls.user, text='Старый коммент',
+        )
+        Post.objects.filter(pk=cls.old_post.pk).update(
+            pub_date=timezone.now() - dt.timedelta(days=400)
+        )
+        Post.objects.bulk_create(
+            Post(author=cls.user, text=f'Новый {i}') for i in range(10)
+        )
+        call_command(
+            'archive_posts', days=365, sleep=0, stdout=StringIO()
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def test_old_post_moved_to_archive(self):
+        """Старый пост с комментариями перенесён в архив."""
+        self.assertFalse(Post.objects.filter(pk=self.old_post.pk).exists())
+        self.assertTrue(
+            ArchivedPost.objects.filter(pk=self.old_post.pk).exists()
+        )
+        self.assertEqual(
+            ArchivedComment.objects.get(post_id=self.old_post.pk).text,
+            'Старый коммент',
+        )
+        self.assertEqual(Post.objects.count(), 10)
+
+    def test_archiving_records_no_deleted_events(self):
+        """Перенос в архив не пишет в ленту изменений удаления."""
+        self.assertFalse(
+            OutboxEvent.objects.filter(action=OutboxEvent.DELETED).exists()
+        )
+
+    def test_post_detail_falls_through_to_archive(self):
+        """Страница архивного поста открывается без формы комментария."""
+        response = self.client.get(
+            reverse('posts:post_detail', args=(self.old_post.pk,))
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.context['is_archived'])
+        self.assertEqual(response.context['amount_of_posts'], 11)
+        self.assertContains(response, 'Старый коммент')
+
+    def test_profile_continues_into_archive(self):
+        """Профиль за пределами живых постов показывает архив."""
+        url = reverse('posts:profile', args=(self.user.username,))
+        response = self.client.get(url, {'page': 2})
+        page_obj = response.context['page_obj']
+        self.assertEqual(page_obj.paginator.count, 11)
+        self.assertEqual(
+            [post.pk for post in page_obj], [self.old_post.pk]
+        )
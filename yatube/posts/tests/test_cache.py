@@ -0,0 +1,315 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.http import Http404
+from django.core.management import call_command
+from django.test import TestCase, Client, override_settings
+from django.urls import reverse
+
+from ..cache import (
+    get_group_or_404, get_post_or_404, get_user_or_404, post_pk_ceiling,
+)
+from ..heads import HeadList, get_head, head_key
+from ..models import Group, Post
+
+User = get_user_model()
+
+
+class EntityCacheTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='cached')
+        cls.group = Group.objects.create(
+            title='Группа', slug='cached-group', description='-',
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def test_user_lookup_hits_cache(self):
+        """Повторный поиск пользователя не обращается к базе."""
+        get_user_or_404(self.user.username)
+        with self.assertNumQueries(0):
+            self.assertEqual(get_user_or_404(self.user.username), self.user)
+
+    def test_group_lookup_hits_cache(self):
+        """Повторный поиск группы не обращается к базе."""
+        get_group_or_404(self.group.slug)
+        with self.assertNumQueries(0):
+            self.assertEqual(get_group_or_404(self.group.slug), self.group)
+
+    def test_rename_invalidates_old_username(self):
+        """После переименования старый username не находится."""
+        user = User.objects.create_user(username='old_name')
+        get_user_or_404('old_name')
+        user.username = 'new_name'
+        user.save()
+        with self.assertRaises(Http404):
+            get_user_or_404('old_name')
+        self.assertEqual(get_user_or_404('new_name'), user)
+
+    def test_delete_invalidates_group(self):
+        """Удалённая группа пропадает из кеша."""
+        group = Group.objects.create(title='-', slug='gone', description='-')
+        get_group_or_404('gone')
+        group.delete()
+        with self.assertRaises(Http404):
+            get_group_or_404('gone')
+
+    def test_follow_index_does_not_refetch_user(self):
+        """Лента подписок не перечитывает текущего пользователя."""
+        client = Client()
+        client.force_login(self.user)
+        client.get(reverse('posts:follow_index'))
+        with self.assertNumQueries(3):
+            # сессия, пользователь из сессии и число постов
+            client.get(reverse('posts:follow_index'))
+
+
+class NegativeCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_missing_user_is_cached(self):
+        """Повторный промах по username не обращается к базе."""
+        with self.assertRaises(Http404):
+            get_user_or_404('nobody')
+        with self.assertNumQueries(0):
+            with self.assertRaises(Http404):
+                get_user_or_404('nobody')
+
+    def test_created_user_replaces_negative_entry(self):
+        """Созданный пользователь находится сразу после промаха."""
+        with self.assertRaises(Http404):
+            get_user_or_404('late_user')
+        user = User.objects.create_user(username='late_user')
+        self.assertEqual(get_user_or_404('late_user'), user)
+
+    def test_huge_post_id_skips_database(self):
+        """Пост с id далеко за максимальным не ищется в базе."""
+        post_pk_ceiling()
+        with self.assertNumQueries(0):
+            with self.assertRaises(Http404):
+                get_post_or_404(10 ** 12)
+
+    def test_created_post_replaces_negative_entry(self):
+        """Пост, созданный после промаха по его id, находится."""
+        user = User.objects.create_user(username='poster')
+        post = Post.objects.create(author=user, text='Первый')
+        with self.assertRaises(Http404):
+            get_post_or_404(post.pk + 1)
+        new_post = Post.objects.create(author=user, text='Второй')
+        self.assertEqual(get_post_or_404(new_post.pk), new_post)
+
+    def test_missing_profile_gets_light_404(self):
+        """Для отсутствующего профиля отдаётся короткая страница 404."""
+        url = reverse('posts:profile', args=('nobody',))
+        self.client.get(url)
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 404)
+        self.assertTemplateNotUsed(response, 'core/404.html')
+        self.assertContains(response, 'Custom 404', status_code=404)
+
+
+class PostCardCacheTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='carded')
+        cls.group = Group.objects.create(
+            title='Карточки', slug='cards', description='-',
+        )
+        cls.post = Post.objects.create(
+            author=cls.user, group=cls.group, text='Исходный текст',
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.url = reverse('posts:group_list', args=(self.group.slug,))
+
+    def test_card_served_from_cache(self):
+        """Карточка берётся из кеша, пока пост не изменён через save()."""
+        self.client.get(self.url)
+        Post.objects.filter(pk=self.post.pk).update(excerpt='<p>Тихо</p>')
+        self.assertContains(self.client.get(self.url), 'Исходный текст')
+        self.post.text = 'Новый текст'
+        self.post.save()
+        self.assertContains(self.client.get(self.url), 'Новый текст')
+
+    def test_card_shared_between_feeds(self):
+        """Карточка, отрисованная для группы, используется в профиле."""
+        self.client.get(self.url)
+        Post.objects.filter(pk=self.post.pk).update(excerpt='<p>Тихо</p>')
+        response = self.client.get(
+            reverse('posts:profile', args=(self.user.username,))
+        )
+        self.assertContains(response, 'Исходный текст')
+
+    def test_author_rename_changes_card(self):
+        """Смена имени автора видна в карточке сразу."""
+        self.client.get(self.url)
+        self.user.first_name = 'Переименованный'
+        self.user.save()
+        self.assertContains(self.client.get(self.url), 'Переименованный')
+
+
+class PostDetailCacheTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='viral')
+        cls.reader = User.objects.create_user(username='fan')
+        cls.post = Post.objects.create(author=cls.author, text='Вирусный пост')
+
+    def setUp(self):
+        cache.clear()
+        self.url = reverse('posts:post_detail', args=(self.post.pk,))
+        self.author_client = Client()
+        self.author_client.force_login(self.author)
+        self.reader_client = Client()
+        self.reader_client.force_login(self.reader)
+
+    def test_body_cached_until_post_saved(self):
+        """Общая часть страницы берётся из кеша до правки поста."""
+        self.reader_client.get(self.url)
+        Post.objects.filter(pk=self.post.pk).update(
+            text_html='<p>Тихая правка</p>'
+        )
+        self.assertContains(self.reader_client.get(self.url), 'Вирусный пост')
+        self.post.text = 'Исправленный пост'
+        self.post.save()
+        self.assertContains(
+            self.reader_client.get(self.url), 'Исправленный пост'
+        )
+
+    def test_comment_invalidates_body(self):
+        """Новый комментарий сразу виден на странице поста."""
+        self.reader_client.get(self.url)
+        self.reader_client.post(
+            reverse('posts:add_comment', args=(self.post.pk,)),
+            {'text': 'Первый!'},
+        )
+        self.assertContains(self.reader_client.get(self.url), 'Первый!')
+
+    def test_author_rename_invalidates_body(self):
+        """Новое имя автора сразу видно на странице поста."""
+        self.reader_client.get(self.url)
+        author = User.objects.get(pk=self.author.pk)
+        author.first_name = 'Фёдор'
+        author.last_name = 'Достоевский'
+        author.save()
+        self.assertContains(
+            self.reader_client.get(self.url), 'Фёдор Достоевский'
+        )
+
+    def test_commenter_rename_invalidates_body(self):
+        """Новое имя комментатора сразу видно на странице поста."""
+        self.reader_client.post(
+            reverse('posts:add_comment', args=(self.post.pk,)),
+            {'text': 'Первый!'},
+        )
+        self.author_client.get(self.url)
+        reader = User.objects.get(pk=self.reader.pk)
+        reader.username = 'superfan'
+        reader.save()
+        self.assertContains(self.author_client.get(self.url), 'superfan')
+
+    def test_group_change_invalidates_body(self):
+        """Переименование и удаление группы видны на странице поста."""
+        group = Group.objects.create(title='Книголюбы', slug='books')
+        post = Post.objects.create(
+            author=self.author, group=group, text='В группе',
+        )
+        url = reverse('posts:post_detail', args=(post.pk,))
+        self.assertContains(self.reader_client.get(url), 'Книголюбы')
+        group.title = 'Читатели'
+        group.save()
+        self.assertContains(self.reader_client.get(url), 'Читатели')
+        group.delete()
+        self.assertNotContains(self.reader_client.get(url), 'Читатели')
+
+    def test_user_parts_are_not_cached(self):
+        """Ссылка на правку видна только автору при общем кеше."""
+        edit_url = reverse('posts:post_edit', args=(self.post.pk,))
+        self.assertNotContains(self.reader_client.get(self.url), edit_url)
+        self.assertContains(self.author_client.get(self.url), edit_url)
+        self.assertNotContains(
+            self.client.get(self.url), 'csrfmiddlewaretoken'
+        )
+
+
+@override_settings(FEED_HEAD_SIZE=5)
+class FeedHeadTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='header')
+        cls.group = Group.objects.create(
+            title='Голова', slug='head', description='-',
+        )
+        cls.posts = [
+            Post.objects.create(
+                author=cls.user, text=f'Пост {i}',
+                group=cls.group if i % 2 else None,
+            )
+            for i in range(8)
+        ]
+
+    def setUp(self):
+        cache.clear()
+
+    def test_first_page_from_head(self):
+        """Первая страница собирается по id из кеша одним запросом."""
+        get_head()
+        posts = HeadList(Post.objects.all())
+        with self.assertNumQueries(1):
+            self.assertEqual(posts.count(), 8)
+            self.assertEqual(
+                posts[0:3], sorted(self.posts, key=lambda p: -p.pk)[:3]
+            )
+
+    def test_far_pages_fall_back_to_queryset(self):
+        """Страницы за пределами начала читаются из базы."""
+        posts = HeadList(Post.objects.order_by('pk'))
+        self.assertEqual(posts[6:8], self.posts[6:8])
+
+    def test_new_post_pushed_to_heads(self):
+        """Новый пост попадает в начало ленты и своей группы."""
+        get_head()
+        get_head(self.group.pk)
+        post = Post.objects.create(
+            author=self.user, text='Свежий', group=self.group,
+        )
+        for group_id in (None, self.group.pk):
+            head = cache.get(head_key(group_id))
+            self.assertEqual(head['ids'][0], post.pk)
+            self.assertEqual(len(head['ids']), 5)
+
+    def test_moved_post_leaves_old_group_head(self):
+        """Пост, перенесённый в другую группу, пропадает из начала
+        ленты прежней группы и попадает в начало новой."""
+        other = Group.objects.create(title='Другая', slug='other')
+        post = Post.objects.get(pk=self.posts[-1].pk)
+        self.assertIn(post.pk, get_head(self.group.pk)['ids'])
+        get_head(other.pk)
+        post.group = other
+        post.save()
+        self.assertNotIn(post.pk, get_head(self.group.pk)['ids'])
+        self.assertIn(post.pk, get_head(other.pk)['ids'])
+
+    def test_hidden_post_heals_head(self):
+        """Пост, скрытый мимо сигналов, сбрасывает начало ленты."""
+        get_head()
+        newest = self.posts[-1]
+        Post.objects.filter(pk=newest.pk).update(is_deleted=True)
+        posts = HeadList(Post.objects.all())
+        self.assertNotIn(newest, posts[0:3])
+        self.assertIsNone(cache.get(head_key()))
+
+    def test_rebuild_command(self):
+        """Команда заполняет начала всех лент."""
+        call_command('rebuild_feed_heads', stdout=StringIO())
+        self.assertEqual(cache.get(head_key(self.group.pk))['count'], 4)
+        self.assertEqual(cache.get(head_key())['count'], 8)
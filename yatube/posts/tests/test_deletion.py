@@ -0,0 +1,143 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import (
+    Client, TestCase, TransactionTestCase, override_settings,
+)
+from django.urls import reverse
+
+from ..cache import detail_key
+from ..deletion import soft_delete_post, soft_delete_user
+from ..heads import get_head, head_key
+from outbox.models import OutboxEvent
+
+from ..models import ArchivedPost, Comment, Follow, Group, Post
+from ..tasks import purge_post, purge_user
+
+User = get_user_model()
+
+
+@override_settings(PURGE_BATCH_SIZE=2)
+class SoftDeleteTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(username='prolific')
+        cls.reader = User.objects.create_user(username='reader')
+        cls.posts = [
+            Post.objects.create(author=cls.author, text=f'Пост {i}')
+            for i in range(5)
+        ]
+        for post in cls.posts:
+            for i in range(3):
+                Comment.objects.create(
+                    post=post, author=cls.reader, text=f'Ответ {i}',
+                )
+        Comment.objects.create(
+            post=Post.objects.create(author=cls.reader, text='Чужой'),
+            author=cls.author, text='Комментарий автора',
+        )
+        Follow.objects.create(user=cls.reader, author=cls.author)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_deleted_post_hidden_then_purged(self):
+        """Помеченный пост сразу пропадает, а задача удаляет его
+        вместе с комментариями."""
+        post = self.posts[0]
+        soft_delete_post(post)
+        self.assertNotIn(post, Post.objects.all())
+        response = self.client.get(
+            reverse('posts:post_detail', args=(post.pk,))
+        )
+        self.assertEqual(response.status_code, 404)
+        purge_post(post.pk)
+        self.assertFalse(Post.all_objects.filter(pk=post.pk).exists())
+        self.assertFalse(Comment.objects.filter(post_id=post.pk).exists())
+
+    def test_purge_ignores_live_post(self):
+        """Непомеченный пост задача очистки не трогает."""
+        purge_post(self.posts[1].pk)
+        self.assertTrue(Post.objects.filter(pk=self.posts[1].pk).exists())
+
+    def test_deleted_user_hidden_then_purged(self):
+        """Посты и комментарии отключённого пользователя скрыты сразу,
+        а после очистки не остаётся ни строк, ни самого пользователя."""
+        soft_delete_user(self.author)
+        response = self.client.get(reverse('posts:index'))
+        self.assertEqual(
+            [post.author for post in response.context['page_obj']],
+            [self.reader],
+        )
+        purge_user(self.author.pk)
+        self.assertFalse(User.objects.filter(pk=self.author.pk).exists())
+        self.assertEqual(Post.all_objects.count(), 1)
+        self.assertFalse(Comment.objects.exclude(author=self.reader).exists())
+        self.assertFalse(Follow.objects.exists())
+
+    def test_deleted_user_archive_and_profile_hidden(self):
+        """Профиль и архивные посты отключённого пользователя
+        недоступны до очистки."""
+        archived = ArchivedPost.objects.create(
+            id=self.posts[-1].pk + 100, author=self.author, text='Архивный',
+            pub_date=self.posts[0].pub_date,
+        )
+        soft_delete_user(self.author)
+        for url in (
+            reverse('posts:profile', args=(self.author.username,)),
+            reverse('posts:post_detail', args=(archived.pk,)),
+        ):
+            with self.subTest(url=url):
+                self.assertEqual(self.client.get(url).status_code, 404)
+
+    def test_deleted_user_posts_recorded_in_outbox(self):
+        """Скрытие постов пользователя попадает в ленту изменений."""
+        OutboxEvent.objects.all().delete()
+        soft_delete_user(self.author)
+        events = OutboxEvent.objects.filter(
+            topic='posts.post', action=OutboxEvent.UPDATED,
+        )
+        self.assertEqual(
+            sorted(event.object_id for event in events),
+            sorted(post.pk for post in self.posts),
+        )
+        self.assertTrue(all(
+            '"is_deleted": true' in event.payload for event in events
+        ))
+
+    def test_admin_delete_is_soft(self):
+        """Удаление поста в админке только помечает его."""
+        admin = User.objects.create_superuser(
+            username='admin', email='admin@example.com', password='pass',
+        )
+        client = Client()
+        client.force_login(admin)
+        post = self.posts[2]
+        response = client.post(
+            reverse('admin:posts_post_delete', args=(post.pk,)),
+            {'post': 'yes'},
+        )
+        self.assertEqual(response.status_code, 302)
+        self.assertTrue(Post.all_objects.get(pk=post.pk).is_deleted)
+
+
+# Очистка в очереди удалила бы посты и сбросила кеши сама
+@override_settings(TASKS_ALWAYS_EAGER=False)
+class SoftDeleteUserCacheTests(TransactionTestCase):
+
+    def setUp(self):
+        cache.clear()
+
+    def test_hidden_posts_leave_cached_feeds(self):
+        """После отключения автора его посты пропадают из начала лент
+        и кеша страницы поста."""
+        group = Group.objects.create(title='Группа', slug='group')
+        author = User.objects.create_user(username='leaving')
+        post = Post.objects.create(author=author, group=group, text='Пост')
+        self.client.get(reverse('posts:post_detail', args=(post.pk,)))
+        self.assertIn(post.pk, get_head(group.pk)['ids'])
+        self.assertIsNotNone(cache.get(detail_key(post.pk)))
+        soft_delete_user(author)
+        self.assertIsNone(cache.get(head_key(group.pk)))
+        self.assertIsNone(cache.get(detail_key(post.pk)))
+        self.assertNotIn(post.pk, get_head()['ids'])
@@ -68,6 +68,21 @@ class PostFormTests(TestCase):
             ).exists()
         )
 
+    def test_garbage_group_shows_form_error(self):
+        """Неверное значение группы даёт ошибку формы, а не 500."""
+        posts_count = Post.objects.count()
+        for url in (
+            reverse('posts:post_create'),
+            reverse('posts:post_edit', args=(self.post.pk,)),
+        ):
+            with self.subTest(url=url):
+                response = self.authorized_client.post(
+                    url, {'text': 'Текст', 'group': 'abc'}
+                )
+                self.assertEqual(response.status_code, 200)
+                self.assertTrue(response.context['form'].errors['group'])
+        self.assertEqual(Post.objects.count(), posts_count)
+
     def test_forms_edit_post(self):
         """Проверка наличия изменения существующей записи"""
         group_field = PostFormTests.group1.pk
@@ -139,6 +154,7 @@ class TaskPagesTests(TestCase):
         )
 
     def setUp(self):
+        cache.clear()
         self.authorized_client = Client()
         self.authorized_client.force_login(self.user)
 
@@ -0,0 +1,112 @@
+import re
+import shutil
+import tempfile
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from yatube.jinja2 import thumbnail
+
+from ..models import Follow, Group, Post
+
+User = get_user_model()
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+SMALL_GIF = (
+    b'\x47\x49\x46\x38\x39\x61\x02\x00'
+    b'\x01\x00\x80\x00\x00\x00\x00\x00'
+    b'\xFF\xFF\xFF\x21\xF9\x04\x00\x00'
+    b'\x00\x00\x00\x2C\x00\x00\x00\x00'
+    b'\x02\x00\x01\x00\x00\x02\x02\x0C'
+    b'\x0A\x00\x3B'
+)
+
+
+def normalized(response):
+    return re.sub(r'\s+', '', response.content.decode())
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class Jinja2FeedTests(TestCase):
+    """Ленты на Jinja2 дают ту же разметку, что и шаблоны Django."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(
+            username='writer', first_name='Пишущий',
+        )
+        cls.reader = User.objects.create_user(username='reader')
+        cls.group = Group.objects.create(
+            title='Группа <b>', slug='jinja', description='Строка\n<i>',
+        )
+        for i in range(12):
+            Post.objects.create(
+                author=cls.author, group=cls.group, text=f'Пост <{i}>',
+            )
+        Post.objects.create(
+            author=cls.author, text='С картинкой',
+            image=SimpleUploadedFile('small.gif', SMALL_GIF, 'image/gif'),
+        )
+        Follow.objects.create(user=cls.reader, author=cls.author)
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        cache.clear()
+
+    def assertSameMarkup(self, client, url):
+        cache.clear()
+        expected = normalized(client.get(url))
+        cache.clear()
+        with override_settings(FEED_TEMPLATE_ENGINE='jinja2'):
+            response = client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(normalized(response), expected)
+
+    def test_guest_pages(self):
+        for url in (
+            reverse('posts:index'),
+            reverse('posts:index') + '?page=2',
+            reverse('posts:group_list', args=(self.group.slug,)),
+            reverse('posts:profile', args=(self.author.username,)),
+        ):
+            with self.subTest(url=url):
+                self.assertSameMarkup(self.client, url)
+
+    def test_reader_pages(self):
+        client = Client()
+        client.force_login(self.reader)
+        for url in (
+            reverse('posts:index'),
+            reverse('posts:profile', args=(self.author.username,)),
+            reverse('posts:follow_index'),
+        ):
+            with self.subTest(url=url):
+                self.assertSameMarkup(client, url)
+
+    def test_text_escaped(self):
+        with override_settings(FEED_TEMPLATE_ENGINE='jinja2'):
+            response = self.client.get(
+                reverse('posts:group_list', args=(self.group.slug,))
+            )
+        self.assertContains(response, 'Пост &lt;11&gt;')
+        self.assertContains(response, 'Строка<br>&lt;i&gt;')
+        self.assertNotContains(response, '<i>')
+
+    def test_thumbnail_without_image(self):
+        self.assertIsNone(thumbnail(None, '10x10'))
+
+    def test_bench_templates_command(self):
+        out = StringIO()
+        call_command('bench_templates', repeat=1, stdout=out)
+        self.assertEqual(len(out.getvalue().splitlines()), 4)
+        self.assertIn('jinja2', out.getvalue())
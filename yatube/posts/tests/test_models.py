@@ -1,7 +1,10 @@
-from django.test import TestCase
+from django.core.cache import cache
+from django.test import TestCase, override_settings
 from django.contrib.auth import get_user_model
 
+from ..backfills import post_text_html
 from ..models import Post, Group
+from ..templatetags.post_cards import render_cards
 
 User = get_user_model()
 
@@ -46,3 +49,47 @@ class PostModelTest(TestCase):
         # Получаем из свойста класса Task значение help_text для title
         help_text = post._meta.get_field('text').help_text
         self.assertEqual(help_text, 'Здесь напишите текст к вашему посту')
+
+
+@override_settings(POST_EXCERPT_LENGTH=20)
+class PostTextHtmlTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='writer')
+
+    def test_html_computed_on_save(self):
+        """HTML и начало текста готовятся при сохранении и экранированы."""
+        post = Post.objects.create(
+            author=self.user,
+            text='<b>Первый</b> абзац\n\nВторой абзац подлиннее',
+        )
+        self.assertEqual(
+            post.text_html,
+            '<p>&lt;b&gt;Первый&lt;/b&gt; абзац</p>\n\n'
+            '<p>Второй абзац подлиннее</p>',
+        )
+        self.assertEqual(
+            post.excerpt, '<p>&lt;b&gt;Первый&lt;/b&gt; абзац…</p>'
+        )
+
+    def test_backfill_fills_existing_posts(self):
+        """Заполнение готовит HTML для постов, сохранённых мимо save()."""
+        Post.objects.bulk_create(
+            Post(author=self.user, text=f'Пост {i}') for i in range(3)
+        )
+        post_text_html(duty_cycle=1).run()
+        self.assertEqual(
+            list(
+                Post.objects.order_by('pk').values_list('excerpt', flat=True)
+            ),
+            [f'<p>Пост {i}</p>' for i in range(3)],
+        )
+
+    def test_backfill_invalidates_cached_cards(self):
+        """Заполнение сбрасывает карточки, закешированные до него."""
+        Post.objects.bulk_create([Post(author=self.user, text='Старый')])
+        cache.clear()
+        render_cards(Post.objects.select_related('author', 'group'))
+        post_text_html(duty_cycle=1).run()
+        [card] = render_cards(Post.objects.select_related('author', 'group'))
+        self.assertIn('<p>Старый</p>', card)
@@ -0,0 +1,141 @@
+import os
+import shutil
+import tempfile
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from outbox.models import ConsumerCheckpoint
+
+from ..models import Comment, Group, Post
+from ..snapshot import Snapshot, page_path
+
+User = get_user_model()
+
+
+@override_settings(PAGINATOR=2, SNAPSHOT_FEED_PAGES=2)
+class SnapshotTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(username='writer')
+        cls.group = Group.objects.create(
+            title='Копии', slug='copies', description='-',
+        )
+        cls.posts = [
+            Post.objects.create(
+                author=cls.author, group=cls.group, text=f'Пост {i}',
+            )
+            for i in range(5)
+        ]
+
+    def setUp(self):
+        cache.clear()
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root)
+        self.snapshot = Snapshot(self.root)
+
+    def read(self, path):
+        with open(os.path.join(self.root, path), encoding='utf-8') as file:
+            return file.read()
+
+    def test_full_run_writes_pages(self):
+        """Первый запуск сохраняет ленты, профили, посты и about."""
+        result = self.snapshot.run()
+        self.assertEqual(result['failed'], [])
+        manifest = self.snapshot.load_manifest()
+        self.assertEqual(manifest['/'], 'index.html')
+        self.assertEqual(manifest['/?page=2'], 'index-2.html')
+        self.assertNotIn('/?page=3', manifest)
+        self.assertEqual(
+            manifest['/group/copies/'], 'group/copies/index.html'
+        )
+        self.assertIn('/profile/writer/', manifest)
+        self.assertIn('/about/tech/', manifest)
+        self.assertIn('Пост 4', self.read('index.html'))
+        self.assertIn(
+            'Пост 0',
+            self.read(f'posts/{self.posts[0].pk}/index.html'),
+        )
+
+    def test_unchanged_pages_not_rendered_again(self):
+        """Без новых событий повторный запуск ничего не рисует."""
+        self.snapshot.run()
+        self.assertEqual(self.snapshot.run()['rendered'], 0)
+
+    def test_comment_rerenders_only_post(self):
+        """Комментарий перерисовывает только страницу своего поста."""
+        self.snapshot.run()
+        post = self.posts[1]
+        Comment.objects.create(
+            post=post, author=self.author, text='Свежий ответ',
+        )
+        self.assertEqual(self.snapshot.run()['rendered'], 1)
+        self.assertIn(
+            'Свежий ответ', self.read(f'posts/{post.pk}/index.html')
+        )
+
+    def test_new_post_rerenders_feeds_and_profile(self):
+        """Новый пост обновляет ленты и профиль автора."""
+        self.snapshot.run()
+        Post.objects.create(author=self.author, text='Новость')
+        # Фрагмент главной страницы кешируется шаблоном на 20 секунд
+        cache.clear()
+        self.snapshot.run()
+        self.assertIn('Новость', self.read('index.html'))
+        self.assertIn('Новость', self.read('profile/writer/index.html'))
+
+    def test_deleted_post_removed(self):
+        """Страница удалённого поста пропадает из копии."""
+        self.snapshot.run()
+        post = self.posts[2]
+        path = os.path.join(self.root, f'posts/{post.pk}/index.html')
+        self.assertTrue(os.path.exists(path))
+        post.delete()
+        self.snapshot.run()
+        self.assertFalse(os.path.exists(path))
+        self.assertNotIn(
+            f'/posts/{post.pk}/', self.snapshot.load_manifest()
+        )
+
+    def test_group_change_rerenders_its_pages(self):
+        """Правка группы обновляет её ленту и страницы её постов."""
+        self.snapshot.run()
+        self.group.title = 'Новое название'
+        self.group.save()
+        cache.clear()
+        self.snapshot.run()
+        self.assertIn('Новое название', self.read('group/copies/index.html'))
+        self.assertIn(
+            'Новое название',
+            self.read(f'posts/{self.posts[0].pk}/index.html'),
+        )
+
+    def test_user_change_rerenders_profile_and_posts(self):
+        """Правка имени автора обновляет его профиль и посты."""
+        self.snapshot.run()
+        self.author.first_name = 'Лев'
+        self.author.save()
+        cache.clear()
+        self.snapshot.run()
+        self.assertIn('Лев', self.read('profile/writer/index.html'))
+        self.assertIn(
+            'Лев', self.read(f'posts/{self.posts[0].pk}/index.html')
+        )
+
+    def test_lost_checkpoint_rebuilds_snapshot(self):
+        """Без контрольной точки копия собирается заново."""
+        self.snapshot.run()
+        ConsumerCheckpoint.objects.filter(consumer='snapshot').delete()
+        result = self.snapshot.run()
+        self.assertEqual(
+            result['rendered'], len(self.snapshot.load_manifest())
+        )
+
+    def test_page_path_stays_inside_root(self):
+        """Адрес не может увести файл за пределы каталога копии."""
+        self.assertIsNone(page_path('/profile/%2E%2E/%2E%2E/%2E%2E/'))
+        self.assertEqual(
+            page_path('/profile/a.b/?page=3'), 'profile/a.b/index-3.html'
+        )
@@ -1,9 +1,19 @@
+from unittest import mock
+
 from django.contrib.auth import get_user_model
-from django.test import TestCase, Client
+from django.core.cache import cache
+from django.test import TestCase, Client, override_settings
 from django.urls import reverse
 from django import forms
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from core.db import routers
+from core.page_cache import invalidate_pages
 
+from ..cache import invalidate_detail
 from ..models import Post, Group, Comment
+from ..views import render_detail
 
 User = get_user_model()
 
@@ -117,6 +127,8 @@ class PaginatorViewsTest(TestCase):
         cls.posts = Post.objects.bulk_create(cls.page_obj)
 
     def setUp(self):
+        # bulk_create не вызывает сигналы, начала лент строим заново
+        cache.clear()
         # Создаем неавторизованного пользователя
         self.guest_client = Client()
 
@@ -201,3 +213,126 @@ class CommentFormTests(TestCase):
                 post=self.post
             ).exists()
         )
+
+
+class CommentsPaginatorTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='commentator')
+        cls.post = Post.objects.create(
+            author=cls.user,
+            text='Пост с комментариями',
+        )
+        Comment.objects.bulk_create(
+            Comment(post=cls.post, author=cls.user, text=f'коммент {i}')
+            for i in range(25)
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def test_post_detail_first_comments_page(self):
+        """На странице поста выводится первая страница комментариев."""
+        response = self.client.get(
+            reverse('posts:post_detail', args=(self.post.pk,))
+        )
+        comments = response.context['comments']
+        self.assertEqual(len(comments), 20)
+        self.assertTrue(comments.has_next)
+
+    def test_post_comments_fragment_returns_next_page(self):
+        """Фрагмент комментариев отдаёт продолжение по курсору."""
+        response = self.client.get(
+            reverse('posts:post_detail', args=(self.post.pk,))
+        )
+        cursor = response.context['comments'].next_cursor
+        response = self.client.get(
+            reverse('posts:post_comments', args=(self.post.pk,)),
+            {'after': cursor},
+        )
+        comments = response.context['comments']
+        self.assertEqual(
+            [comment.text for comment in comments],
+            [f'коммент {i}' for i in range(20, 25)],
+        )
+        self.assertFalse(comments.has_next)
+
+    @override_settings(DATABASE_REPLICA='default')
+    def test_cached_detail_is_read_from_primary(self):
+        """Общий кеш страницы поста заполняется чтением из основной базы,
+        продолжение комментариев читается с реплики."""
+        seen = []
+
+        def spy(request, post_id):
+            seen.append(routers.PrimaryReplicaRouter().db_for_read(Post))
+            return render_detail(request, post_id)
+
+        url = reverse('posts:post_detail', args=(self.post.pk,))
+        with mock.patch('posts.views.render_detail', side_effect=spy):
+            self.client.get(url)
+            self.client.get(url, {'after': 'x'})
+        self.assertEqual(seen, [None, 'default'])
+
+    def test_post_detail_queries_do_not_grow_with_comments(self):
+        """Число запросов не зависит от количества комментариев."""
+        post = Post.objects.create(author=self.user, text='Второй пост')
+        Comment.objects.create(post=post, author=self.user, text='один')
+        # Прогреваем кеши, общие для всех страниц постов
+        self.client.get(reverse('posts:post_detail', args=(post.pk,)))
+        queries = []
+        for post_id in (post.pk, self.post.pk):
+            # Считаем запросы отрисовки, а не попадания в кеши страниц
+            invalidate_pages()
+            invalidate_detail(post_id)
+            with CaptureQueriesContext(connection) as context:
+                self.client.get(
+                    reverse('posts:post_detail', args=(post_id,))
+                )
+            queries.append(len(context))
+        self.assertEqual(queries[0], queries[1])
+
+
+class GroupAutocompleteTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='picker')
+        cls.groups = [
+            Group.objects.create(
+                title=title, slug=f'ac-{i}', description='-',
+            )
+            for i, title in enumerate(('Коты', 'Котлеты', 'Собаки'))
+        ]
+
+    def setUp(self):
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+
+    def test_group_autocomplete_by_prefix(self):
+        """Автодополнение находит группы по началу названия."""
+        response = self.client.get(
+            reverse('posts:group_autocomplete'), {'term': 'кот'}
+        )
+        titles = [item['text'] for item in response.json()['results']]
+        self.assertEqual(titles, ['Котлеты', 'Коты'])
+
+    def test_post_create_renders_only_selected_group(self):
+        """Форма поста не выводит список всех групп."""
+        response = self.authorized_client.get(reverse('posts:post_create'))
+        content = response.content.decode()
+        self.assertIn('data-autocomplete-url', content)
+        for group in self.groups:
+            self.assertNotIn(group.title, content)
+
+    def test_post_edit_renders_current_group(self):
+        """Форма редактирования выводит текущую группу поста."""
+        post = Post.objects.create(
+            author=self.user, text='Текст', group=self.groups[2],
+        )
+        response = self.authorized_client.get(
+            reverse('posts:post_edit', args=(post.pk,))
+        )
+        content = response.content.decode()
+        self.assertIn(self.groups[2].title, content)
+        self.assertNotIn(self.groups[0].title, content)
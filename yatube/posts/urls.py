@@ -20,6 +20,13 @@ urlpatterns = [
     # Просмотр записи
     path('posts/<int:post_id>/', views.post_detail, name='post_detail'),
 
+    # Следующая страница комментариев
+    path(
+        'posts/<int:post_id>/comments/',
+        views.post_comments,
+        name='post_comments'
+    ),
+
     # Редактирование записей
     path('posts/<int:post_id>/edit/', views.post_edit, name='post_edit'),
 
@@ -30,6 +37,13 @@ urlpatterns = [
         name='add_comment'
     ),
 
+    # Поиск групп для формы поста
+    path(
+        'autocomplete/groups/',
+        views.group_autocomplete,
+        name='group_autocomplete'
+    ),
+
     # Просмотр личных подписок
 
     path('follow/', views.follow_index, name='follow_index'),
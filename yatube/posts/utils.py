@@ -1,6 +1,26 @@
-from django.core.paginator import Paginator
+import base64
 
+from django.core.paginator import Paginator
 from django.conf import settings
+from django.db import DatabaseError, connections
+from django.db.models import Q
+from django.utils.functional import cached_property
+from django.utils.dateparse import parse_datetime
+from django.utils.html import linebreaks
+from django.utils.text import Truncator
+
+
+def render_post_text(text):
+    """HTML текста поста и его начала для лент.
+
+    Текст экранируется, как фильтром linebreaks в шаблоне, поэтому
+    результат можно выводить без повторной обработки.
+    """
+    excerpt = Truncator(text).chars(settings.POST_EXCERPT_LENGTH)
+    return (
+        linebreaks(text, autoescape=True),
+        linebreaks(excerpt, autoescape=True),
+    )
 
 
 def paginator(post_list, request):
@@ -8,3 +28,186 @@ def paginator(post_list, request):
     page_number = request.GET.get('page')
     page_obj = paginator.get_page(page_number)
     return page_obj
+
+
+def prefix_q(field, term):
+    """Условие "поле начинается с term" в виде диапазона по индексу.
+
+    LIKE в SQLite без учёта регистра не использует индекс, поэтому
+    ищем диапазон для строки как есть и с заглавной первой буквой.
+    """
+    condition = Q()
+    for variant in {term, term[:1].upper() + term[1:]}:
+        condition |= Q(**{
+            f'{field}__gte': variant,
+            f'{field}__lt': variant + '\U0010ffff',
+        })
+    return condition
+
+
+def pk_prefix_q(term, max_pk):
+    """Условие "десятичная запись pk начинается с term" через
+    диапазоны первичного ключа: 12, 120-129, 1200-1299 и т.д."""
+    prefix = int(term)
+    condition = Q(pk=prefix)
+    if not prefix:
+        return condition
+    low, high = prefix * 10, (prefix + 1) * 10
+    while max_pk is not None and low <= max_pk:
+        condition |= Q(pk__gte=low, pk__lt=high)
+        low, high = low * 10, high * 10
+    return condition
+
+
+def estimate_count(model, using='default'):
+    """Примерное число строк таблицы без полного COUNT(*).
+
+    Для SQLite берётся статистика ANALYZE, а если её нет -
+    максимальный rowid. Возвращает None, если оценить не удалось.
+    """
+    connection = connections[using]
+    table = model._meta.db_table
+    queries = []
+    if connection.vendor == 'sqlite':
+        queries = [
+            ('SELECT stat FROM sqlite_stat1 WHERE tbl = %s LIMIT 1', [table]),
+            (f'SELECT MAX(rowid) FROM {connection.ops.quote_name(table)}', []),
+        ]
+    elif connection.vendor == 'postgresql':
+        queries = [
+            ('SELECT reltuples::bigint FROM pg_class WHERE relname = %s',
+             [table]),
+        ]
+    with connection.cursor() as cursor:
+        for sql, params in queries:
+            try:
+                cursor.execute(sql, params)
+            except DatabaseError:
+                continue
+            row = cursor.fetchone()
+            if row and row[0] is not None:
+                value = int(str(row[0]).split()[0])
+                if value >= 0:
+                    return value
+    return None
+
+
+def where_sql(queryset):
+    query = queryset.query
+    return query.get_compiler(queryset.db).compile(query.where)
+
+
+def is_unfiltered(queryset):
+    """Нет ли у выборки условий сверх условий менеджера по умолчанию,
+    например скрытия помеченных на удаление постов."""
+    if not queryset.query.where:
+        return True
+    default = queryset.model._default_manager.using(queryset.db).all()
+    return where_sql(queryset) == where_sql(default)
+
+
+class LargeTablePaginator(Paginator):
+    """Пагинатор админки для таблиц с миллионами строк.
+
+    Без фильтров (кроме фильтра менеджера по умолчанию) число строк
+    оценивается, а страница выбирается
+    в два шага: сначала первичные ключи по индексу, затем сами
+    строки только для этих ключей.
+    """
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if is_unfiltered(queryset):
+            estimate = estimate_count(queryset.model, queryset.db)
+            if estimate is not None:
+                return estimate
+        return super().count
+
+    def page(self, number):
+        number = self.validate_number(number)
+        bottom = (number - 1) * self.per_page
+        top = bottom + self.per_page
+        if top + self.orphans >= self.count:
+            top = self.count
+        pks = list(
+            self.object_list.values_list('pk', flat=True)[bottom:top]
+        )
+        return self._get_page(
+            self.object_list.filter(pk__in=pks), number, self
+        )
+
+
+class CursorPage:
+    """Страница выборки с курсором на следующую страницу."""
+
+    def __init__(self, object_list, next_cursor=None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+
+def encode_cursor(obj):
+    """Кодирует пару (created, id) объекта в строку для URL."""
+    raw = f'{obj.created.isoformat()}|{obj.pk}'
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor):
+    """Возвращает пару (created, id) или None для битого курсора."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode()).decode()
+        created, pk = raw.rsplit('|', 1)
+        created = parse_datetime(created)
+        pk = int(pk)
+    except (ValueError, UnicodeError):
+        return None
+    if created is None:
+        return None
+    return created, pk
+
+
+def cursor_paginator(object_list, cursor, per_page):
+    """Постраничный вывод по курсору (created, id) без OFFSET.
+
+    Выборка должна быть упорядочена по ('created', 'id').
+    """
+    position = decode_cursor(cursor) if cursor else None
+    if position is not None:
+        created, pk = position
+        object_list = object_list.filter(
+            Q(created__gt=created) | Q(created=created, pk__gt=pk)
+        )
+    objects = list(object_list.order_by('created', 'pk')[:per_page + 1])
+    next_cursor = None
+    if len(objects) > per_page:
+        objects = objects[:per_page]
+        next_cursor = encode_cursor(objects[-1])
+    return CursorPage(objects, next_cursor)
+
+
+def comments_page(post, request):
+    """Страница комментариев поста вместе с авторами.
+
+    Комментарии отключённых пользователей скрыты до их удаления.
+    """
+    comment_list = post.comments.select_related('author').filter(
+        author__is_active=True
+    )
+    return cursor_paginator(
+        comment_list,
+        request.GET.get('after'),
+        settings.COMMENTS_PAGINATOR,
+    )
@@ -1,35 +1,84 @@
-from django.shortcuts import render, get_object_or_404, redirect
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.http import JsonResponse
+from django.shortcuts import render, redirect
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
 from django.contrib.auth.decorators import login_required
 
-from .models import Post, Group, User, Follow
+from core.db.routers import read_primary, use_replica
+from core.edge import add_surrogate_keys, feed_keys, post_keys
+from tasks.queue import enqueue
+
+from .archive import ArchiveChain, get_live_or_archived_post_or_404
+from .cache import (
+    author_post_count, detail_key, get_group_or_404, get_post_or_404,
+    get_user_or_404,
+)
+from .models import Post, Group, Follow
 from .forms import PostForm, CommentForm
-from .utils import paginator
+from .heads import HeadList
+from .tasks import warm_thumbnail
+from .utils import paginator, comments_page, prefix_q
+
+# Ленты выводят только excerpt, полный текст из базы не читаем
+FEED_DEFERRED = ('text', 'text_html')
+# Автор и группа нужны карточке поста и её ключу в кеше
+FEED_RELATED = ('author', 'group')
+# Готовые фрагменты HTML в кешированной части страницы поста
+DETAIL_HTML = ('sidebar', 'body', 'comments')
 
 
+@use_replica
 def index(request):
-    post_list = Post.objects.select_related('author').all()
+    post_list = HeadList(
+        Post.objects.select_related(*FEED_RELATED).defer(*FEED_DEFERRED)
+    )
     page_obj = paginator(post_list, request)
     context = {
         'page_obj': page_obj,
     }
-    return render(request, 'posts/index.html', context)
+    response = render(
+        request, 'posts/index.html', context,
+        using=settings.FEED_TEMPLATE_ENGINE,
+    )
+    return add_surrogate_keys(response, feed_keys('index', page_obj))
 
 
+@use_replica
 def group_posts(request, slug):
-    group = get_object_or_404(Group, slug=slug)
-    post_list = Post.objects.filter(group=group)
+    group = get_group_or_404(slug)
+    post_list = HeadList(
+        Post.objects.filter(group=group).select_related(
+            *FEED_RELATED
+        ).defer(*FEED_DEFERRED),
+        group.pk,
+    )
     page_obj = paginator(post_list, request)
     context = {
         'group': group,
         'page_obj': page_obj,
     }
-    return render(request, 'posts/group_list.html', context)
+    response = render(
+        request, 'posts/group_list.html', context,
+        using=settings.FEED_TEMPLATE_ENGINE,
+    )
+    return add_surrogate_keys(
+        response, feed_keys(f'group-{group.pk}', page_obj)
+    )
 
 
+@use_replica
 def profile(request, username):
-    author = get_object_or_404(User, username=username)
+    author = get_user_or_404(username)
 
-    post_list = author.posts.all()
+    post_list = ArchiveChain(
+        author.posts.select_related(*FEED_RELATED).defer(*FEED_DEFERRED),
+        author.archived_posts.select_related(*FEED_RELATED).defer(
+            *FEED_DEFERRED
+        ),
+    )
     page_obj = paginator(post_list, request)
 
     follow = request.user.is_authenticated and Follow.objects.filter(
@@ -39,28 +88,92 @@ def profile(request, username):
         'author': author,
         'following': follow,
     }
-    return render(request, 'posts/profile.html', context)
+    response = render(
+        request, 'posts/profile.html', context,
+        using=settings.FEED_TEMPLATE_ENGINE,
+    )
+    return add_surrogate_keys(
+        response, feed_keys(f'author-{author.pk}', page_obj)
+    )
 
 
+def render_detail(request, post_id):
+    """Общая для всех пользователей часть страницы поста.
+
+    Кешируется по id поста и сбрасывается при его правке, при
+    добавлении или удалении комментария, а также при правке автора,
+    комментаторов и группы.
+    """
+    post, is_archived = get_live_or_archived_post_or_404(
+        post_id, 'author', 'group'
+    )
+    context = {
+        'post': post,
+        'comments': comments_page(post, request),
+    }
+    return {
+        'sidebar': render_to_string(
+            'posts/includes/post_sidebar.html', context, request
+        ),
+        'body': render_to_string(
+            'posts/includes/post_body.html', context, request
+        ),
+        'comments': render_to_string(
+            'posts/includes/comments.html', context, request
+        ),
+        'author_id': post.author_id,
+        'author_username': post.author.username,
+        'text30': post.text[:30],
+        'is_archived': is_archived,
+        'surrogate_keys': post_keys(post),
+    }
+
+
+@use_replica
 def post_detail(request, post_id):
-    post = get_object_or_404(Post, pk=post_id)
-    post_list = post.author.posts.all()
-    amount_of_posts = post_list.count()
-    text30 = post.text[:30]
+    # Продолжение комментариев по курсору в кеш не попадает
+    cacheable = 'after' not in request.GET
+    detail = cache.get(detail_key(post_id)) if cacheable else None
+    if detail is None and cacheable:
+        # Кеш общий для всех: отстающая реплика не должна попасть в него
+        # на весь DETAIL_CACHE_TIMEOUT
+        with read_primary():
+            detail = render_detail(request, post_id)
+        cache.set(detail_key(post_id), detail, settings.DETAIL_CACHE_TIMEOUT)
+    elif detail is None:
+        detail = render_detail(request, post_id)
     form = CommentForm(request.POST or None)
-    comment_list = post.comments.all()
 
     context = {
-        'post': post,
+        'post_id': post_id,
+        'detail': {
+            key: mark_safe(value) if key in DETAIL_HTML else value
+            for key, value in detail.items()
+        },
         'form': form,
-        'comments': comment_list,
-        'amount_of_posts': amount_of_posts,
-        'text30': text30,
+        'amount_of_posts': author_post_count(detail['author_id']),
+        'is_archived': detail['is_archived'],
     }
-    return render(request, 'posts/post_detail.html', context)
+    response = render(request, 'posts/post_detail.html', context)
+    return add_surrogate_keys(response, detail['surrogate_keys'])
+
+
+def post_comments(request, post_id):
+    post, _ = get_live_or_archived_post_or_404(post_id)
+    context = {
+        'post': post,
+        'comments': comments_page(post, request),
+    }
+    return render(request, 'posts/includes/comments.html', context)
+
+
+def warm_thumbnail_later(post):
+    if post.image:
+        transaction.on_commit(lambda: enqueue(warm_thumbnail, post.pk))
 
 
 @login_required
+@transaction.atomic
 def post_create(request):
     is_edit = False
     form = PostForm(
@@ -71,6 +184,7 @@ def post_create(request):
         post = form.save(commit=False)
         post.author = request.user
         post.save()
+        warm_thumbnail_later(post)
         return redirect('posts:profile', username=post.author.username)
 
     context = {
@@ -81,9 +195,10 @@ def post_create(request):
 
 
 @login_required
+@transaction.atomic
 def post_edit(request, post_id):
     user = request.user.id
-    post = get_object_or_404(Post, pk=post_id)
+    post = get_post_or_404(post_id)
     author = post.author.id
     is_edit = True
     if user != author:
@@ -95,6 +210,8 @@ def post_edit(request, post_id):
     )
     if form.is_valid():
         form.save()
+        if 'image' in form.changed_data:
+            warm_thumbnail_later(post)
         return redirect('posts:post_detail', post_id=post.pk)
     context = {
         'post': post,
@@ -105,8 +222,9 @@ def post_edit(request, post_id):
 
 
 @login_required
+@transaction.atomic
 def add_comment(request, post_id):
-    post = get_object_or_404(Post, pk=post_id)
+    post = get_post_or_404(post_id)
     form = CommentForm(request.POST or None)
     if form.is_valid():
         comment = form.save(commit=False)
@@ -125,21 +243,28 @@ def add_comment(request, post_id):
 
 
 @login_required
+@use_replica
 def follow_index(request):
-    user = get_object_or_404(User, username=request.user)
-    post_list = Post.objects.filter(author__following__user=user)
+    user = request.user
+    post_list = Post.objects.filter(
+        author__following__user=user
+    ).select_related(*FEED_RELATED).defer(*FEED_DEFERRED)
     page_obj = paginator(post_list, request)
     context = {
         'user': user,
         'page_obj': page_obj,
     }
-    return render(request, 'posts/follow_index.html', context)
+    return render(
+        request, 'posts/follow_index.html', context,
+        using=settings.FEED_TEMPLATE_ENGINE,
+    )
 
 
 @login_required
+@transaction.atomic
 def profile_follow(request, username):
     follower = request.user
-    author = get_object_or_404(User, username=username)
+    author = get_user_or_404(username)
     if follower.id != author.id:
         Follow.objects.get_or_create(
             user=follower,
@@ -149,11 +274,27 @@ def profile_follow(request, username):
 
 
 @login_required
+@transaction.atomic
 def profile_unfollow(request, username):
     folower = request.user
-    author = get_object_or_404(User, username=username)
+    author = get_user_or_404(username)
     Follow.objects.filter(
         user=folower,
         author=author
     ).delete()
     return redirect('posts:follow_index')
+
+
+def group_autocomplete(request):
+    term = request.GET.get('term', '').strip()
+    groups = Group.objects.order_by('title')
+    if term:
+        groups = groups.filter(prefix_q('title', term))
+    limit = settings.AUTOCOMPLETE_LIMIT
+    found = list(groups.values_list('pk', 'title')[:limit + 1])
+    return JsonResponse({
+        'results': [
+            {'id': pk, 'text': title} for pk, title in found[:limit]
+        ],
+        'pagination': {'more': len(found) > limit},
+    })
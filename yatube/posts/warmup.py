@@ -0,0 +1,74 @@
+"""Этапы прогрева кешей для лент (core.warmup)."""
+from django.conf import settings
+from django.db.models import Count
+from django.http import Http404
+from django.urls import reverse
+from sorl.thumbnail import get_thumbnail
+
+from core.warmup import get_anonymous, in_time, stage
+
+from .cache import get_group_or_404, get_user_or_404, group_choices
+from .heads import get_head, rebuild_head
+from .models import Group, Post
+
+
+def top_groups():
+    """Группы с наибольшим числом постов, не больше WARMUP_GROUPS."""
+    return list(
+        Group.objects.annotate(posts_count=Count('posts'))
+        .order_by('-posts_count', 'pk')[:settings.WARMUP_GROUPS]
+    )
+
+
+@stage('heads', order=30)
+def warm_heads(deadline):
+    """Начала главной ленты и лент крупных групп."""
+    rebuild_head()
+    for group in top_groups():
+        if not in_time(deadline):
+            return False
+        rebuild_head(group.pk)
+
+
+@stage('entities', order=40)
+def warm_entities(deadline):
+    """Группы и авторы, которых показывают первые страницы лент."""
+    group_choices()
+    for group in top_groups():
+        get_group_or_404(group.slug)
+    usernames = Post.objects.filter(
+        pk__in=get_head()['ids']
+    ).values_list('author__username', flat=True).distinct()
+    for username in usernames:
+        if not in_time(deadline):
+            return False
+        try:
+            get_user_or_404(username)
+        except Http404:
+            # Отключённый пользователь, посты которого ещё в ленте
+            pass
+
+
+@stage('pages', order=50)
+def warm_pages(deadline):
+    """Первые страницы главной ленты и крупных групп для гостей."""
+    paths = [reverse('posts:index')] + [
+        reverse('posts:group_list', args=(group.slug,))
+        for group in top_groups()
+    ]
+    for path in paths:
+        if not in_time(deadline):
+            return False
+        get_anonymous(path)
+
+
+@stage('thumbnails', order=60)
+def warm_thumbnails(deadline):
+    """Миниатюры картинок постов из начала главной ленты."""
+    posts = Post.objects.filter(
+        pk__in=get_head()['ids']
+    ).exclude(image='').only('image')
+    for post in posts:
+        if not in_time(deadline):
+            return False
+        get_thumbnail(post.image, **settings.POST_THUMBNAIL)
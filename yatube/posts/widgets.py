@@ -0,0 +1,54 @@
+from django import forms
+from django.core.exceptions import ValidationError
+from django.urls import reverse
+
+
+class AutocompleteSelect(forms.Select):
+    """Выпадающий список, который выводит только выбранный вариант.
+
+    Остальные варианты подгружает скрипт по адресу из
+    data-autocomplete-url, поэтому размер формы не зависит от
+    размера таблицы.
+    """
+
+    def __init__(self, url_name, attrs=None):
+        super().__init__(attrs)
+        self.url_name = url_name
+
+    class Media:
+        js = ('js/autocomplete.js',)
+
+    def build_attrs(self, base_attrs, extra_attrs=None):
+        attrs = super().build_attrs(base_attrs, extra_attrs)
+        attrs['data-autocomplete-url'] = reverse(self.url_name)
+        return attrs
+
+    def selected_pks(self, field, value):
+        """Выбранные значения, которые могут быть pk; мусор из
+        неверной формы пропускается, а ошибку покажет само поле."""
+        pk_field = field.queryset.model._meta.pk
+        selected = set()
+        for item in value:
+            if str(item) in field.empty_values:
+                continue
+            try:
+                selected.add(pk_field.to_python(item))
+            except ValidationError:
+                pass
+        return selected
+
+    def optgroups(self, name, value, attrs=None):
+        field = self.choices.field
+        selected = self.selected_pks(field, value)
+        options = [self.create_option(
+            name, '', field.empty_label or '', not selected, 0
+        )]
+        for obj in field.queryset.filter(pk__in=selected):
+            options.append(self.create_option(
+                name,
+                field.prepare_value(obj),
+                field.label_from_instance(obj),
+                True,
+                len(options),
+            ))
+        return [(None, options, 0)]
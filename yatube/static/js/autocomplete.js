@@ -0,0 +1,37 @@
+// Подгрузка вариантов для <select data-autocomplete-url="...">.
+document.addEventListener('DOMContentLoaded', function () {
+    var selects = document.querySelectorAll('select[data-autocomplete-url]');
+    Array.prototype.forEach.call(selects, function (select) {
+        var input = document.createElement('input');
+        var timer = null;
+        input.type = 'search';
+        input.className = 'form-control mb-1';
+        input.placeholder = 'Начните вводить название';
+        select.parentNode.insertBefore(input, select);
+
+        input.addEventListener('input', function () {
+            clearTimeout(timer);
+            timer = setTimeout(function () {
+                var url = select.dataset.autocompleteUrl
+                    + '?term=' + encodeURIComponent(input.value);
+                fetch(url).then(function (response) {
+                    return response.json();
+                }).then(function (data) {
+                    var current = select.value;
+                    Array.prototype.slice.call(select.options, 1).forEach(
+                        function (option) {
+                            if (option.value !== current) {
+                                option.remove();
+                            }
+                        }
+                    );
+                    data.results.forEach(function (item) {
+                        if (String(item.id) !== current) {
+                            select.add(new Option(item.text, item.id));
+                        }
+                    });
+                });
+            }, 250);
+        });
+    });
+});
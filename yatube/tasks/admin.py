@@ -0,0 +1,22 @@
+from django.contrib import admin
+
+from .models import Task
+
+
+class TaskAdmin(admin.ModelAdmin):
+    list_display = (
+        'pk',
+        'name',
+        'status',
+        'priority',
+        'attempts',
+        'run_at',
+        'duration',
+    )
+    list_filter = ('status', 'name')
+    search_fields = ('name', 'idempotency_key')
+    readonly_fields = ('last_error',)
+    empty_value_display = '-пусто-'
+
+
+admin.site.register(Task, TaskAdmin)
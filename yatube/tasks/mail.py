@@ -0,0 +1,87 @@
+import base64
+from email.mime.base import MIMEBase
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.core.mail.backends.base import BaseEmailBackend
+
+from .queue import enqueue
+from .registry import task
+
+
+def dump_attachment(attachment):
+    """Вложение (имя, содержимое, тип) в виде, пригодном для JSON.
+
+    Готовые части MIMEBase из очереди не восстановить, такое письмо
+    отклоняется.
+    """
+    if isinstance(attachment, MIMEBase):
+        raise ValueError('Письмо с вложением MIMEBase нельзя поставить '
+                         'в очередь.')
+    filename, content, mimetype = attachment
+    if isinstance(content, bytes):
+        return [filename, base64.b64encode(content).decode(), mimetype, True]
+    return [filename, content, mimetype, False]
+
+
+def load_attachment(filename, content, mimetype, is_bytes):
+    if is_bytes:
+        content = base64.b64decode(content)
+    return filename, content, mimetype
+
+
+class QueuedEmailBackend(BaseEmailBackend):
+    """Почтовый бэкенд, который только ставит отправку в очередь.
+
+    Письмо отправляет фоновая задача через TASKS_EMAIL_BACKEND.
+    Письмо, которое нельзя сохранить целиком, не ставится в очередь:
+    send_messages() бросает ValueError.
+    """
+
+    def send_messages(self, email_messages):
+        payloads = [self.dump(message) for message in email_messages]
+        for data in payloads:
+            enqueue(send_email, data)
+        return len(email_messages)
+
+    @staticmethod
+    def dump(message):
+        return {
+            'subject': message.subject,
+            'body': message.body,
+            'from_email': message.from_email,
+            'to': message.to,
+            'cc': message.cc,
+            'bcc': message.bcc,
+            'reply_to': message.reply_to,
+            'headers': message.extra_headers,
+            'alternatives': getattr(message, 'alternatives', []),
+            'attachments': [
+                dump_attachment(attachment)
+                for attachment in message.attachments
+            ],
+            'content_subtype': message.content_subtype,
+            'mixed_subtype': message.mixed_subtype,
+            'encoding': message.encoding,
+        }
+
+
+@task('tasks.send_email')
+def send_email(data):
+    alternatives = data.pop('alternatives')
+    attachments = data.pop('attachments', [])
+    subtypes = {
+        name: data.pop(name)
+        for name in ('content_subtype', 'mixed_subtype', 'encoding')
+        if name in data
+    }
+    message = EmailMultiAlternatives(
+        connection=get_connection(settings.TASKS_EMAIL_BACKEND), **data
+    )
+    for name, value in subtypes.items():
+        setattr(message, name, value)
+    for content, mimetype in alternatives:
+        message.attach_alternative(content, mimetype)
+    for attachment in attachments:
+        message.attach(*load_attachment(*attachment))
+    message.send()
@@ -0,0 +1,50 @@
+import multiprocessing
+
+import django
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from tasks.worker import work
+
+
+def worker_main(index, poll_interval, burst):
+    django.setup()
+    work(index, poll_interval, burst)
+
+
+class Command(BaseCommand):
+    help = 'Запускает пул процессов, выполняющих фоновые задачи из очереди.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--processes', type=int, default=2)
+        parser.add_argument(
+            '--poll-interval', type=float, default=1.0,
+            help='Пауза при пустой очереди, секунды.',
+        )
+        parser.add_argument(
+            '--burst', action='store_true',
+            help='Завершиться, когда очередь опустеет.',
+        )
+
+    def handle(self, *args, **options):
+        if options['processes'] == 1:
+            processed = work(0, options['poll_interval'], options['burst'])
+            self.stdout.write(f'Выполнено задач: {processed}')
+            return
+        # Дочерние процессы открывают свои соединения с базой
+        connections.close_all()
+        processes = [
+            multiprocessing.Process(
+                target=worker_main,
+                args=(index, options['poll_interval'], options['burst']),
+            )
+            for index in range(options['processes'])
+        ]
+        for process in processes:
+            process.start()
+        try:
+            for process in processes:
+                process.join()
+        except KeyboardInterrupt:
+            for process in processes:
+                process.terminate()
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from tasks.queue import metrics
+
+
+class Command(BaseCommand):
+    help = 'Выводит сводку по фоновым задачам: состояния и длительности.'
+
+    def handle(self, *args, **options):
+        for row in metrics():
+            self.stdout.write(
+                f'{row["name"]}: всего {row["total"]}, '
+                f'в очереди {row["queued"]}, выполняется {row["running"]}, '
+                f'готово {row["done"]}, ошибок {row["failed"]}, '
+                f'среднее время {row["avg_duration"] or 0:.3f} с, '
+                f'максимум {row["max_duration"] or 0:.3f} с, '
+                f'попыток в среднем {row["avg_attempts"] or 0:.1f}'
+            )
@@ -0,0 +1,184 @@
+"""Очередь фоновых задач в таблице Task основной базы.
+
+Брокер не нужен: обработчик забирает задачу условным UPDATE
+(сравнение с состоянием "в очереди") и получает её в аренду до
+locked_until. Пока задача выполняется, аренда продлевается каждые
+TASKS_HEARTBEAT секунд; если обработчик умер, по истечении аренды
+задачу заберёт другой.
+"""
+import datetime as dt
+import json
+import random
+import threading
+import time
+import traceback
+from contextlib import nullcontext
+
+from django.conf import settings
+from django.db import IntegrityError, connection, transaction
+from django.db.models import Avg, Count, F, Max, Q
+from django.utils import timezone
+
+from .models import Task
+from .registry import get_task
+
+
+def enqueue(func, *args, priority=0, idempotency_key=None, delay=0,
+            max_attempts=None, **kwargs):
+    """Ставит задачу в очередь и возвращает её запись.
+
+    Повторная постановка с тем же idempotency_key возвращает уже
+    существующую задачу. При TASKS_ALWAYS_EAGER задача выполняется
+    сразу в текущем процессе.
+    """
+    name = getattr(func, 'task_name', func)
+    fields = {
+        'name': name,
+        'payload': json.dumps({'args': args, 'kwargs': kwargs}),
+        'priority': priority,
+        'run_at': timezone.now() + dt.timedelta(seconds=delay),
+        'max_attempts': max_attempts or settings.TASKS_MAX_ATTEMPTS,
+    }
+    if idempotency_key is not None:
+        try:
+            with transaction.atomic():
+                task, created = Task.objects.get_or_create(
+                    idempotency_key=idempotency_key, defaults=fields,
+                )
+        except IntegrityError:
+            task = Task.objects.get(idempotency_key=idempotency_key)
+            created = False
+        if not created:
+            return task
+    else:
+        task = Task.objects.create(**fields)
+    if settings.TASKS_ALWAYS_EAGER:
+        task.status = Task.RUNNING
+        task.attempts = 1
+        run(task)
+    return task
+
+
+def claimable():
+    now = timezone.now()
+    return (
+        Q(status=Task.QUEUED, run_at__lte=now)
+        | Q(status=Task.RUNNING, locked_until__lt=now)
+    )
+
+
+def claim(worker_id):
+    """Забирает в аренду самую приоритетную готовую задачу или None."""
+    for _ in range(5):
+        candidate = (
+            Task.objects.filter(claimable())
+            .order_by('-priority', 'run_at', 'pk')
+            .values_list('pk', flat=True)
+            .first()
+        )
+        if candidate is None:
+            return None
+        now = timezone.now()
+        claimed = Task.objects.filter(claimable(), pk=candidate).update(
+            status=Task.RUNNING,
+            locked_by=worker_id,
+            locked_until=now + dt.timedelta(seconds=settings.TASKS_LEASE),
+            attempts=F('attempts') + 1,
+            started=now,
+        )
+        if claimed:
+            return Task.objects.get(pk=candidate)
+    return None
+
+
+def retry_delay(attempts):
+    """Экспоненциальная пауза перед повтором со случайным разбросом."""
+    delay = settings.TASKS_RETRY_BACKOFF * 2 ** (attempts - 1)
+    return min(delay, settings.TASKS_RETRY_BACKOFF_MAX) * random.uniform(
+        0.8, 1.2
+    )
+
+
+def extend_lease(task):
+    """Продлевает аренду, если задача всё ещё за этим обработчиком."""
+    return Task.objects.filter(
+        pk=task.pk, status=Task.RUNNING, locked_by=task.locked_by,
+    ).update(
+        locked_until=timezone.now() + dt.timedelta(
+            seconds=settings.TASKS_LEASE
+        ),
+    )
+
+
+class Heartbeat(threading.Thread):
+    """Поток, который продлевает аренду задачи, пока она выполняется."""
+    daemon = True
+
+    def __init__(self, task):
+        super().__init__(name=f'heartbeat-{task.pk}')
+        self.task = task
+        self.stopped = threading.Event()
+
+    def run(self):
+        try:
+            while not self.stopped.wait(settings.TASKS_HEARTBEAT):
+                extend_lease(self.task)
+        finally:
+            connection.close()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stopped.set()
+        self.join()
+
+
+def run(task):
+    """Выполняет задачу и записывает результат, длительность и ошибку.
+
+    Задачу из аренды сопровождает Heartbeat; выполняемая сразу
+    (TASKS_ALWAYS_EAGER) аренды не имеет.
+    """
+    payload = json.loads(task.payload)
+    started = time.monotonic()
+    try:
+        lease = nullcontext() if task.locked_until is None else Heartbeat(task)
+        with lease:
+            get_task(task.name)(*payload['args'], **payload['kwargs'])
+    except Exception:
+        task.last_error = traceback.format_exc()
+        if task.attempts >= task.max_attempts:
+            task.status = Task.FAILED
+        else:
+            task.status = Task.QUEUED
+            task.run_at = timezone.now() + dt.timedelta(
+                seconds=retry_delay(task.attempts)
+            )
+    else:
+        task.status = Task.DONE
+        task.last_error = ''
+    task.duration = time.monotonic() - started
+    task.finished = timezone.now()
+    task.locked_until = None
+    task.save(update_fields=[
+        'status', 'run_at', 'last_error', 'duration', 'finished',
+        'locked_until', 'attempts',
+    ])
+    return task
+
+
+def metrics():
+    """Сводка по именам задач: число по состояниям и длительности."""
+    rows = Task.objects.values('name').annotate(
+        total=Count('pk'),
+        queued=Count('pk', filter=Q(status=Task.QUEUED)),
+        running=Count('pk', filter=Q(status=Task.RUNNING)),
+        done=Count('pk', filter=Q(status=Task.DONE)),
+        failed=Count('pk', filter=Q(status=Task.FAILED)),
+        avg_duration=Avg('duration'),
+        max_duration=Max('duration'),
+        avg_attempts=Avg('attempts'),
+    ).order_by('name')
+    return list(rows)
@@ -0,0 +1,14 @@
+_tasks = {}
+
+
+def task(name=None):
+    """Регистрирует функцию как фоновую задачу под именем name."""
+    def decorator(func):
+        _tasks[name or f'{func.__module__}.{func.__name__}'] = func
+        func.task_name = name or f'{func.__module__}.{func.__name__}'
+        return func
+    return decorator
+
+
+def get_task(name):
+    return _tasks[name]
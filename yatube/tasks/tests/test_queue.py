@@ -0,0 +1,156 @@
+import time
+from email.mime.text import MIMEText
+from io import StringIO
+
+from django.core import mail
+from django.core.management import call_command
+from django.test import TestCase, TransactionTestCase, override_settings
+
+from tasks.models import Task
+from tasks.queue import claim, enqueue, metrics, run
+from tasks.registry import task
+
+CALLS = []
+
+
+@task('tests.record')
+def record(value):
+    CALLS.append(value)
+
+
+@task('tests.slow')
+def slow():
+    time.sleep(0.3)
+    CALLS.append(Task.objects.get(name='tests.slow').locked_until)
+
+
+@task('tests.fail')
+def fail():
+    raise RuntimeError('сбой')
+
+
+@override_settings(TASKS_ALWAYS_EAGER=False)
+class TaskQueueTests(TestCase):
+
+    def setUp(self):
+        CALLS.clear()
+
+    def test_enqueue_claim_and_run(self):
+        """Задача из очереди выполняется с сохранёнными аргументами."""
+        enqueue(record, 'пост')
+        task = claim('test-worker')
+        self.assertEqual(task.status, Task.RUNNING)
+        run(task)
+        self.assertEqual(CALLS, ['пост'])
+        task.refresh_from_db()
+        self.assertEqual(task.status, Task.DONE)
+        self.assertIsNotNone(task.duration)
+
+    def test_claim_respects_priority(self):
+        """Первой забирается задача с большим приоритетом."""
+        enqueue(record, 'обычная')
+        urgent = enqueue(record, 'срочная', priority=10)
+        self.assertEqual(claim('test-worker').pk, urgent.pk)
+
+    def test_claimed_task_is_not_claimed_twice(self):
+        """Взятая в аренду задача не достаётся другому обработчику."""
+        enqueue(record, 'одна')
+        self.assertIsNotNone(claim('first'))
+        self.assertIsNone(claim('second'))
+
+    def test_failed_task_is_retried_later(self):
+        """Упавшая задача возвращается в очередь с отсрочкой."""
+        enqueue(fail, max_attempts=2)
+        task = run(claim('test-worker'))
+        self.assertEqual(task.status, Task.QUEUED)
+        self.assertIn('сбой', task.last_error)
+        self.assertIsNone(claim('test-worker'))
+        Task.objects.update(run_at=task.created)
+        task = run(claim('test-worker'))
+        self.assertEqual(task.status, Task.FAILED)
+        self.assertEqual(task.attempts, 2)
+
+    def test_idempotency_key_deduplicates(self):
+        """Повтор с тем же ключом не создаёт новую задачу."""
+        first = enqueue(record, 1, idempotency_key='post-1')
+        second = enqueue(record, 2, idempotency_key='post-1')
+        self.assertEqual(first.pk, second.pk)
+        self.assertEqual(Task.objects.count(), 1)
+
+    def test_run_workers_burst_and_metrics(self):
+        """Обработчик выполняет очередь, сводка считает задачи."""
+        enqueue(record, 'a')
+        enqueue(record, 'b')
+        call_command(
+            'run_workers', processes=1, burst=True, stdout=StringIO()
+        )
+        self.assertEqual(sorted(CALLS), ['a', 'b'])
+        row = next(row for row in metrics() if row['name'] == 'tests.record')
+        self.assertEqual(row['done'], 2)
+
+    @override_settings(
+        EMAIL_BACKEND='tasks.mail.QueuedEmailBackend',
+        TASKS_EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend',
+    )
+    def test_email_sent_by_worker(self):
+        """Письмо уходит только при выполнении задачи."""
+        mail.send_mail('Тема', 'Текст', 'from@example.com', ['to@example.com'])
+        self.assertEqual(len(mail.outbox), 0)
+        run(claim('test-worker'))
+        self.assertEqual(mail.outbox[0].subject, 'Тема')
+
+    @override_settings(
+        EMAIL_BACKEND='tasks.mail.QueuedEmailBackend',
+        TASKS_EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend',
+    )
+    def test_queued_email_keeps_whole_message(self):
+        """Копии, заголовки, HTML-часть и вложения доходят до отправки."""
+        message = mail.EmailMultiAlternatives(
+            'Тема', 'Текст', 'from@example.com', ['to@example.com'],
+            cc=['cc@example.com'], bcc=['bcc@example.com'],
+            headers={'X-Yatube': 'да'},
+        )
+        message.attach_alternative('<p>Текст</p>', 'text/html')
+        message.attach('notes.txt', 'заметки', 'text/plain')
+        message.attach('logo.png', b'\x89PNG\x00', 'image/png')
+        message.send()
+        run(claim('test-worker'))
+        sent = mail.outbox[0]
+        self.assertEqual(sent.cc, ['cc@example.com'])
+        self.assertEqual(sent.bcc, ['bcc@example.com'])
+        self.assertEqual(sent.extra_headers, {'X-Yatube': 'да'})
+        self.assertEqual(sent.alternatives, [('<p>Текст</p>', 'text/html')])
+        self.assertEqual(sent.attachments, [
+            ('notes.txt', 'заметки', 'text/plain'),
+            ('logo.png', b'\x89PNG\x00', 'image/png'),
+        ])
+
+    @override_settings(EMAIL_BACKEND='tasks.mail.QueuedEmailBackend')
+    def test_email_with_mime_part_is_rejected(self):
+        """Письмо, которое нельзя сохранить целиком, не теряет части
+        молча, а отклоняется."""
+        message = mail.EmailMessage('Тема', 'Текст', to=['to@example.com'])
+        message.attach(MIMEText('часть'))
+        with self.assertRaises(ValueError):
+            message.send()
+        self.assertFalse(Task.objects.exists())
+
+
+@override_settings(
+    TASKS_ALWAYS_EAGER=False, TASKS_LEASE=60, TASKS_HEARTBEAT=0.05,
+)
+class LeaseHeartbeatTests(TransactionTestCase):
+
+    def setUp(self):
+        CALLS.clear()
+
+    def test_lease_extended_while_task_runs(self):
+        """Пока задача выполняется, аренда продлевается."""
+        enqueue(slow)
+        task = claim('test-worker')
+        leased_until = task.locked_until
+        run(task)
+        self.assertGreater(CALLS[0], leased_until)
+        task.refresh_from_db()
+        self.assertEqual(task.status, Task.DONE)
+        self.assertIsNone(task.locked_until)
@@ -0,0 +1,28 @@
+import os
+import socket
+import time
+
+from .queue import claim, run
+
+
+def worker_id(index=0):
+    return f'{socket.gethostname()}:{os.getpid()}:{index}'
+
+
+def work(index=0, poll_interval=1.0, burst=False):
+    """Цикл обработчика: забирает и выполняет задачи.
+
+    При burst=True выходит, как только очередь опустела; возвращает
+    число выполненных задач.
+    """
+    processed = 0
+    name = worker_id(index)
+    while True:
+        task = claim(name)
+        if task is None:
+            if burst:
+                return processed
+            time.sleep(poll_interval)
+            continue
+        run(task)
+        processed += 1
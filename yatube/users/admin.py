@@ -0,0 +1,30 @@
+from django.contrib import admin
+from django.contrib.auth import get_user_model
+from django.contrib.auth.admin import UserAdmin
+from django.db.models import Q
+
+from posts.admin import SoftDeleteAdminMixin
+from posts.deletion import soft_delete_user
+from posts.utils import prefix_q
+
+User = get_user_model()
+
+
+class YatubeUserAdmin(SoftDeleteAdminMixin, UserAdmin):
+    soft_delete = staticmethod(soft_delete_user)
+    search_fields = ('^username', '^email')
+
+    def get_search_results(self, request, queryset, search_term):
+        # Префикс username ищем диапазоном по уникальному индексу,
+        # на этом поиске работают автодополнения в админке постов.
+        # Email ищется по началу адреса.
+        term = search_term.strip()
+        if not term:
+            return queryset, False
+        return queryset.filter(
+            prefix_q('username', term) | Q(email__istartswith=term)
+        ), False
+
+
+admin.site.unregister(User)
+admin.site.register(User, YatubeUserAdmin)
@@ -14,3 +14,9 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yatube.settings')
 
 application = get_asgi_application()
+
+# Предзагрузка (PRELOAD) и прогрев кешей (WARMUP_ON_BOOT)
+# до первого запроса
+from core.startup import start  # noqa: E402
+
+start()
@@ -50,28 +50,45 @@ INSTALLED_APPS = [
     'users.apps.UsersConfig',
     'core.apps.CoreConfig',
     'about.apps.AboutConfig',
+    'tasks.apps.TasksConfig',
+    'outbox.apps.OutboxConfig',
     'sorl.thumbnail',
 
 ]
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'core.middleware.AnonymousPageCacheMiddleware',
+    'core.middleware.EdgeCacheMiddleware',
+    'core.middleware.DatabaseCircuitBreakerMiddleware',
+    'core.middleware.ReplicaPinMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'core.middleware.TemplateProfilingMiddleware',
 ]
 
 ROOT_URLCONF = 'yatube.urls'
 TEMPLATES_DIR = os.path.join(BASE_DIR, 'templates')
+TEMPLATE_LOADERS = [
+    'django.template.loaders.filesystem.Loader',
+    'django.template.loaders.app_directories.Loader',
+]
+# Вне отладки шаблоны разбираются один раз на процесс и не
+# перечитываются с диска; core.warmup компилирует их при старте
+if not DEBUG:
+    TEMPLATE_LOADERS = [
+        ('django.template.loaders.cached.Loader', TEMPLATE_LOADERS),
+    ]
 TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
         'DIRS': [TEMPLATES_DIR],
-        'APP_DIRS': True,
         'OPTIONS': {
+            'loaders': TEMPLATE_LOADERS,
             'context_processors': [
                 'django.template.context_processors.debug',
                 'django.template.context_processors.request',
@@ -82,7 +99,38 @@ TEMPLATES = [
             ],
         },
     },
+    {
+        # Быстрые шаблоны лент (yatube/jinja2.py), включаются
+        # FEED_TEMPLATE_ENGINE
+        'BACKEND': 'django.template.backends.jinja2.Jinja2',
+        'DIRS': [os.path.join(BASE_DIR, 'jinja2')],
+        'OPTIONS': {
+            'environment': 'yatube.jinja2.environment',
+            'auto_reload': DEBUG,
+            'context_processors': [
+                'django.contrib.auth.context_processors.auth',
+                'core.context_processors.year.year',
+            ],
+        },
+    },
 ]
+# Движок шаблонов главной ленты, групп, профиля и подписок:
+# None - шаблоны Django, 'jinja2' - их копии в каталоге jinja2/
+FEED_TEMPLATE_ENGINE = os.environ.get('YATUBE_FEED_TEMPLATE_ENGINE')
+
+# Время отрисовки шаблонов и тегов каждого запроса в журнале
+# core.middleware (core.template_profile); только для отладки
+TEMPLATE_PROFILING = bool(os.environ.get('YATUBE_TEMPLATE_PROFILING'))
+TEMPLATE_PROFILING_LIMIT = 15
+if TEMPLATE_PROFILING:
+    LOGGING = {
+        'version': 1,
+        'disable_existing_loggers': False,
+        'handlers': {'console': {'class': 'logging.StreamHandler'}},
+        'loggers': {
+            'core.middleware': {'handlers': ['console'], 'level': 'INFO'},
+        },
+    }
 
 WSGI_APPLICATION = 'yatube.wsgi.application'
 
@@ -90,13 +138,37 @@ WSGI_APPLICATION = 'yatube.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/3.2/ref/settings/#databases
 
+# Обёртка над sqlite3: настройки кеша и повтор при "database is locked".
+# WAL записывается в файл базы, поэтому включается только на сервере
+# (YATUBE_SQLITE_WAL), а не для базы из репозитория
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
+        'ENGINE': 'core.db.backends.sqlite3',
         'NAME': os.path.join(BASE_DIR, 'db.sqlite3'),
+        # Соединение живёт между запросами, а не открывается заново
+        'CONN_MAX_AGE': 600,
+        'OPTIONS': {
+            'timeout': 1,
+            'wal': bool(os.environ.get('YATUBE_SQLITE_WAL')),
+            'busy_max_wait': 5,
+            'busy_backoff': 0.05,
+        },
     }
 }
 
+# Реплика для чтения тяжёлых страниц: файл SQLite, который обновляет
+# replicate_db (или настоящая репликация)
+DATABASE_REPLICA = 'replica'
+if os.environ.get('YATUBE_REPLICA_DB'):
+    DATABASES[DATABASE_REPLICA] = {
+        **DATABASES['default'],
+        'NAME': os.environ['YATUBE_REPLICA_DB'],
+        'TEST': {'MIRROR': 'default'},
+    }
+DATABASE_ROUTERS = ['core.db.routers.PrimaryReplicaRouter']
+# Сколько секунд после записи пользователь читает из основной базы
+REPLICA_PIN_SECONDS = 5
+
 
 # Password validation
 # https://docs.djangoproject.com/en/3.2/ref/settings/#auth-password-validators
@@ -146,12 +218,91 @@ LOGIN_URL = 'users:login'
 LOGIN_REDIRECT_URL = 'posts:index'
 # LOGOUT_REDIRECT_URL = 'posts:index'
 
+# Письма отправляются фоновой задачей, а не в ходе запроса
+EMAIL_BACKEND = 'tasks.mail.QueuedEmailBackend'
 #  подключаем движок filebased.EmailBackend
-EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
+TASKS_EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
 # указываем директорию, в которую будут складываться файлы писем
 EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'sent_emails')
 # Константы
 PAGINATOR = 10
+COMMENTS_PAGINATOR = 20
+# Длина начала поста, которое показывают ленты, символы
+POST_EXCERPT_LENGTH = 300
+AUTOCOMPLETE_LIMIT = 20
+# Время жизни кеша пользователей и групп по username/slug, секунды
+ENTITY_CACHE_TIMEOUT = 60 * 15
+# Сколько помнить, что пользователя, группы или поста нет, секунды.
+# С LocMemCache запись своя в каждом процессе и не сбрасывается, когда
+# объект создан в другом, поэтому срок короткий
+NEGATIVE_CACHE_TIMEOUT = 5
+# Запас id сверх максимального, в пределах которого пост ищется в базе
+NEGATIVE_CACHE_PK_MARGIN = 10000
+# Карточки постов в лентах; ключ меняется вместе с постом
+CARD_CACHE_TIMEOUT = 60 * 60 * 24
+# Сколько последних постов главной ленты и каждой группы держать
+# в кеше (posts.heads) - на первые страницы. Срок ограничивает
+# отставание, если пост добавлен в другом процессе или мимо сигналов
+FEED_HEAD_SIZE = 50
+FEED_HEAD_TIMEOUT = 60
+# Общая часть страницы поста; сбрасывается при правке и комментариях
+DETAIL_CACHE_TIMEOUT = 60 * 60
+# Страницы для анонимных читателей, которые кешируются целиком
+PAGE_CACHE_VIEWS = (
+    'posts:index', 'posts:group_list', 'posts:profile', 'posts:post_detail',
+)
+# С LocMemCache сброс виден только своему процессу, в остальных страница
+# живёт до истечения срока
+PAGE_CACHE_TIMEOUT = 60
+SESSION_COOKIE_NAME = 'sessionid'
+# С любой из этих cookie запрос идёт мимо кеша страниц: сессия,
+# сообщения django.contrib.messages и закрепление за основной базой
+# (core.middleware.ReplicaPinMiddleware). Cookie CSRF не мешает: формы
+# с токеном видят только вошедшие пользователи
+PAGE_CACHE_BYPASS_COOKIES = (SESSION_COOKIE_NAME, 'messages', 'primary_pin')
+# Статическая копия страниц для гостей (manage.py snapshot): сколько
+# страниц каждой ленты, профилей популярных авторов и обсуждаемых постов
+SNAPSHOT_ROOT = os.path.join(BASE_DIR, 'snapshot')
+SNAPSHOT_FEED_PAGES = 3
+SNAPSHOT_PROFILES = 50
+SNAPSHOT_POSTS = 200
+# Потребитель outbox, не сдвигавший точку столько секунд, не держит
+# удаление событий (manage.py compact_outbox) и теряет точку
+OUTBOX_CONSUMER_TIMEOUT = 60 * 60 * 24 * 7
+# Прогрев кешей (core.warmup) при старте обработчика и командой
+# warm_up: бюджет времени в секундах, сколько крупных групп прогревать
+WARMUP_ON_BOOT = not DEBUG
+WARMUP_BUDGET = 10
+WARMUP_GROUPS = 5
+# Host запросов прогрева, должен входить в ALLOWED_HOSTS
+WARMUP_HOST = 'localhost'
+# Файл, который появляется после прогрева, для проверки готовности
+WARMUP_READY_FILE = os.environ.get('YATUBE_READY_FILE')
+# Подготовка процесса до первого запроса (core.startup), с gunicorn
+# --preload - один раз в главном процессе до fork обработчиков
+PRELOAD = not DEBUG
+PRELOAD_MODULES = (
+    'django.db.models.sql.compiler',
+    'django.contrib.sessions.serializers',
+)
+# Автомат защиты от медленной базы (core.db.breaker): размыкается,
+# если в окне из window запросов доля ошибок или запросов дольше
+# slow_query секунд достигла порога; пробует базу через cooldown секунд.
+# Состояние автомата своё в каждом процессе
+CIRCUIT_BREAKER = {
+    'window': 50,
+    'min_samples': 10,
+    'error_rate': 0.5,
+    'slow_query': 1.0,
+    'slow_rate': 0.5,
+    'cooldown': 10,
+}
+# Сколько хранить последнюю удачную отрисовку страницы на случай отказа
+STALE_CACHE_TIMEOUT = 60 * 60 * 24
+# Посты старше стольких дней archive_posts переносит в архив
+ARCHIVE_AFTER_DAYS = 365
+# Строк за одну транзакцию при фоновом удалении постов и пользователей
+PURGE_BATCH_SIZE = 500
 # Обработка ошибки 403
 CSRF_FAILURE_VIEW = 'core.views.csrf_failure'
 
@@ -166,3 +317,31 @@ CACHES = {
         'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
     }
 }
+
+# Фоновые задачи (приложение tasks)
+# Выполнять задачи сразу при постановке, без обработчиков
+TASKS_ALWAYS_EAGER = DEBUG
+TASKS_MAX_ATTEMPTS = 5
+# Аренда задачи обработчиком, секунды; пока задача выполняется,
+# аренда продлевается каждые TASKS_HEARTBEAT секунд
+TASKS_LEASE = 300
+TASKS_HEARTBEAT = 60
+# Пауза перед повтором: 5, 10, 20... секунд, но не больше часа
+TASKS_RETRY_BACKOFF = 5
+TASKS_RETRY_BACKOFF_MAX = 3600
+
+# Кеш страниц на обратном прокси (core.edge): гостевые ответы
+# хранятся сутки и сбрасываются по surrogate-ключам через EDGE_PURGER
+EDGE_CACHE_SECONDS = 60 * 60 * 24
+EDGE_PURGER = None
+EDGE_PURGER_OPTIONS = {}
+if os.environ.get('YATUBE_EDGE_PURGE_URL'):
+    EDGE_PURGER = 'core.edge.HTTPPurger'
+    EDGE_PURGER_OPTIONS = {'url': os.environ['YATUBE_EDGE_PURGE_URL']}
+
+# Миниатюра картинки поста в лентах
+POST_THUMBNAIL = {
+    'geometry_string': '1200x790',
+    'crop': 'center',
+    'upscale': True,
+}